@@ -0,0 +1,522 @@
+"""Daemon agregasi multi-stasiun: terima event rep/sesi dari banyak workout.py, simpan ke SQLite.
+
+Setiap stasiun (satu Kinect + satu ESP32) mengirim event lewat `StationClient` (station_client.py).
+Handler per sambungan hanya mem-parse batch; semua penulisan lewat satu thread ingest yang
+menggabungkan batch dari semua stasiun ke dalam satu transaksi, lalu batch di-ACK setelah commit.
+Database memakai WAL sehingga query tidak menahan ingest. Duplikat (event dikirim ulang setelah
+sambungan putus) dibuang lewat primary key (stasiun, sesi, seq). Event yang payload-nya rusak
+dibuang dan dicatat (event lain di batch tetap disimpan); kegagalan sementara database (misal
+terkunci) dibalas {"error": ..., "retry": true} sehingga stasiun menyimpan batch dan mengirim ulang.
+
+Query per stasiun dan per member dilayani lewat sambungan yang sama ({"query": ...}) atau CLI:
+    python aggregator.py serve --db gym.db --port 8765            # hanya dari komputer ini
+    python aggregator.py serve --host 0.0.0.0 --allow-remote       # stasiun lain di jaringan (tanpa auth)
+    python aggregator.py query stations
+    python aggregator.py query station A
+    python aggregator.py query member "A/1718000000000/3"
+    python aggregator.py simulate data_gerakan.csv --synthetic 3   # stasiun simulasi + putus sambung
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+
+from rep_analytics import REP_FIELDS
+from station_client import DEFAULT_PORT, SOCKET_TIMEOUT, StationClient, parse_address
+
+DEFAULT_DB_PATH = "gym.db"
+DEFAULT_HOST = "127.0.0.1"  # protokol tanpa autentikasi: default hanya menerima stasiun dari komputer ini
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+INGEST_MAX_BATCHES = 64  # batch stasiun maksimal per transaksi
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    station TEXT NOT NULL,
+    session TEXT NOT NULL,
+    exercise TEXT,
+    started REAL,
+    ended REAL,
+    summary TEXT,
+    PRIMARY KEY (station, session)
+);
+CREATE TABLE IF NOT EXISTS reps (
+    station TEXT NOT NULL,
+    session TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    member TEXT NOT NULL,
+    track INTEGER,
+    exercise TEXT NOT NULL,
+    number INTEGER,
+    start REAL,
+    end REAL,
+    peak REAL,
+    rom REAL,
+    concentric REAL,
+    eccentric REAL,
+    side TEXT,
+    PRIMARY KEY (station, session, seq)
+);
+CREATE INDEX IF NOT EXISTS reps_station_time ON reps (station, end);
+CREATE INDEX IF NOT EXISTS reps_member_time ON reps (member, end);
+"""
+
+_REP_COLUMNS = ("station", "session", "seq", "member") + REP_FIELDS
+_INSERT_REP = (f"INSERT OR IGNORE INTO reps ({', '.join(_REP_COLUMNS)}) "
+               f"VALUES ({', '.join('?' * len(_REP_COLUMNS))})")
+_INSERT_SESSION = "INSERT OR IGNORE INTO sessions (station, session, exercise, started) VALUES (?, ?, ?, ?)"
+# event end yang dikirim ulang tidak mengubah baris -> rowcount 0, terhitung duplikat seperti start dan rep
+_END_SESSION = ("INSERT INTO sessions (station, session, ended, summary) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (station, session) DO UPDATE SET ended = excluded.ended, summary = excluded.summary "
+                "WHERE sessions.ended IS NOT excluded.ended OR sessions.summary IS NOT excluded.summary")
+
+# statistik per gerakan, dipakai query stasiun dan member
+_EXERCISE_STATS = """
+SELECT exercise, COUNT(*), COUNT(DISTINCT member), AVG(end - start), AVG(rom),
+       AVG(concentric), AVG(eccentric), MIN(start), MAX(end)
+FROM reps WHERE {where} GROUP BY exercise ORDER BY exercise
+"""
+
+
+_SQL_VALUE_TYPES = (str, int, float, type(None))
+_REQUIRED_REP_COLUMNS = ("station", "session", "seq", "member", "exercise")
+
+
+def _round(value, digits):
+    return None if value is None else round(value, digits)
+
+
+def _event_row(station, ev):
+    """(tipe, baris parameter SQL) untuk satu event. ValueError / KeyError / TypeError / IndexError /
+    AttributeError jika payload rusak (event seperti itu tidak akan pernah bisa disimpan)."""
+    session, kind, data = ev["session"], ev["type"], ev["data"]
+    if kind == "rep":
+        # data = REP_FIELDS + member
+        if len(data) != len(REP_FIELDS) + 1:
+            raise ValueError(f"data rep butuh {len(REP_FIELDS) + 1} kolom, dapat {len(data)}")
+        row = (station, session, ev["seq"], data[-1]) + tuple(data[:-1])
+        for column in _REQUIRED_REP_COLUMNS:
+            if row[_REP_COLUMNS.index(column)] is None:
+                raise ValueError(f"kolom {column} rep kosong")
+    elif kind == "start":
+        row = (station, session, data.get("exercise"), ev["at"])
+    elif kind == "end":
+        row = (station, session, ev["at"], json.dumps(data.get("tracks")))
+    else:
+        raise ValueError(f"tipe event tidak dikenal: {kind!r}")
+    for value in row:
+        if not isinstance(value, _SQL_VALUE_TYPES):
+            raise TypeError(f"nilai {value!r} tidak bisa disimpan")
+    return kind, row
+
+
+class RepStore:
+    """Penyimpanan SQLite (WAL) untuk event semua stasiun. `ingest` hanya dipanggil dari satu thread."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        db = self._connection()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+        db.commit()
+
+    def _connection(self):
+        """Satu koneksi per thread (sqlite3 tidak boleh dipakai lintas thread)."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA synchronous=NORMAL")  # aman dengan WAL, commit tanpa fsync per transaksi
+        return db
+
+    def ingest(self, batches):
+        """Simpan beberapa batch (stasiun, list event) dalam satu transaksi.
+
+        Return (jumlah event baru, jumlah event rusak yang dibuang) per batch.
+        """
+        db = self._connection()
+        inserted = []
+        with db:
+            for station, events in batches:
+                new = rejected = 0
+                reps = []
+                for ev in events:
+                    try:
+                        kind, row = _event_row(station, ev)
+                    except (ValueError, KeyError, TypeError, IndexError, AttributeError) as e:
+                        rejected += 1
+                        print(f"[aggregator] Event rusak dari stasiun {station} dibuang: {type(e).__name__}: {e}")
+                        continue
+                    if kind == "rep":
+                        reps.append(row)
+                    elif kind == "start":
+                        new += db.execute(_INSERT_SESSION, row).rowcount
+                    else:
+                        new += db.execute(_END_SESSION, row).rowcount
+                if reps:
+                    new += db.executemany(_INSERT_REP, reps).rowcount
+                inserted.append((new, rejected))
+        return inserted
+
+    def _exercise_stats(self, where, params):
+        rows = self._connection().execute(_EXERCISE_STATS.format(where=where), params).fetchall()
+        return {exercise: {"reps": reps, "members": members,
+                           "duration_mean_s": _round(duration, 3), "rom_mean": _round(rom, 1),
+                           "concentric_mean_s": _round(concentric, 3), "eccentric_mean_s": _round(eccentric, 3),
+                           "first": first, "last": last}
+                for exercise, reps, members, duration, rom, concentric, eccentric, first, last in rows}
+
+    def stations(self):
+        """Ringkasan semua stasiun: jumlah sesi, rep, member, dan rep terakhir."""
+        rows = self._connection().execute("""
+            SELECT s.station, COUNT(DISTINCT s.session),
+                   (SELECT COUNT(*) FROM reps r WHERE r.station = s.station),
+                   (SELECT COUNT(DISTINCT member) FROM reps r WHERE r.station = s.station),
+                   (SELECT MAX(end) FROM reps r WHERE r.station = s.station)
+            FROM (SELECT station, session FROM sessions UNION SELECT station, session FROM reps) s
+            GROUP BY s.station ORDER BY s.station""").fetchall()
+        return {station: {"sessions": sessions, "reps": reps, "members": members, "last_rep": last}
+                for station, sessions, reps, members, last in rows}
+
+    def station(self, station, since=None, until=None):
+        """Statistik per gerakan satu stasiun (opsional jendela waktu `since`..`until`, detik epoch)."""
+        where, params = "station = ?", [station]
+        if since is not None:
+            where += " AND end >= ?"
+            params.append(since)
+        if until is not None:
+            where += " AND end < ?"
+            params.append(until)
+        sessions = self._connection().execute(
+            "SELECT session, exercise, started, ended FROM sessions WHERE station = ? ORDER BY session",
+            (station,)).fetchall()
+        return {"exercises": self._exercise_stats(where, params),
+                "sessions": [dict(zip(("session", "exercise", "started", "ended"), row)) for row in sessions]}
+
+    def member(self, member, limit=50):
+        """Statistik per gerakan satu member + `limit` rep terakhirnya."""
+        rows = self._connection().execute(
+            f"SELECT station, {', '.join(REP_FIELDS)} FROM reps WHERE member = ? ORDER BY end DESC LIMIT ?",
+            (member, limit)).fetchall()
+        return {"exercises": self._exercise_stats("member = ?", (member,)),
+                "recent": [dict(zip(("station",) + REP_FIELDS, row)) for row in rows]}
+
+    def members(self, station=None):
+        where, params = ("WHERE station = ?", (station,)) if station is not None else ("", ())
+        rows = self._connection().execute(
+            f"SELECT member, station, COUNT(*), MAX(end) FROM reps {where} GROUP BY member ORDER BY member",
+            params).fetchall()
+        return {member: {"station": st, "reps": reps, "last_rep": last} for member, st, reps, last in rows}
+
+    def query(self, request):
+        """Jalankan query dari pesan {"query": jenis, ...}."""
+        kind = request.get("query")
+        if kind == "stations":
+            return self.stations()
+        if kind == "station":
+            return self.station(request["station"], request.get("since"), request.get("until"))
+        if kind == "member":
+            return self.member(request["member"], request.get("limit", 50))
+        if kind == "members":
+            return self.members(request.get("station"))
+        raise ValueError(f"query tidak dikenal: {kind!r}")
+
+    def close(self):
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+class _Ingestor:
+    """Thread tunggal penulis database: batch yang menumpuk dari banyak stasiun di-commit bersama."""
+
+    def __init__(self, store):
+        self.store = store
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.transactions = 0
+        self.events = 0
+        self._thread = threading.Thread(target=self._run, name="ingest", daemon=True)
+        self._thread.start()
+
+    def submit(self, station, events):
+        """Simpan satu batch dan tunggu commit-nya. Return (jumlah event baru, jumlah event rusak)."""
+        done = threading.Event()
+        item = [station, events, done, None]
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ingest sudah ditutup")
+            self._queue.append(item)
+            self._cond.notify_all()
+        done.wait()
+        if isinstance(item[3], Exception):
+            raise item[3]
+        return item[3]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    break
+                items = [self._queue.popleft() for _ in range(min(len(self._queue), INGEST_MAX_BATCHES))]
+            try:
+                results = self.store.ingest([(station, events) for station, events, _, _ in items])
+                self.transactions += 1
+                self.events += sum(len(events) for _, events, _, _ in items)
+            except Exception as e:
+                results = [e] * len(items)
+                if len(items) > 1 and not isinstance(e, sqlite3.OperationalError):
+                    # bukan gangguan sementara: ulangi per batch supaya satu batch tidak menggagalkan stasiun lain
+                    results = [self._ingest_one(station, events) for station, events, _, _ in items]
+            for item, result in zip(items, results):
+                item[3] = result
+                item[2].set()
+        self.store.close()
+
+    def _ingest_one(self, station, events):
+        try:
+            result = self.store.ingest([(station, events)])[0]
+        except Exception as e:
+            return e
+        self.transactions += 1
+        self.events += len(events)
+        return result
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+class _StationHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.connection)
+        try:
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                    if "events" in request:
+                        events = request["events"]
+                        new, rejected = server.ingestor.submit(str(request["station"]), events)
+                        reply = {"ok": new, "rejected": rejected, "seq": events[-1]["seq"] if events else None}
+                    else:
+                        reply = {"result": server.store.query(request)}
+                except sqlite3.OperationalError as e:
+                    # database terkunci / disk penuh / I/O: sementara, stasiun menyimpan batch dan mengirim ulang
+                    print(f"[aggregator] Gagal menyimpan: {e}")
+                    reply = {"error": f"{type(e).__name__}: {e}", "retry": True}
+                except (ValueError, KeyError, TypeError, sqlite3.Error) as e:
+                    # pesan rusak: mengirim ulang tidak akan berhasil
+                    reply = {"error": f"{type(e).__name__}: {e}", "retry": False}
+                self.wfile.write((json.dumps(reply, separators=(",", ":")) + "\n").encode("utf-8"))
+        except OSError:
+            pass  # stasiun putus; event yang belum di-ACK dikirim ulang olehnya
+        finally:
+            with server.lock:
+                server.connections.discard(self.connection)
+
+
+class AggregatorServer(socketserver.ThreadingTCPServer):
+    """Server TCP daemon agregasi; satu thread per sambungan stasiun, satu thread ingest."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, store, address=("127.0.0.1", DEFAULT_PORT)):
+        self.store = store
+        self.ingestor = _Ingestor(store)
+        self.lock = threading.Lock()
+        self.connections = set()
+        super().__init__(address, _StationHandler)
+
+    def drop_connections(self):
+        """Putuskan semua sambungan stasiun (uji putus-sambung)."""
+        with self.lock:
+            connections = list(self.connections)
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        """Hentikan server (setelah `shutdown()` jika `serve_forever` berjalan) dan thread ingest."""
+        self.drop_connections()
+        self.server_close()
+        self.ingestor.close()
+
+
+def query_daemon(address, request):
+    """Kirim satu query ke daemon yang berjalan dan kembalikan hasilnya."""
+    with socket.create_connection(parse_address(address), timeout=SOCKET_TIMEOUT) as sock:
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        reply = json.loads(sock.makefile("r", encoding="utf-8").readline())
+    if "error" in reply:
+        raise ValueError(reply["error"])
+    return reply["result"]
+
+
+def _start_server(store, port):
+    server = AggregatorServer(store, ("127.0.0.1", port))
+    threading.Thread(target=server.serve_forever, name="aggregator", daemon=True).start()
+    return server
+
+
+def _stop_server(server):
+    server.shutdown()
+    server.close()
+
+
+def simulate(sources, db_path, spool_dir, port=0):
+    """Beberapa stasiun replay bersamaan; daemon mati di awal (event di-spool), hidup, lalu restart di tengah.
+
+    `sources` = {nama stasiun: iterable Frame}. Return (hitungan rep lokal per stasiun, store, statistik client).
+    """
+    # import di sini: mode serve/query tidak butuh NumPy / penghitung repetisi
+    from identity_tracker import IdentityTracker
+    from replay import run_replay
+    from rep_analytics import SessionSummary
+    from rep_counter import RepCounter
+
+    store = RepStore(db_path)
+    probe = AggregatorServer(store, ("127.0.0.1", port))  # cari port kosong, daemon belum melayani
+    port = probe.server_address[1]
+    probe.close()
+
+    stations = {}
+    for name, frames in sources.items():
+        frames = list(frames)
+        client = StationClient(name, ("127.0.0.1", port), os.path.join(spool_dir, f"station_{name}.spool"),
+                               reconnect_interval=0.05)
+        summary = SessionSummary()
+
+        def on_rep(record, client=client, summary=summary):
+            summary.add(record)
+            client.rep(record)
+
+        counter = RepCounter(verbose=False, on_rep=on_rep)
+        client.session_start(counter.selected_exercise)
+        stations[name] = (client, counter, summary, IdentityTracker(), frames)
+
+    def play(phase):
+        """Replay sepertiga rekaman tiap stasiun, semua stasiun bersamaan."""
+        threads = []
+        for _, counter, _, tracker, frames in stations.values():
+            third = -(-len(frames) // 3)
+            part = frames[phase * third:(phase + 1) * third]
+            threads.append(threading.Thread(target=run_replay, args=(part, counter), kwargs={"tracker": tracker}))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    play(0)                              # daemon belum jalan: semua event masuk spool
+    server = _start_server(store, port)
+    play(1)
+    _stop_server(server)                 # daemon restart di tengah sesi
+    server = _start_server(store, port)
+    play(2)
+
+    expected = {}
+    stats = {}
+    for name, (client, _, summary, _, _) in stations.items():
+        client.session_end(summary)
+        client.close(timeout=10)
+        expected[name] = len(summary.records)
+        stats[name] = client.stats()
+    _stop_server(server)
+    return expected, store, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daemon agregasi rep dari banyak stasiun workout")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="jalankan daemon")
+    serve.add_argument("--db", default=DEFAULT_DB_PATH)
+    serve.add_argument("--host", default=DEFAULT_HOST,
+                       help="alamat listen; selain loopback butuh --allow-remote")
+    serve.add_argument("--allow-remote", action="store_true",
+                       help="izinkan listen di alamat jaringan (siapa pun di jaringan bisa mengirim dan membaca data)")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    query = sub.add_parser("query", help="query daemon yang berjalan")
+    query.add_argument("kind", choices=("stations", "station", "member", "members"))
+    query.add_argument("key", nargs="?", help="id stasiun / member")
+    query.add_argument("--address", default=f"127.0.0.1:{DEFAULT_PORT}")
+    query.add_argument("--since", type=float, default=None, help="detik epoch (query station)")
+    sim = sub.add_parser("simulate", help="beberapa stasiun simulasi dari rekaman / skeleton sintetis")
+    sim.add_argument("logs", nargs="*", help="log pose (.poselog / CSV), satu stasiun per file")
+    sim.add_argument("--synthetic", type=int, default=0, help="tambah N stasiun skeleton sintetis")
+    sim.add_argument("--frames", type=int, default=1800, help="frame per stasiun sintetis")
+    sim.add_argument("--db", default=None, help="default: database sementara")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        if args.host not in LOOPBACK_HOSTS and not args.host.startswith("127.") and not args.allow_remote:
+            parser.error(f"--host {args.host} membuka daemon tanpa autentikasi ke jaringan; tambahkan --allow-remote")
+        server = AggregatorServer(RepStore(args.db), (args.host, args.port))
+        print(f"Daemon agregasi di {args.host}:{args.port}, database {args.db}. Ctrl+C untuk keluar.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.close()
+        print(f"Ingest: {server.ingestor.events} event dalam {server.ingestor.transactions} transaksi")
+        return 0
+
+    if args.command == "query":
+        request = {"query": args.kind}
+        if args.kind in ("station", "member"):
+            if args.key is None:
+                parser.error(f"query {args.kind} butuh id")
+            request[args.kind] = args.key
+            request["since"] = args.since
+        elif args.kind == "members" and args.key is not None:
+            request["station"] = args.key
+        print(json.dumps(query_daemon(args.address, request), indent=2))
+        return 0
+
+    from pose_log import open_pose_source
+    from synthetic import SyntheticSkeletons
+
+    sources = {}
+    for i, path in enumerate(args.logs):
+        sources[f"S{i + 1}"] = open_pose_source(path)
+    for i in range(args.synthetic):
+        sources[f"SYN{i + 1}"] = SyntheticSkeletons(num_bodies=2, num_frames=args.frames, seed=i)
+    if not sources:
+        parser.error("beri minimal satu log atau --synthetic N")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "gym.db")
+        start = time.perf_counter()
+        expected, store, stats = simulate(sources, db_path, tmp)
+        elapsed = time.perf_counter() - start
+        stored = store.stations()
+        ok = True
+        for name in sources:
+            got = stored.get(name, {}).get("reps", 0)
+            ok &= got == expected[name]
+            st = stats[name]
+            print(f"[{name}] rep lokal={expected[name]} tersimpan={got} terkirim={st['acked']} "
+                  f"duplikat={st['duplicates']} putus={st['disconnects']} sisa={st['pending']}")
+        if stored:
+            name = min(stored)
+            print(f"Contoh query station {name}: {json.dumps(store.station(name)['exercises'])}")
+        store.close()
+    print(f"{len(sources)} stasiun dalam {elapsed:.2f} s -> {'SAMA' if ok else 'BERBEDA'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
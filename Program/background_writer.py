@@ -0,0 +1,139 @@
+"""Worker I/O di thread terpisah dengan antrean terbatas.
+
+Loop capture cukup memanggil `submit(item)`; penulisan ke disk atau serial
+dilakukan oleh thread worker. Kalau antrean penuh, kebijakan overflow menentukan
+apa yang terjadi:
+    "drop_oldest" : item tertua dibuang, submit tidak pernah menunggu
+    "block"       : submit menunggu sampai ada slot (tidak ada data hilang)
+"""
+import threading
+import time
+from collections import deque
+
+OVERFLOW_POLICIES = ("drop_oldest", "block")
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """Jalankan `handler(item)` untuk setiap item di thread worker sendiri.
+
+    `on_close()` (opsional) dipanggil di thread worker setelah antrean habis,
+    misalnya untuk flush / menutup file atau port.
+    """
+
+    def __init__(self, name, handler, maxsize=64, overflow="drop_oldest", on_close=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow harus salah satu dari {OVERFLOW_POLICIES}, dapat {overflow!r}")
+        if maxsize < 1:
+            raise ValueError("maxsize minimal 1")
+        self.name = name
+        self.handler = handler
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.on_close = on_close
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # statistik (dibaca lewat stats())
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.submit_wait_max = 0.0   # detik, waktu terlama submit() menahan pemanggil
+        self.write_time_total = 0.0  # detik, total waktu handler
+        self.write_time_max = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=f"writer-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Masukkan item ke antrean. Return False jika writer sudah ditutup."""
+        start = time.perf_counter()
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._queue) >= self.maxsize:
+                if self.overflow == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._queue) >= self.maxsize and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return False
+            self._queue.append(item)
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify_all()
+        waited = time.perf_counter() - start
+        if waited > self.submit_wait_max:
+            self.submit_wait_max = waited
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                item = self._queue.popleft()
+                self._cond.notify_all()
+            if item is _STOP:
+                break
+
+            start = time.perf_counter()
+            try:
+                self.handler(item)
+            except Exception as e:
+                self.errors += 1  # gagal tidak dihitung di written / waktu tulis
+                print(f"[{self.name}] Gagal menulis: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            self.written += 1
+            self.write_time_total += elapsed
+            if elapsed > self.write_time_max:
+                self.write_time_max = elapsed
+
+        if self.on_close is not None:
+            try:
+                self.on_close()
+            except Exception as e:
+                print(f"[{self.name}] Gagal menutup: {e}")
+
+    def close(self, timeout=None):
+        """Tolak item baru, tunggu antrean habis ditulis, lalu join thread worker.
+
+        Return True jika worker selesai sebelum `timeout`.
+        """
+        with self._cond:
+            if not self._closed:
+                self._closed = True
+                # sentinel selalu masuk walaupun antrean penuh
+                self._queue.append(_STOP)
+                self._cond.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def stats(self):
+        with self._cond:
+            depth = sum(1 for item in self._queue if item is not _STOP)
+        return {
+            "queue_depth": depth,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "submit_wait_max_ms": self.submit_wait_max * 1000.0,
+            "write_avg_ms": (self.write_time_total / self.written * 1000.0) if self.written else 0.0,
+            "write_max_ms": self.write_time_max * 1000.0,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,120 @@
+"""Hitung repetisi untuk seluruh rekaman sekaligus dengan operasi array NumPy.
+
+Input berupa array pose (frames, bodies, K4ABT_JOINT_COUNT, 3). Metrik semua
+gerakan di registry dihitung dalam satu pass vektor (evaluator yang sama dengan
+`RepCounter`), lalu transisi hysteresis dievaluasi tanpa loop Python per frame.
+Hasilnya identik dengan `RepCounter` yang dijalankan frame demi frame.
+"""
+import numpy as np
+
+from kinect_joints import K4ABT_JOINT_COUNT, K4ABT_JOINT_SHOULDER_RIGHT, K4ABT_JOINT_SHOULDER_LEFT
+from rep_counter import DEFAULT_REGISTRY
+
+
+class BatchResult:
+    """`counts[exercise]` -> array (bodies,); `rep_times[exercise][body]` -> timestamp tiap repetisi."""
+
+    def __init__(self, counts, rep_times):
+        self.counts = counts
+        self.rep_times = rep_times
+
+
+def select_center_body_batch(poses):
+    """Versi vektor dari `replay.select_center_body`: indeks target per frame, -1 jika tidak ada."""
+    sx = (poses[:, :, K4ABT_JOINT_SHOULDER_RIGHT, 0] + poses[:, :, K4ABT_JOINT_SHOULDER_LEFT, 0]) / 2.0
+    dist = np.abs(sx)
+    dist[np.isnan(dist)] = np.inf
+    if dist.shape[1] == 0:
+        return np.full(dist.shape[0], -1)
+    target = np.argmin(dist, axis=1)
+    target[np.isinf(dist[np.arange(len(dist)), target])] = -1
+    return target
+
+
+def _previous_state(event, initial):
+    """Forward fill event hysteresis tanpa loop frame.
+
+    `event` bernilai +1 / -1 (pindah keadaan) atau 0 (tetap). Return keadaan
+    *sebelum* tiap frame = event tak-nol terakhir sebelumnya, atau `initial`.
+    """
+    n_frames = event.shape[0]
+    frame_idx = np.arange(n_frames).reshape((n_frames,) + (1,) * (event.ndim - 1))
+    last = np.where(event != 0, frame_idx, -1)
+    np.maximum.accumulate(last, axis=0, out=last)
+
+    prev_last = np.empty_like(last)
+    prev_last[:1] = -1
+    prev_last[1:] = last[:-1]
+    prev_state = np.take_along_axis(event, np.maximum(prev_last, 0), axis=0)
+    prev_state[prev_last < 0] = initial
+    return prev_state
+
+
+def count_reps_batch(poses, timestamps=None, registry=None, selected_exercise="all", target_mask=None):
+    """Hitung repetisi semua gerakan terpilih untuk seluruh rekaman.
+
+    poses: array (frames, bodies, K4ABT_JOINT_COUNT, 3); body yang tidak ada = NaN.
+    target_mask: bool (frames, bodies), body yang dihitung di tiap frame (default semua).
+    """
+    poses = np.asarray(poses, dtype=np.float64)
+    if poses.ndim != 4 or poses.shape[2:] != (K4ABT_JOINT_COUNT, 3):
+        raise ValueError(f"poses harus berbentuk (frames, bodies, {K4ABT_JOINT_COUNT}, 3), dapat {poses.shape}")
+    registry = registry or DEFAULT_REGISTRY
+    compiled = registry.compile(selected_exercise)
+    for ex in compiled.exercises:
+        p = ex.params
+        if ex.type == "bilateral" and p["center"] > min(p["right"], -p["left"]):
+            # zona tengah tumpang tindih dengan zona miring: state machine tidak bisa di-forward-fill
+            raise ValueError(f"{ex.name}: center harus <= right dan <= -left untuk mode batch")
+
+    n_frames, n_bodies = poses.shape[:2]
+    if timestamps is None:
+        timestamps = np.arange(n_frames, dtype=np.float64)
+    timestamps = np.asarray(timestamps)
+    if target_mask is None:
+        target_mask = np.ones((n_frames, n_bodies), dtype=bool)
+
+    metrics = compiled.metrics(poses)  # (gerakan, frames, bodies)
+
+    counts = {}
+    rep_times = {}
+    for name in registry.names:
+        counts[name] = np.zeros(n_bodies, dtype=np.int64)
+        rep_times[name] = [timestamps[:0] for _ in range(n_bodies)]
+
+    for i, name in enumerate(compiled.names):
+        m = metrics[i]
+        if compiled.hysteresis[i]:
+            signed = m * compiled.sign[i]
+            active = target_mask & (signed < compiled.enter[i])
+            rest = target_mask & (signed > compiled.exit[i])
+        else:
+            m = m - compiled.neutral[i]
+            active = target_mask & ((m > compiled.right[i]) | (m < compiled.left[i]))
+            rest = target_mask & (np.abs(m) < compiled.center[i])
+
+        # +1 = up / miring, -1 = down / tengah; 'up' menang atas 'down' seperti if/elif di RepCounter
+        event = np.where(active, 1, np.where(rest, -1, 0)).astype(np.int8)
+        prev_state = _previous_state(event, initial=-1)
+        if compiled.hysteresis[i]:
+            # rep dihitung saat naik dari keadaan down
+            reps = (event == 1) & (prev_state == -1)
+        else:
+            # rep dihitung saat kembali ke tengah setelah miring
+            reps = (event == -1) & (prev_state == 1)
+        counts[name] = reps.sum(axis=0)
+        rep_times[name] = [timestamps[reps[:, b]] for b in range(n_bodies)]
+    return BatchResult(counts, rep_times)
+
+
+def poses_from_frames(frames):
+    """Kumpulkan frame dari sebuah FrameSource menjadi (timestamps, poses) untuk mode batch."""
+    frames = list(frames)
+    n_bodies = 1 + max((b.index for f in frames for b in f.bodies), default=-1)
+    poses = np.full((len(frames), n_bodies, K4ABT_JOINT_COUNT, 3), np.nan)
+    timestamps = np.empty(len(frames))
+    for i, frame in enumerate(frames):
+        timestamps[i] = frame.timestamp
+        for body in frame.bodies:
+            poses[i, body.index] = body.positions
+    return timestamps, poses
@@ -0,0 +1,264 @@
+"""Benchmark jalur per-frame dengan skeleton sintetis (tanpa kamera).
+
+Mengukur tiap stage secara terpisah untuk 1..N body: latensi p50/p99, frame/detik
+(dari jumlah waktu semua stage), dan alokasi per frame (pass terpisah dengan
+tracemalloc supaya overhead-nya tidak masuk ke angka waktu). Hasil ditulis ke
+file JSON agar bisa dibandingkan antar run:
+
+    python benchmark.py --out hasil.json
+    python benchmark.py --baseline hasil.json   # tampilkan rasio p50 terhadap run sebelumnya
+    python benchmark.py --render-scale 0.5 --crop-roi   # stage overlay dengan output diperkecil
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from frame_analysis import FrameResult, compute_roi, select_roi_target
+from identity_tracker import IdentityTracker, shoulder_centers
+from joint_filter import JointFilter
+from kinect_joints import K4ABT_JOINT_COUNT
+from pose_log import PoseLogWriter
+from proximity import ProximityMonitor, distance_texts
+from rep_analytics import SessionSummary
+from rep_counter import RepCounter
+from projection import PixelBuffers
+from synthetic import SyntheticSkeletons, synthetic_projector
+
+try:
+    from renderer import Renderer  # butuh OpenCV
+except ImportError:
+    Renderer = None
+
+IMAGE_W, IMAGE_H = 1280, 720  # resolusi warna 720P
+
+
+class FrameBench:
+    """Menjalankan stage-stage `analyze()` + overlay pada satu frame, masing-masing sebagai callable terpisah."""
+
+    def __init__(self, log_path, render_options=None):
+        self.projector = synthetic_projector()
+        self.roi = compute_roi(IMAGE_W, IMAGE_H)
+        self.tracker = IdentityTracker()
+        self.proximity = ProximityMonitor()
+        self.summary = SessionSummary()
+        self.counter = RepCounter(verbose=False, on_rep=self.summary.add)
+        self.joint_filter = JointFilter()
+        self.log = PoseLogWriter(log_path)
+        self.image = self.renderer = None
+        if render_options is not None and Renderer is not None:
+            self.image = np.zeros((IMAGE_H, IMAGE_W, 4), dtype=np.uint8)
+            self.renderer = Renderer((IMAGE_W, IMAGE_H), self.roi, max_fps=None, show=False, **render_options)
+        self.selected_track_id = None
+        self.frame = None
+        self.centers = None
+        # buffer per frame yang dipakai ulang, sama dengan WorkoutSession
+        self.centers_buffer = np.empty((16, 3))
+        self.positions_buffer = np.empty((16 * K4ABT_JOINT_COUNT, 3))
+        self.pixel_buffers = PixelBuffers()
+        self.pixels = self.valid = None
+        self.distance_texts = []
+        self.filtered = []
+        self.labels = []
+
+        self.stages = [
+            ("identity", self.identity),
+            ("projection", self.projection),
+            ("roi_select", self.roi_select),
+            ("distances", self.distances),
+            ("filter", self.filter),
+            ("reps", self.reps),
+            ("pose_log", self.pose_log),
+        ]
+        if self.image is not None:
+            self.stages.append(("overlay", self.overlay))
+
+    def identity(self):
+        if len(self.frame.bodies) > len(self.centers_buffer):
+            self.centers_buffer = np.empty((2 * len(self.frame.bodies), 3))
+        self.centers = shoulder_centers(self.frame.bodies, self.centers_buffer)
+        for track_id in self.tracker.update(self.frame.timestamp, self.frame.bodies, self.centers):
+            self.counter.forget(track_id)
+            self.joint_filter.forget(track_id)
+
+    def projection(self):
+        n_points = len(self.frame.bodies) * K4ABT_JOINT_COUNT
+        if n_points > len(self.positions_buffer):
+            self.positions_buffer = np.empty((2 * n_points, 3))
+        all_positions = np.concatenate([b.positions for b in self.frame.bodies], out=self.positions_buffer[:n_points])
+        self.pixels, self.valid = self.projector.project_pixels(all_positions, self.pixel_buffers.get(n_points))
+
+    def roi_select(self):
+        self.selected_track_id = select_roi_target(self.frame.bodies, self.projector, self.roi,
+                                                   self.selected_track_id, self.centers)
+
+    def distances(self):
+        prox, _ = self.proximity.update(self.frame.bodies, self.centers)
+        self.distance_texts = distance_texts(prox)
+
+    def filter(self):
+        self.filtered = [self.joint_filter.apply(b.track_id, self.frame.timestamp, b.positions, b.confidence)
+                         for b in self.frame.bodies]
+
+    def reps(self):
+        labels = []
+        for body, positions in zip(self.frame.bodies, self.filtered):
+            is_target = body.track_id == self.selected_track_id
+            self.counter.update(body.track_id, positions, is_target, self.counter.compute_metrics(positions),
+                                self.frame.timestamp)
+            labels.append(self.counter.label(body.track_id, is_target))
+        self.labels = labels
+
+    def pose_log(self):
+        # di workout.py ini berjalan di thread writer; diukur di sini sebagai biaya serialisasinya
+        self.log.write_frame(self.frame.timestamp, self.frame.bodies)
+
+    def overlay(self):
+        selected_body_index = next((b.index for b in self.frame.bodies
+                                    if b.track_id == self.selected_track_id), None)
+        self.frame.color_image = self.image
+        result = FrameResult(self.frame, self.roi[:4], selected_body_index, self.labels,
+                             self.distance_texts, self.pixels, self.valid)
+        self.renderer.compose(result)
+
+    def close(self):
+        self.log.close()
+
+
+def _percentiles_us(samples_ns):
+    arr = np.asarray(samples_ns, dtype=np.float64) / 1000.0
+    return {"p50_us": round(float(np.percentile(arr, 50)), 2),
+            "p99_us": round(float(np.percentile(arr, 99)), 2),
+            "mean_us": round(float(arr.mean()), 2)}
+
+
+def bench_bodies(num_bodies, frames, warmup, seed, render_options, tmpdir):
+    """Ukur semua stage untuk `num_bodies` body. Return dict hasil."""
+    source = list(SyntheticSkeletons(num_bodies, warmup + frames, seed=seed))
+
+    # pass 1: waktu
+    bench = FrameBench(os.path.join(tmpdir, f"timing_{num_bodies}.poselog"), render_options)
+    names = [name for name, _ in bench.stages]
+    timings = {name: [] for name in names}
+    frame_ns = []
+    clock = time.perf_counter_ns
+    for n, frame in enumerate(source):
+        bench.frame = frame
+        total = 0
+        for name, fn in bench.stages:
+            t0 = clock()
+            fn()
+            dt = clock() - t0
+            total += dt
+            if n >= warmup:
+                timings[name].append(dt)
+        if n >= warmup:
+            frame_ns.append(total)
+    bench.close()
+
+    # pass 2: alokasi (puncak byte selama stage + sisa blok setelah stage)
+    bench = FrameBench(os.path.join(tmpdir, f"alloc_{num_bodies}.poselog"), render_options)
+    peak_bytes = {name: 0 for name in names}
+    net_blocks = {name: 0 for name in names}
+    tracemalloc.start()
+    for n, frame in enumerate(source):
+        bench.frame = frame
+        for name, fn in bench.stages:
+            blocks0 = sys.getallocatedblocks()
+            current0, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            if n >= warmup:
+                peak_bytes[name] += peak - current0
+                net_blocks[name] += sys.getallocatedblocks() - blocks0
+    tracemalloc.stop()
+    bench.close()
+
+    stages = {}
+    for name in names:
+        st = _percentiles_us(timings[name])
+        st["alloc_peak_bytes_per_frame"] = round(peak_bytes[name] / frames, 1)
+        st["net_blocks_per_frame"] = round(net_blocks[name] / frames, 2)
+        stages[name] = st
+
+    frame_stats = _percentiles_us(frame_ns)
+    return {
+        "bodies": num_bodies,
+        "frames": frames,
+        "fps": round(1e9 * len(frame_ns) / sum(frame_ns), 1),
+        "frame_p50_us": frame_stats["p50_us"],
+        "frame_p99_us": frame_stats["p99_us"],
+        "stages": stages,
+    }
+
+
+def run_benchmark(max_bodies=10, frames=300, warmup=30, seed=0, render_options=None):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = [bench_bodies(n, frames, warmup, seed, render_options, tmpdir) for n in range(1, max_bodies + 1)]
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "overlay": render_options if Renderer is not None else None,
+            "frames": frames,
+            "warmup": warmup,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def print_report(report, baseline=None):
+    base = {r["bodies"]: r for r in baseline["results"]} if baseline else {}
+    for r in report["results"]:
+        print(f"\n{r['bodies']} body: {r['fps']:.0f} fps  "
+              f"(frame p50 {r['frame_p50_us']:.0f} us, p99 {r['frame_p99_us']:.0f} us)")
+        for name, st in r["stages"].items():
+            line = (f"  {name:<11} p50 {st['p50_us']:>9.1f} us  p99 {st['p99_us']:>9.1f} us  "
+                    f"alloc {st['alloc_peak_bytes_per_frame']:>9.0f} B/frame")
+            old = base.get(r["bodies"], {}).get("stages", {}).get(name)
+            if old and old["p50_us"] > 0:
+                line += f"  x{st['p50_us'] / old['p50_us']:.2f} vs baseline"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark stage per-frame dengan skeleton sintetis")
+    parser.add_argument("--max-bodies", type=int, default=10)
+    parser.add_argument("--frames", type=int, default=300, help="frame terukur per jumlah body")
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-overlay", action="store_true", help="lewati stage gambar overlay (OpenCV)")
+    parser.add_argument("--render-scale", type=float, default=1.0, help="skala output stage overlay")
+    parser.add_argument("--crop-roi", action="store_true", help="stage overlay hanya menggambar area ROI")
+    parser.add_argument("--out", default="benchmark_results.json", help="file JSON hasil")
+    parser.add_argument("--baseline", help="file JSON run sebelumnya untuk perbandingan")
+    args = parser.parse_args(argv)
+
+    if Renderer is None and not args.no_overlay:
+        print("OpenCV tidak tersedia: stage overlay dilewati")
+
+    render_options = None if args.no_overlay else {"scale": args.render_scale, "crop_to_roi": args.crop_roi}
+    report = run_benchmark(args.max_bodies, args.frames, args.warmup, args.seed, render_options)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil disimpan ke {args.out}")
+
+
+if __name__ == "__main__":
+    main()
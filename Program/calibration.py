@@ -0,0 +1,238 @@
+"""Kalibrasi threshold otomatis per orang dari jendela pemanasan singkat.
+
+Alur per track: `neutral_seconds` berdiri diam (rata-rata & simpangan metrik, panjang
+segmen tubuh), lalu untuk setiap gerakan terpilih secara berurutan `sample_seconds` repetisi
+contoh gerakan itu saja (nilai ekstrem metrik; label menampilkan nama gerakan yang diminta).
+Puncak suatu gerakan hanya diambil dari jendela contohnya sendiri, sehingga side bend tidak
+menggeser threshold shoulder dan sebaliknya. Semua statistik dihitung streaming (Welford +
+min/max berjalan) tanpa menyimpan frame.
+Hasilnya registry baru (`ExerciseRegistry.with_overrides`) yang di-cache per track
+selama sesi dan dipasang ke penghitung lewat `RepCounter.set_thresholds`. Selama jendela
+contoh repetisi sudah dihitung dengan threshold sementara: default yang diskalakan panjang
+segmen user (dan posisi netral side bend) dari fase diam.
+
+Threshold per jenis gerakan (n = rata-rata netral, s = simpangan netral, P = puncak contoh):
+    hysteresis : r = |n - P|; up = P + UP_FRACTION*r, down = P + DOWN_FRACTION*r (dari arah puncak),
+                 deadzone = max(DEADZONE_FRACTION*r, NOISE_SIGMAS*s), maksimal UP_FRACTION*r/2
+    bilateral  : neutral = n; right / left = BEND_FRACTION x simpangan terjauh sisi itu,
+                 center = max(CENTER_FRACTION x sisi terkecil, NOISE_SIGMAS*s), dengan jarak minimal
+                 NOISE_SIGMAS*s ke right/left (tanpa celah itu noise saat miring terhitung berulang)
+Gerakan (atau sisi) yang tidak dicontohkan - simpangan < MIN_EXCURSION_FRACTION x panjang
+`scale_segment` - memakai threshold default yang diskalakan panjang segmen user / `scale_reference`.
+Begitu juga contoh yang jauh di luar default terskala itu, misal karena yang diperagakan bukan gerakan
+yang diminta: puncak hysteresis yang tidak melewati `down` default atau melampaui `up` default lebih dari
+FALLBACK_FRACTION x panjang segmen, dan threshold sisi side bend yang berselisih sejauh itu dari default.
+"""
+import numpy as np
+
+NEUTRAL_SECONDS = 3.0   # berdiri diam
+SAMPLE_SECONDS = 6.0    # ~2 repetisi contoh per gerakan terpilih (berurutan)
+MIN_FRAMES = 3          # frame valid minimal per fase (fase diperpanjang jika kurang)
+
+UP_FRACTION = 0.3
+DOWN_FRACTION = 0.6
+DEADZONE_FRACTION = 0.03
+BEND_FRACTION = 0.35
+CENTER_FRACTION = 0.4
+NOISE_SIGMAS = 3.0
+MIN_EXCURSION_FRACTION = 0.2  # dari panjang segmen acuan
+MIN_EXCURSION_MM = 50.0       # gerakan tanpa scale_segment
+FALLBACK_FRACTION = 0.5       # dari panjang segmen acuan: contoh sejauh ini di luar default -> pakai default
+FALLBACK_MM = 150.0           # gerakan tanpa scale_segment
+
+PHASE_NEUTRAL = "neutral"
+PHASE_SAMPLE = "sample"
+
+
+class RunningStats:
+    """Mean, varian (Welford), min, dan max streaming per elemen vektor; NaN dilewati."""
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self, n):
+        self.count = np.zeros(n)
+        self.mean = np.zeros(n)
+        self.m2 = np.zeros(n)
+        self.min = np.full(n, np.inf)
+        self.max = np.full(n, -np.inf)
+
+    def update(self, values):
+        valid = np.isfinite(values)
+        self.count += valid
+        delta = np.where(valid, values - self.mean, 0.0)
+        self.mean += np.divide(delta, self.count, out=np.zeros_like(delta), where=valid)
+        self.m2 += delta * np.where(valid, values - self.mean, 0.0)
+        np.fmin(self.min, values, out=self.min)
+        np.fmax(self.max, values, out=self.max)
+
+    @property
+    def std(self):
+        return np.sqrt(np.divide(self.m2, self.count - 1, out=np.zeros_like(self.m2), where=self.count > 1))
+
+    def summary(self):
+        """Mean, std, min, max dengan NaN untuk elemen yang belum pernah valid."""
+        empty = self.count == 0
+        mean = np.where(empty, np.nan, self.mean)
+        return mean, self.std, np.where(empty, np.nan, self.min), np.where(empty, np.nan, self.max)
+
+
+def _center(side, noise):
+    """Zona tengah side bend: di atas noise diam, tetapi tetap berjarak dari threshold miring."""
+    center = max(CENTER_FRACTION * side, NOISE_SIGMAS * noise)
+    if side - center < NOISE_SIGMAS * noise:
+        center = max(side - NOISE_SIGMAS * noise, 0.5 * side)
+    return center
+
+
+def _side(excursion, default, min_excursion, reach):
+    """Threshold satu sisi side bend (positif) dari simpangan terjauh contoh, atau `default`."""
+    if not excursion >= min_excursion:
+        return default
+    derived = BEND_FRACTION * excursion
+    return derived if abs(derived - default) <= reach else default
+
+
+class _TrackCalibration:
+    __slots__ = ("phase", "phase_start", "last_timestamp", "frames", "exercise", "neutral", "limbs", "sample")
+
+    def __init__(self, n, timestamp):
+        self.phase = PHASE_NEUTRAL
+        self.phase_start = timestamp
+        self.last_timestamp = timestamp
+        self.frames = 0
+        self.exercise = 0               # indeks gerakan yang sedang dicontohkan (fase sample)
+        self.neutral = RunningStats(n)  # metrik saat diam
+        self.limbs = RunningStats(n)    # panjang segmen acuan tiap gerakan
+        self.sample = RunningStats(n)   # metrik tiap gerakan selama jendela contohnya sendiri
+
+
+class ThresholdCalibrator:
+    """Kalibrasi threshold semua gerakan terpilih untuk banyak orang, dikunci dengan `track_id`."""
+
+    def __init__(self, registry, selected_exercise="all", neutral_seconds=NEUTRAL_SECONDS,
+                 sample_seconds=SAMPLE_SECONDS):
+        self.registry = registry
+        self.compiled = registry.compile(selected_exercise)
+        self.neutral_seconds = neutral_seconds
+        self.sample_seconds = sample_seconds
+        self.tracks = {}     # track_id -> _TrackCalibration (sedang berjalan)
+        self.overrides = {}  # track_id -> parameter hasil kalibrasi
+        self.results = {}    # track_id -> registry hasil kalibrasi
+
+        segments = self.compiled.segments
+        self._has_segment = segments[:, 0] >= 0
+        self._segment_a = np.where(self._has_segment, segments[:, 0], 0)
+        self._segment_b = np.where(self._has_segment, segments[:, 1], 0)
+        self._window = np.eye(len(self.compiled), dtype=bool)  # baris i: hanya metrik gerakan ke-i
+
+    def calibrated(self, key):
+        """Registry hasil kalibrasi `key`, atau None jika belum selesai."""
+        return self.results.get(key)
+
+    def segment_lengths(self, positions):
+        """Panjang segmen acuan tiap gerakan (mm) untuk satu skeleton; NaN jika tidak ada."""
+        lengths = np.linalg.norm(positions[self._segment_a] - positions[self._segment_b], axis=-1)
+        lengths[~self._has_segment] = np.nan
+        return lengths
+
+    def counting(self, key):
+        """True jika repetisi `key` sudah boleh dihitung (jendela contoh atau kalibrasi selesai)."""
+        st = self.tracks.get(key)
+        return key in self.results if st is None else st.phase == PHASE_SAMPLE
+
+    def update(self, key, timestamp, positions, metrics=None):
+        """Tambahkan satu frame untuk `key`.
+
+        Return registry threshold baru saat berganti - sementara (default terskala) di akhir fase diam,
+        lalu hasil kalibrasi tepat sekali saat selesai - selain itu None.
+        """
+        if key in self.results:
+            return None
+        st = self.tracks.get(key)
+        if st is None:
+            st = self.tracks[key] = _TrackCalibration(len(self.compiled), timestamp)
+        st.last_timestamp = timestamp
+        m = self.compiled.metrics(positions) if metrics is None else metrics
+
+        if st.phase == PHASE_NEUTRAL:
+            st.neutral.update(m)
+            st.limbs.update(self.segment_lengths(positions))
+            st.frames += np.isfinite(m).any()
+            if timestamp - st.phase_start < self.neutral_seconds or st.frames < MIN_FRAMES:
+                return None
+            st.phase, st.phase_start, st.frames = PHASE_SAMPLE, timestamp, 0
+            return self.registry.with_overrides(self.derive(st))  # sampel masih kosong: default terskala
+
+        i = st.exercise
+        st.sample.update(np.where(self._window[i], m, np.nan))
+        st.frames += np.isfinite(m[i])
+        if timestamp - st.phase_start < self.sample_seconds or st.frames < MIN_FRAMES:
+            return None
+        st.exercise += 1
+        st.phase_start, st.frames = timestamp, 0
+        if st.exercise < len(self.compiled):
+            return None
+
+        del self.tracks[key]
+        self.overrides[key] = self.derive(st)
+        registry = self.results[key] = self.registry.with_overrides(self.overrides[key])
+        return registry
+
+    def status(self, key):
+        """Teks singkat untuk label di atas kepala selama kalibrasi."""
+        st = self.tracks.get(key)
+        if st is None:
+            return "Kalibrasi selesai" if key in self.results else "Kalibrasi"
+        if st.phase == PHASE_NEUTRAL:
+            left, text = self.neutral_seconds, "berdiri diam"
+        else:
+            left, text = self.sample_seconds, f"contoh {self.compiled.exercises[st.exercise].title}"
+        left = max(left - (st.last_timestamp - st.phase_start), 0.0)
+        return f"Kalibrasi: {text} {left:.0f}s"
+
+    def derive(self, st):
+        """Parameter threshold ("<gerakan>_<param>" -> nilai) dari statistik satu track."""
+        c = self.compiled
+        neutral, noise, _, _ = st.neutral.summary()
+        limb = st.limbs.summary()[0]
+        _, _, low, high = st.sample.summary()
+        scale = np.where(np.isfinite(limb), limb / c.scale_reference, np.nan)
+        min_excursion = np.where(np.isfinite(limb), MIN_EXCURSION_FRACTION * limb, MIN_EXCURSION_MM)
+        reach = np.where(np.isfinite(limb), FALLBACK_FRACTION * limb, FALLBACK_MM)
+
+        overrides = {}
+        for i, ex in enumerate(c.exercises):
+            n = neutral[i]
+            if not np.isfinite(n):
+                continue  # metrik tidak pernah valid saat diam: biarkan default
+            p = ex.params
+            k = scale[i] if np.isfinite(scale[i]) else 1.0
+            if ex.type == "hysteresis":
+                sign = c.sign[i]
+                default = {"up": p["up"] * k, "down": p["down"] * k, "deadzone": p["deadzone"] * k}
+                # dalam nilai bertanda, "naik" selalu berarti mengecil
+                peak = low[i] if sign > 0 else -high[i]
+                excursion = sign * n - peak
+                # puncak contoh harus melewati down default dan tidak jauh melampaui up default
+                plausible = sign * default["up"] - reach[i] <= peak <= sign * default["down"]
+                if np.isfinite(excursion) and excursion >= min_excursion[i] and plausible:
+                    values = {"up": sign * (peak + UP_FRACTION * excursion),
+                              "down": sign * (peak + DOWN_FRACTION * excursion),
+                              # deadzone tidak boleh mendorong zona up melewati puncak contoh
+                              "deadzone": min(max(DEADZONE_FRACTION * excursion, NOISE_SIGMAS * noise[i]),
+                                              0.5 * UP_FRACTION * excursion)}
+                else:
+                    values = default
+            else:
+                right = _side(high[i] - n, p["right"] * k, min_excursion[i], reach[i])
+                left = -_side(n - low[i], -p["left"] * k, min_excursion[i], reach[i])
+                side = min(right, -left)
+                values = {"right": right, "left": left, "neutral": n,
+                          "center": _center(side, noise[i])}
+            for name, value in values.items():
+                overrides[f"{ex.name}_{name}"] = round(float(value), 1)
+        return overrides
+
+    def forget(self, key):
+        self.tracks.pop(key, None)
+        self.overrides.pop(key, None)
+        self.results.pop(key, None)
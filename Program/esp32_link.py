@@ -0,0 +1,520 @@
+"""Protokol serial biner PC <-> ESP32: frame ber-CRC, nomor urut, ACK/retry, update state digabung.
+
+Layout frame (semua angka multi-byte little-endian kecuali CRC):
+    SYNC (0xA5) | tipe (uint8) | seq (uint8) | panjang payload (uint8) | payload | CRC16 (big-endian)
+CRC-16/CCITT-FALSE (poly 0x1021, awal 0xFFFF) dihitung atas tipe, seq, panjang, dan payload.
+Byte di luar frame (misal teks boot ESP32) dilewati; penerima sinkron ulang pada SYNC berikutnya.
+
+Tipe pesan:
+    STATE (PC -> ESP32) : track target (uint16, 0xFFFF = tidak ada), mask milestone (uint16, bit i =
+                          gerakan ke-i sudah mencapai milestone), flag (uint8, bit 0 = target total
+                          tercapai), lalu hitungan tiap gerakan (uint16 x n)
+    NAMES (PC -> ESP32) : n (uint8) lalu per gerakan label dan pesan LED ("RED"/"YELLOW"/"GREEN"),
+                          masing-masing diakhiri NUL
+    ACK   (ESP32 -> PC) : seq frame yang diterima, payload 1 byte status (bit 0 = NAMES sudah diterima)
+
+STATE selalu berisi keadaan lengkap (bukan event), sehingga update yang datang lebih cepat dari
+`send_interval` cukup digabung menjadi yang terbaru tanpa ada milestone yang hilang. PC mengirim
+satu frame lalu menunggu ACK (`ack_timeout`), mengulang maksimal `max_retries` kali; STATE yang
+sama dikirim ulang tiap `keepalive` detik sehingga ESP32 yang baru reset langsung pulih (ACK-nya
+melaporkan NAMES belum ada, lalu NAMES dikirim ulang).
+
+Uji tanpa hardware: `FakeEsp32` menjalankan logika parser yang sama dengan esp32_oled_workout.ino,
+`LoopbackPort.pair()` menyambungkannya ke `SerialLink` (opsional dengan frame hilang / rusak):
+    python esp32_link.py simulate --loss 0.2 --corrupt 0.1
+    python esp32_link.py pty        # (Linux/macOS) emulator di pseudo-terminal, hubungkan workout ke sana
+"""
+import argparse
+import binascii
+import os
+import random
+import struct
+import threading
+import time
+
+SYNC = 0xA5
+MSG_STATE = 0x01
+MSG_NAMES = 0x02
+MSG_ACK = 0x80
+MAX_PAYLOAD = 64
+MAX_EXERCISES = 16           # lebar mask milestone
+NO_TARGET = 0xFFFF
+FLAG_SUCCESS = 0x01
+ACK_NAMES_OK = 0x01
+
+SEND_INTERVAL = 0.1          # detik, laju maksimum update state (10 Hz)
+ACK_TIMEOUT = 0.1            # detik menunggu ACK per percobaan
+MAX_RETRIES = 3
+KEEPALIVE = 1.0              # detik, kirim ulang state terakhir walaupun tidak berubah
+
+_HEADER = struct.Struct("<BBBB")
+_STATE = struct.Struct("<HHB")
+
+
+def crc16(data, crc=0xFFFF):
+    return binascii.crc_hqx(data, crc)
+
+
+def encode_frame(msg_type, seq, payload=b""):
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"payload maksimal {MAX_PAYLOAD} byte, dapat {len(payload)}")
+    body = bytes((msg_type, seq & 0xFF, len(payload))) + payload
+    return bytes((SYNC,)) + body + crc16(body).to_bytes(2, "big")
+
+
+class FrameDecoder:
+    """Parser frame streaming: `feed(data)` -> list (tipe, seq, payload) frame yang CRC-nya valid."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.frames = 0
+        self.bad_crc = 0
+        self.skipped = 0  # byte di luar frame
+
+    def feed(self, data):
+        buf = self._buffer
+        buf += data
+        frames = []
+        while True:
+            start = buf.find(SYNC)
+            if start < 0:
+                self.skipped += len(buf)
+                buf.clear()
+                break
+            if start:
+                self.skipped += start
+                del buf[:start]
+            if len(buf) < _HEADER.size:
+                break
+            _, msg_type, seq, length = _HEADER.unpack_from(buf)
+            if length > MAX_PAYLOAD:
+                self.skipped += 1
+                del buf[:1]
+                continue
+            end = _HEADER.size + length + 2
+            if len(buf) < end:
+                break
+            body = bytes(buf[1:end - 2])
+            if crc16(body) != int.from_bytes(buf[end - 2:end], "big"):
+                # SYNC palsu atau frame rusak: geser satu byte dan cari SYNC berikutnya
+                self.bad_crc += 1
+                del buf[:1]
+                continue
+            frames.append((msg_type, seq, body[3:]))
+            self.frames += 1
+            del buf[:end]
+        return frames
+
+
+def encode_state(track_id, counts=(), milestones=(), success=False):
+    if len(counts) > MAX_EXERCISES:
+        raise ValueError(f"maksimal {MAX_EXERCISES} gerakan, dapat {len(counts)}")
+    mask = 0
+    for i, reached in enumerate(milestones):
+        if reached:
+            mask |= 1 << i
+    track = NO_TARGET if track_id is None else int(track_id) & 0xFFFF
+    return (_STATE.pack(track, mask, FLAG_SUCCESS if success else 0)
+            + struct.pack(f"<{len(counts)}H", *(min(int(c), 0xFFFF) for c in counts)))
+
+
+def decode_state(payload):
+    """-> (track_id atau None, hitungan, flag milestone, success)."""
+    track, mask, flags = _STATE.unpack_from(payload)
+    n = (len(payload) - _STATE.size) // 2
+    counts = list(struct.unpack_from(f"<{n}H", payload, _STATE.size))
+    milestones = [bool(mask >> i & 1) for i in range(n)]
+    return (None if track == NO_TARGET else track), counts, milestones, bool(flags & FLAG_SUCCESS)
+
+
+def encode_names(labels, messages):
+    parts = [bytes((len(labels),))]
+    for label, message in zip(labels, messages):
+        parts.append(label.encode("ascii", "replace") + b"\0" + (message or "").encode("ascii", "replace") + b"\0")
+    payload = b"".join(parts)
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"label + pesan gerakan terlalu panjang untuk satu frame ({len(payload)} byte)")
+    return payload
+
+
+def decode_names(payload):
+    """-> (labels, messages)."""
+    fields = payload[1:].split(b"\0")
+    n = payload[0]
+    labels = [f.decode("ascii") for f in fields[0:2 * n:2]]
+    messages = [f.decode("ascii") for f in fields[1:2 * n:2]]
+    return labels, messages
+
+
+class SerialLink:
+    """Kirim state progres ke ESP32 dari thread sendiri dengan ACK/retry dan laju dibatasi.
+
+    `port` cukup punya `write(bytes)`, `read(n)` (menunggu maksimal `port.timeout`), `in_waiting`,
+    dan `close()` - `serial.Serial` atau `LoopbackPort`. `labels` / `messages` per gerakan dikirim
+    sekali dalam frame NAMES (dan lagi setiap ESP32 melaporkan belum menerimanya).
+    """
+
+    def __init__(self, port, labels, messages, send_interval=SEND_INTERVAL, ack_timeout=ACK_TIMEOUT,
+                 max_retries=MAX_RETRIES, keepalive=KEEPALIVE):
+        if len(labels) > MAX_EXERCISES:
+            raise ValueError(f"maksimal {MAX_EXERCISES} gerakan, dapat {len(labels)}")
+        self.port = port
+        self.send_interval = send_interval
+        self.ack_timeout = ack_timeout
+        self.max_retries = max_retries
+        self.keepalive = keepalive
+        self._names = encode_names(labels, messages)
+        self._names_needed = True
+        self._decoder = FrameDecoder()
+        self._seq = 0
+
+        self._cond = threading.Condition()
+        self._state = None     # payload STATE terakhir yang diterbitkan
+        self._pending = None   # payload yang belum terkirim (selalu yang terbaru)
+        self._closed = False
+        self._last_send = -float("inf")
+
+        # statistik (dibaca lewat stats())
+        self.published = 0
+        self.coalesced = 0     # update yang tergantikan sebelum sempat dikirim
+        self.sent = 0          # frame ditulis ke port (termasuk retry)
+        self.acked = 0
+        self.retries = 0
+        self.failed = 0        # frame tanpa ACK setelah semua retry
+        self.keepalives = 0
+        self.errors = 0
+        self.rtt_total = 0.0
+        self.rtt_max = 0.0
+
+        port.timeout = ack_timeout
+        self._thread = threading.Thread(target=self._run, name="esp32-link", daemon=True)
+        self._thread.start()
+
+    def publish(self, track_id, counts=(), milestones=(), success=False):
+        """Terbitkan progres target terbaru (tidak pernah menunggu port). Return False jika link ditutup."""
+        payload = encode_state(track_id, counts, milestones, success)
+        with self._cond:
+            if self._closed:
+                return False
+            if payload == (self._state if self._pending is None else self._pending):
+                return True  # tidak ada perubahan; keepalive yang menyegarkan
+            self.published += 1
+            if self._pending is not None:
+                self.coalesced += 1
+            self._state = self._pending = payload
+            self._cond.notify_all()
+        return True
+
+    def _next_payload(self):
+        """Tunggu sampai ada state untuk dikirim (laju dibatasi) atau keepalive jatuh tempo; None = selesai."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._pending is not None:
+                    wait = self._last_send + self.send_interval - now
+                    if wait <= 0 or self._closed:
+                        payload, self._pending = self._pending, None
+                        return payload
+                elif self._closed:
+                    return None
+                elif self._state is not None:
+                    wait = self._last_send + self.keepalive - now
+                    if wait <= 0:
+                        self.keepalives += 1
+                        return self._state
+                else:
+                    wait = None
+                self._cond.wait(wait)
+
+    def _run(self):
+        while True:
+            payload = self._next_payload()
+            if payload is None:
+                break
+            self._last_send = time.monotonic()
+            if self._names_needed:
+                self._transfer(MSG_NAMES, self._names)
+            self._transfer(MSG_STATE, payload)
+            if self._names_needed:
+                # ACK STATE dari ESP32 yang baru reset: pulihkan NAMES sekarang, tanpa menunggu keepalive
+                self._transfer(MSG_NAMES, self._names)
+        try:
+            self.port.close()
+        except Exception as e:
+            print(f"[esp32] Gagal menutup port: {e}")
+
+    def _transfer(self, msg_type, payload):
+        """Kirim satu frame dan tunggu ACK-nya, ulang jika perlu. Return True jika di-ACK."""
+        seq = self._seq
+        self._seq = (seq + 1) & 0xFF
+        frame = encode_frame(msg_type, seq, payload)
+        for attempt in range(1 + self.max_retries):
+            if attempt:
+                self.retries += 1
+            start = time.perf_counter()
+            try:
+                self.port.write(frame)
+                self.sent += 1
+                acked = self._await_ack(seq)
+            except Exception as e:
+                self.errors += 1
+                print(f"[esp32] Gagal mengirim: {e}")
+                return False
+            if acked:
+                elapsed = time.perf_counter() - start
+                self.acked += 1
+                self.rtt_total += elapsed
+                if elapsed > self.rtt_max:
+                    self.rtt_max = elapsed
+                return True
+        self.failed += 1
+        return False
+
+    def _await_ack(self, seq):
+        deadline = time.monotonic() + self.ack_timeout
+        while time.monotonic() < deadline:
+            data = self.port.read(self.port.in_waiting or 1)
+            for msg_type, ack_seq, payload in self._decoder.feed(data):
+                if msg_type == MSG_ACK and payload:
+                    self._names_needed = not payload[0] & ACK_NAMES_OK
+                    if ack_seq == seq:
+                        return True
+        return False
+
+    def close(self, timeout=None):
+        """Kirim state yang masih tertunda, hentikan thread, lalu tutup port. Return True jika selesai."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def stats(self):
+        return {
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "sent": self.sent,
+            "acked": self.acked,
+            "retries": self.retries,
+            "failed": self.failed,
+            "keepalives": self.keepalives,
+            "errors": self.errors,
+            "bad_crc": self._decoder.bad_crc,
+            "rtt_avg_ms": (self.rtt_total / self.acked * 1000.0) if self.acked else 0.0,
+            "rtt_max_ms": self.rtt_max * 1000.0,
+        }
+
+
+class FakeEsp32:
+    """Emulator sisi ESP32 (logika sama dengan esp32_oled_workout.ino): `feed(data)` -> byte balasan (ACK)."""
+
+    def __init__(self):
+        self._decoder = FrameDecoder()
+        self._last_seq = None
+        self.labels = None
+        self.messages = None
+        self.track_id = None
+        self.counts = []
+        self.milestones = []
+        self.success = False
+        self.applied = 0     # frame baru yang diterapkan
+        self.duplicates = 0  # retry untuk frame yang sudah diterapkan (ACK hilang)
+
+    @property
+    def leds(self):
+        """Pesan LED ("RED", ...) yang menyala."""
+        return {m for m, reached in zip(self.messages or (), self.milestones) if reached and m}
+
+    def reset(self):
+        """Seperti ESP32 reboot: semua state hilang."""
+        self.__init__()
+
+    def _apply_names(self, payload):
+        """Seperti applyNames(): payload terpotong (field tanpa NUL) diabaikan, NAMES tetap belum ada."""
+        if not payload:
+            return
+        n = min(payload[0], MAX_EXERCISES)
+        if len(payload[1:].split(b"\0")) < 2 * n + 1:
+            return
+        self.labels, self.messages = decode_names(payload)
+
+    def feed(self, data):
+        reply = bytearray()
+        for msg_type, seq, payload in self._decoder.feed(data):
+            if msg_type not in (MSG_STATE, MSG_NAMES):
+                continue
+            # NAMES diurai dulu: status di ACK melaporkan hasilnya (haveNames di .ino)
+            if msg_type == MSG_NAMES and seq != self._last_seq:
+                self._apply_names(payload)
+            # ACK dikirim sebelum apa pun digambar, supaya OLED yang lambat tidak memicu retry
+            status = ACK_NAMES_OK if self.labels is not None else 0
+            reply += encode_frame(MSG_ACK, seq, bytes((status,)))
+            if seq == self._last_seq:
+                self.duplicates += 1
+                continue
+            self._last_seq = seq
+            self.applied += 1
+            if msg_type == MSG_STATE and len(payload) >= _STATE.size:
+                self.track_id, counts, milestones, self.success = decode_state(payload)
+                if self.track_id is not None:
+                    self.counts, self.milestones = counts, milestones
+        return bytes(reply)
+
+
+class LoopbackPort:
+    """Satu ujung sambungan serial di memori (antarmuka mirip `serial.Serial`), dibuat lewat `pair()`.
+
+    `loss` = peluang satu `write` hilang seluruhnya, `corrupt` = peluang satu byte di dalamnya rusak.
+    """
+
+    def __init__(self, loss=0.0, corrupt=0.0, seed=None):
+        self.timeout = None
+        self.loss = loss
+        self.corrupt = corrupt
+        self.peer = None
+        self._rng = random.Random(seed)
+        self._buffer = bytearray()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    @classmethod
+    def pair(cls, loss=0.0, corrupt=0.0, seed=None):
+        a, b = cls(loss, corrupt, seed), cls(loss, corrupt, None if seed is None else seed + 1)
+        a.peer, b.peer = b, a
+        return a, b
+
+    @property
+    def in_waiting(self):
+        with self._cond:
+            return len(self._buffer)
+
+    def write(self, data):
+        data = bytearray(data)
+        if self._rng.random() < self.loss:
+            return len(data)
+        if data and self._rng.random() < self.corrupt:
+            data[self._rng.randrange(len(data))] ^= 1 << self._rng.randrange(8)
+        peer = self.peer
+        with peer._cond:
+            peer._buffer += data
+            peer._cond.notify_all()
+        return len(data)
+
+    def read(self, size=1):
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._cond:
+            while not self._buffer and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return data
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def serve(port, device, stop):
+    """Pompa byte dari `port` ke emulator `device` dan kirim balasannya sampai `stop` di-set."""
+    port.timeout = 0.05
+    while not stop.is_set():
+        data = port.read(port.in_waiting or 1)
+        if data:
+            reply = device.feed(data)
+            if reply:
+                port.write(reply)
+
+
+class _PtyPort:
+    """Ujung master pseudo-terminal dengan antarmuka `read` / `write` / `in_waiting` minimal."""
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.timeout = None
+
+    @property
+    def in_waiting(self):
+        return 0
+
+    def read(self, size=1):
+        import select
+        ready, _, _ = select.select([self.fd], [], [], self.timeout)
+        return os.read(self.fd, max(size, 256)) if ready else b""
+
+    def write(self, data):
+        return os.write(self.fd, data)
+
+
+def simulate(seconds, loss, corrupt, reboot_at, seed):
+    """Jalankan SerialLink melawan FakeEsp32 lewat loopback berderau; return (stats, emulator, state akhir)."""
+    pc_port, esp_port = LoopbackPort.pair(loss, corrupt, seed)
+    device = FakeEsp32()
+    stop = threading.Event()
+    server = threading.Thread(target=serve, args=(esp_port, device, stop), daemon=True)
+    server.start()
+
+    link = SerialLink(pc_port, ["Knee", "Sh", "Side"], ["RED", "YELLOW", "GREEN"])
+    rng = random.Random(seed)
+    counts = [0, 0, 0]
+    start = time.monotonic()
+    rebooted = reboot_at is None
+    while time.monotonic() - start < seconds:
+        if rng.random() < 0.1:
+            counts[rng.randrange(3)] += 1
+        if not rebooted and time.monotonic() - start >= reboot_at:
+            device.reset()
+            rebooted = True
+        link.publish(1, counts, [c >= 7 for c in counts], sum(counts) >= 15)
+        time.sleep(1 / 30)  # laju analitik
+    # beri waktu satu keepalive supaya state terakhir pasti sampai walaupun frame terakhir hilang
+    time.sleep(KEEPALIVE + SEND_INTERVAL)
+    link.close(timeout=5)
+    stop.set()
+    server.join()
+    return link.stats(), device, counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji protokol serial ESP32 tanpa hardware")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sim = sub.add_parser("simulate", help="SerialLink <-> emulator ESP32 lewat loopback berderau")
+    sim.add_argument("--seconds", type=float, default=5.0)
+    sim.add_argument("--loss", type=float, default=0.1, help="peluang satu write hilang")
+    sim.add_argument("--corrupt", type=float, default=0.05, help="peluang satu byte rusak per write")
+    sim.add_argument("--reboot-at", type=float, default=None, help="reset emulator setelah N detik")
+    sim.add_argument("--seed", type=int, default=0)
+    sub.add_parser("pty", help="emulator ESP32 di pseudo-terminal (Linux/macOS)")
+    args = parser.parse_args(argv)
+
+    if args.command == "simulate":
+        stats, device, counts = simulate(args.seconds, args.loss, args.corrupt, args.reboot_at, args.seed)
+        print(" ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in stats.items()))
+        print(f"ESP32: label={device.labels} hitungan={device.counts} LED={sorted(device.leds)} "
+              f"selesai={device.success} duplikat={device.duplicates}")
+        ok = device.counts == counts and device.labels is not None
+        print(f"PC: hitungan={counts} -> {'SAMA' if ok else 'BERBEDA'}")
+        return 0 if ok else 1
+
+    if not hasattr(os, "openpty"):
+        parser.error("pty tidak tersedia di sistem ini, gunakan 'simulate'")
+    import tty
+    master, slave = os.openpty()
+    tty.setraw(slave)  # tanpa echo / konversi baris, byte biner lewat apa adanya
+    print(f"Emulator ESP32 di {os.ttyname(slave)} (set port serial workout.py ke sini). Ctrl+C untuk keluar.")
+    device = FakeEsp32()
+    stop = threading.Event()
+    try:
+        serve(_PtyPort(master), device, stop)
+    except KeyboardInterrupt:
+        pass
+    print(f"Terakhir: label={device.labels} track={device.track_id} hitungan={device.counts} "
+          f"LED={sorted(device.leds)} selesai={device.success}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
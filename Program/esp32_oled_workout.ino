@@ -12,6 +12,158 @@ Adafruit_SSD1306 display(SCREEN_WIDTH, SCREEN_HEIGHT, &Wire, -1);
 #define LED_YELLOW  27   // LED Kuning -> GPIO27
 #define LED_GREEN   26   // LED Hijau  -> GPIO26
 
+// ---------------------------------------------------------------------------
+// Protokol biner dari PC (detail lengkap di esp32_link.py):
+//   0xA5 | tipe | seq | panjang | payload | CRC16 (CCITT-FALSE, big-endian, atas tipe..payload)
+//   STATE : track (u16, 0xFFFF = tidak ada), mask milestone (u16), flag (u8, bit0 = total tercapai),
+//           hitungan tiap gerakan (u16 x n); semua little-endian
+//   NAMES : n (u8) lalu per gerakan "label\0pesanLED\0" (pesan LED: RED / YELLOW / GREEN)
+//   ACK   : dikirim balik untuk setiap frame valid, payload 1 byte (bit0 = NAMES sudah diterima)
+// ---------------------------------------------------------------------------
+#define SYNC          0xA5
+#define MSG_STATE     0x01
+#define MSG_NAMES     0x02
+#define MSG_ACK       0x80
+#define MAX_PAYLOAD   64
+#define MAX_EXERCISES 16
+#define LABEL_LEN     12
+#define NO_TARGET     0xFFFF
+#define FLAG_SUCCESS  0x01
+#define ACK_NAMES_OK  0x01
+
+#define HEADER_LEN    4                              // SYNC, tipe, seq, panjang
+#define FRAME_MAX     (HEADER_LEN + MAX_PAYLOAD + 2)
+
+// Byte frame yang sedang dibaca (rx[0] selalu SYNC). Disimpan utuh supaya saat SYNC ternyata palsu
+// (panjang / CRC salah) pencarian bisa diulang mulai byte sesudahnya, sama seperti FrameDecoder di PC.
+uint8_t rx[FRAME_MAX];
+uint8_t rxLen = 0;
+uint8_t frameType, frameSeq, frameLen;
+uint8_t payload[MAX_PAYLOAD];
+
+int lastSeq = -1;           // seq frame terakhir yang diterapkan (retry dengan seq sama cukup di-ACK)
+bool haveNames = false;
+uint8_t exerciseCount = 0;
+char labels[MAX_EXERCISES][LABEL_LEN];
+int ledPins[MAX_EXERCISES];  // -1 = gerakan tanpa LED
+
+uint16_t targetTrack = NO_TARGET;
+uint16_t milestoneMask = 0;
+uint8_t stateFlags = 0;
+uint8_t countLen = 0;
+uint16_t counts[MAX_EXERCISES];
+bool dirty = true;          // OLED perlu digambar ulang
+
+uint16_t crc16(const uint8_t* data, size_t len, uint16_t crc = 0xFFFF) {
+  for (size_t i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (uint8_t b = 0; b < 8; b++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+void sendAck(uint8_t seq) {
+  uint8_t frame[7] = {SYNC, MSG_ACK, seq, 1, (uint8_t)(haveNames ? ACK_NAMES_OK : 0), 0, 0};
+  uint16_t crc = crc16(frame + 1, 4);
+  frame[5] = crc >> 8;
+  frame[6] = crc & 0xFF;
+  Serial.write(frame, sizeof(frame));
+}
+
+int ledForMessage(const char* message) {
+  if (strcmp(message, "RED") == 0) return LED_RED;
+  if (strcmp(message, "YELLOW") == 0) return LED_YELLOW;
+  if (strcmp(message, "GREEN") == 0) return LED_GREEN;
+  return -1;
+}
+
+void applyNames() {
+  uint8_t n = min((int)payload[0], MAX_EXERCISES);
+  uint8_t pos = 1;
+  for (uint8_t i = 0; i < n; i++) {
+    // label lalu pesan LED, masing-masing diakhiri NUL
+    const char* label = (const char*)&payload[pos];
+    size_t len = strnlen(label, frameLen - pos);
+    if (pos + len >= frameLen) return;  // payload terpotong: abaikan
+    strncpy(labels[i], label, LABEL_LEN - 1);
+    labels[i][LABEL_LEN - 1] = '\0';
+    pos += len + 1;
+    const char* message = (const char*)&payload[pos];
+    len = strnlen(message, frameLen - pos);
+    if (pos + len >= frameLen) return;
+    ledPins[i] = ledForMessage(message);
+    pos += len + 1;
+  }
+  exerciseCount = n;
+  haveNames = true;
+  dirty = true;
+}
+
+void applyState() {
+  if (frameLen < 5) return;
+  targetTrack = payload[0] | (payload[1] << 8);
+  if (targetTrack == NO_TARGET) {
+    dirty = true;  // hitungan & LED terakhir dibiarkan, OLED menampilkan "menunggu target"
+    return;
+  }
+  milestoneMask = payload[2] | (payload[3] << 8);
+  stateFlags = payload[4];
+  countLen = min((frameLen - 5) / 2, MAX_EXERCISES);
+  for (uint8_t i = 0; i < countLen; i++) {
+    counts[i] = payload[5 + 2 * i] | (payload[6 + 2 * i] << 8);
+  }
+  dirty = true;
+}
+
+void handleFrame() {
+  if (frameType != MSG_STATE && frameType != MSG_NAMES) return;
+  if (frameType == MSG_NAMES) {
+    if (frameSeq != lastSeq) applyNames();
+  }
+  // ACK dulu sebelum menggambar OLED (lambat), supaya PC tidak mengulang kirim
+  sendAck(frameSeq);
+  if (frameSeq == lastSeq) return;  // retry karena ACK sebelumnya hilang
+  lastSeq = frameSeq;
+  if (frameType == MSG_STATE) applyState();
+}
+
+// Buang `n` byte awal rx lalu lewati sampai SYNC berikutnya
+void dropBytes(uint8_t n) {
+  while (n < rxLen && rx[n] != SYNC) n++;
+  rxLen -= n;
+  memmove(rx, rx + n, rxLen);
+}
+
+// Parser byte demi byte (tanpa String): byte di luar frame dilewati, frame rusak dibuang oleh CRC.
+// SYNC palsu (panjang > MAX_PAYLOAD atau CRC salah) hanya menggeser satu byte, jadi frame asli yang
+// dimulai di tengah byte yang sudah terbaca tetap ditemukan.
+void parseByte(uint8_t c) {
+  if (rxLen == 0 && c != SYNC) return;
+  rx[rxLen++] = c;
+  while (rxLen >= HEADER_LEN) {
+    uint8_t len = rx[3];
+    if (len > MAX_PAYLOAD) {
+      dropBytes(1);
+      continue;
+    }
+    uint8_t total = HEADER_LEN + len + 2;
+    if (rxLen < total) return;
+    uint16_t crc = crc16(rx + 1, HEADER_LEN - 1 + len);
+    if (crc != (((uint16_t)rx[total - 2] << 8) | rx[total - 1])) {
+      dropBytes(1);
+      continue;
+    }
+    frameType = rx[1];
+    frameSeq = rx[2];
+    frameLen = len;
+    memcpy(payload, rx + HEADER_LEN, len);
+    handleFrame();
+    dropBytes(total);
+  }
+}
+
 // Fungsi bantu untuk menampilkan tulisan di OLED
 void showMessage(const char* line1, const char* line2 = "") {
   display.clearDisplay();
@@ -25,6 +177,38 @@ void showMessage(const char* line1, const char* line2 = "") {
   display.display();
 }
 
+void drawState() {
+  display.clearDisplay();
+  display.setTextSize(1);
+  display.setTextColor(WHITE);
+  display.setCursor(0, 0);
+  if (targetTrack == NO_TARGET) {
+    display.println("Menunggu target...");
+  } else {
+    display.print("Target #");
+    display.println(targetTrack);
+  }
+  // maksimal 5 baris gerakan + 1 baris status di layar 128x64
+  for (uint8_t i = 0; i < countLen && i < 5; i++) {
+    if (haveNames && i < exerciseCount) display.print(labels[i]);
+    else { display.print("Gerakan "); display.print(i + 1); }
+    display.print(": ");
+    display.print(counts[i]);
+    if (milestoneMask & (1 << i)) display.print(" *");
+    display.println();
+  }
+  if (stateFlags & FLAG_SUCCESS) display.println("Semua Selesai!");
+  display.display();
+}
+
+void updateLeds() {
+  // LED gerakan menyala setelah milestone tercapai (state dari PC, jadi aman diulang)
+  if (!haveNames) return;
+  for (uint8_t i = 0; i < exerciseCount && i < countLen; i++) {
+    if (ledPins[i] >= 0 && (milestoneMask & (1 << i))) digitalWrite(ledPins[i], HIGH);
+  }
+}
+
 void setup() {
   Serial.begin(115200);
 
@@ -47,53 +231,20 @@ void setup() {
 
   // Pesan awal di OLED
   showMessage("Belum ada data");
+  dirty = false;
+  // teks biasa tetap boleh: PC melewati byte di luar frame
   Serial.println("ESP32 siap, menunggu data serial...");
 }
 
 void loop() {
-  if (Serial.available()) {
-    String msg = Serial.readStringUntil('\n');
-    msg.trim();  // buang spasi & newline
-
-    if (msg.length() == 0) return;
-
-    Serial.print("Terima dari PC: ");
-    Serial.println(msg);
-
-    if (msg == "RED") {
-      // Knee Raise 7x
-      showMessage("Knee Raise", "7x Selesai");
-      digitalWrite(LED_RED, HIGH);
-      // Kalau mau hanya 1 LED yang nyala, bisa:
-      // digitalWrite(LED_YELLOW, LOW);
-      // digitalWrite(LED_GREEN, LOW);
-    }
-    else if (msg == "YELLOW") {
-      // Shoulder Front Raise 7x
-      showMessage("Shoulder Raise", "7x Selesai");
-      digitalWrite(LED_YELLOW, HIGH);
-      // digitalWrite(LED_RED, LOW);
-      // digitalWrite(LED_GREEN, LOW);
-    }
-    else if (msg == "GREEN") {
-      // Side Bend 7x
-      showMessage("Side Bend", "7x Selesai");
-      digitalWrite(LED_GREEN, HIGH);
-      // digitalWrite(LED_RED, LOW);
-      // digitalWrite(LED_YELLOW, LOW);
-    }
-    else if (msg == "SUCCESS") {
-      // Total rep >= 15
-      showMessage("Semua Latihan", "Selesai!");
-      // Kalau mau semua LED ON:
-      // digitalWrite(LED_RED, HIGH);
-      // digitalWrite(LED_YELLOW, HIGH);
-      // digitalWrite(LED_GREEN, HIGH);
-    }
-    else {
-      // Data lain, kalau nanti kamu kirim teks berbeda
-      showMessage("Data:", msg.c_str());
-    }
+  // kuras semua byte yang sudah masuk dulu, baru gambar sekali (PC membatasi update ~10 Hz)
+  while (Serial.available()) {
+    parseByte(Serial.read());
+  }
+  if (dirty) {
+    dirty = false;
+    updateLeds();
+    drawState();
   }
 
   // Tidak pakai delay besar supaya respon ke serial tetap cepat
@@ -0,0 +1,283 @@
+"""Registry gerakan deklaratif.
+
+Setiap gerakan didefinisikan di `exercises.json`: ekspresi metrik atas joint
+(misal "head.x - pelvis.x"), jenis state machine + threshold hysteresis, jumlah
+milestone, dan pesan notifikasi ESP32. `ExerciseRegistry.compile()` mengubah
+gerakan yang dipilih menjadi satu fungsi Python yang menghitung semua metriknya
+sekaligus plus tabel threshold NumPy, dipakai oleh `RepCounter` (per frame) dan
+`batch_counter` (seluruh rekaman).
+
+Jenis state machine:
+    "hysteresis" : rep dihitung saat metrik masuk zona `up` (dengan `deadzone`) dari keadaan down,
+                   kembali down saat melewati `down`. `direction` "below" = naik berarti metrik
+                   mengecil (knee raise), "above" = metrik membesar.
+    "bilateral"  : dari tengah, metrik > `right` atau < `left` = miring; rep dihitung saat
+                   kembali ke |metrik| < `center` (side bend). Semua dibandingkan terhadap
+                   metrik - `neutral` (opsional, default 0; diisi kalibrasi per orang).
+
+`scale_segment` (opsional): dua joint yang panjang segmennya dipakai kalibrasi untuk
+menskalakan threshold default, yang disetel untuk segmen sepanjang `scale_reference` mm.
+
+Ekspresi metrik: nama joint (`K4ABT_JOINT_NAMES` dengan spasi -> "_", misal left_knee,
+spine_navel) + .x/.y/.z, angka, + - * / **, dan fungsi abs, sqrt, min, max, hypot.
+"""
+import ast
+import json
+import os
+
+import numpy as np
+
+from kinect_joints import K4ABT_JOINT_NAMES
+
+DEFAULT_EXERCISES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exercises.json")
+
+EXERCISE_TYPES = ("hysteresis", "bilateral")
+DIRECTIONS = ("below", "above")
+TYPE_PARAMS = {
+    "hysteresis": ("up", "down", "deadzone"),
+    "bilateral": ("right", "left", "center"),
+}
+OPTIONAL_PARAMS = {
+    "hysteresis": {},
+    "bilateral": {"neutral": 0.0},
+}
+GLOBAL_PARAMS = ("milestone_reps", "total_target_reps")
+
+# nama joint di ekspresi -> indeks joint
+JOINT_IDS = {name.replace(" - ", "_").replace(" ", "_"): i for i, name in enumerate(K4ABT_JOINT_NAMES)}
+AXES = {"x": 0, "y": 1, "z": 2}
+FUNCTIONS = {"abs": np.abs, "sqrt": np.sqrt, "min": np.minimum, "max": np.maximum, "hypot": np.hypot}
+
+_ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Constant, ast.Attribute, ast.Name,
+                  ast.Load, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+
+
+class _JointToIndex(ast.NodeTransformer):
+    """`left_knee.y` -> `p[..., 19, 1]` sehingga ekspresi berlaku untuk satu skeleton maupun array banyak frame/body."""
+
+    def visit_Attribute(self, node):
+        if not (isinstance(node.value, ast.Name) and node.value.id in JOINT_IDS and node.attr in AXES):
+            raise ValueError(f"atribut tidak valid: {ast.unparse(node)!r} (gunakan <joint>.x/.y/.z)")
+        index = ast.Tuple([ast.Constant(Ellipsis), ast.Constant(JOINT_IDS[node.value.id]),
+                           ast.Constant(AXES[node.attr])], ast.Load())
+        return ast.Subscript(ast.Name("p", ast.Load()), index, ast.Load())
+
+
+def compile_metric(expression):
+    """Validasi ekspresi metrik dan return source Python-nya dalam variabel `p` (array pose)."""
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"ekspresi metrik tidak valid {expression!r}: {e.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"{type(node).__name__} tidak diizinkan di ekspresi metrik {expression!r}")
+        if isinstance(node, ast.Call):
+            if not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS) or node.keywords:
+                raise ValueError(f"fungsi tidak dikenal di {expression!r} (tersedia: {', '.join(FUNCTIONS)})")
+        elif isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"konstanta {node.value!r} tidak diizinkan di {expression!r}")
+        elif isinstance(node, ast.Name) and node.id not in FUNCTIONS and node.id not in JOINT_IDS:
+            raise ValueError(f"nama tidak dikenal {node.id!r} di {expression!r}")
+    tree = _JointToIndex().visit(tree)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in JOINT_IDS:
+            raise ValueError(f"joint {node.id!r} di {expression!r} harus diikuti .x/.y/.z")
+    return ast.unparse(tree)
+
+
+class ExerciseDef:
+    """Satu gerakan dari file konfigurasi."""
+    __slots__ = ("name", "title", "label", "metric", "type", "direction", "params",
+                 "milestone_reps", "message", "info", "scale_segment", "scale_reference", "source")
+
+    def __init__(self, name, metric, type, params, direction="below", title=None, label=None,
+                 milestone_reps=7, message=None, info=None, scale_segment=None, scale_reference=None):
+        if type not in EXERCISE_TYPES:
+            raise ValueError(f"{name}: type harus salah satu dari {EXERCISE_TYPES}, dapat {type!r}")
+        if direction not in DIRECTIONS:
+            raise ValueError(f"{name}: direction harus salah satu dari {DIRECTIONS}, dapat {direction!r}")
+        missing = [p for p in TYPE_PARAMS[type] if p not in params]
+        if missing:
+            raise ValueError(f"{name}: parameter {', '.join(missing)} wajib untuk type {type!r}")
+        if (scale_segment is None) != (scale_reference is None):
+            raise ValueError(f"{name}: scale_segment dan scale_reference harus diisi bersamaan")
+        if scale_segment is not None:
+            if len(scale_segment) != 2 or any(j not in JOINT_IDS for j in scale_segment):
+                raise ValueError(f"{name}: scale_segment harus dua nama joint, dapat {scale_segment!r}")
+            if float(scale_reference) <= 0:
+                raise ValueError(f"{name}: scale_reference harus > 0, dapat {scale_reference!r}")
+        self.name = name
+        self.title = title or name
+        self.label = label or name
+        self.metric = metric
+        self.type = type
+        self.direction = direction
+        self.params = {p: float(params[p]) for p in TYPE_PARAMS[type]}
+        for p, default in OPTIONAL_PARAMS[type].items():
+            self.params[p] = float(params.get(p, default))
+        self.milestone_reps = int(milestone_reps)
+        self.message = message
+        self.info = info
+        self.scale_segment = None if scale_segment is None else tuple(scale_segment)
+        self.scale_reference = None if scale_reference is None else float(scale_reference)
+        self.source = compile_metric(metric)
+
+    @classmethod
+    def from_dict(cls, d):
+        d = dict(d)
+        try:
+            name, metric, type_ = d.pop("name"), d.pop("metric"), d.pop("type")
+        except KeyError as e:
+            raise ValueError(f"definisi gerakan tanpa field {e.args[0]!r}: {d}") from None
+        accepted = TYPE_PARAMS.get(type_, ()) + tuple(OPTIONAL_PARAMS.get(type_, ()))
+        params = {p: d.pop(p) for p in accepted if p in d}
+        return cls(name, metric, type_, params, **d)
+
+    def to_dict(self):
+        d = {"name": self.name, "title": self.title, "label": self.label, "metric": self.metric,
+             "type": self.type}
+        if self.type == "hysteresis":
+            d["direction"] = self.direction
+        d.update(self.params)
+        d.update(milestone_reps=self.milestone_reps, message=self.message, info=self.info)
+        if self.scale_segment is not None:
+            d.update(scale_segment=list(self.scale_segment), scale_reference=self.scale_reference)
+        return d
+
+
+class ExerciseRegistry:
+    def __init__(self, exercises, total_target_reps=15, success_message="SUCCESS"):
+        names = [ex.name for ex in exercises]
+        if len(set(names)) != len(names):
+            raise ValueError(f"nama gerakan harus unik: {names}")
+        if "all" in names:
+            raise ValueError("'all' tidak boleh dipakai sebagai nama gerakan")
+        self.exercises = list(exercises)
+        self.total_target_reps = int(total_target_reps)
+        self.success_message = success_message
+
+    @property
+    def names(self):
+        return tuple(ex.name for ex in self.exercises)
+
+    @property
+    def choices(self):
+        return self.names + ("all",)
+
+    def get(self, name):
+        for ex in self.exercises:
+            if ex.name == name:
+                return ex
+        raise KeyError(name)
+
+    def selected(self, selected_exercise="all"):
+        if selected_exercise == "all":
+            return list(self.exercises)
+        if selected_exercise not in self.names:
+            raise ValueError(f"exercise tidak dikenal: {selected_exercise!r}")
+        return [self.get(selected_exercise)]
+
+    def parameters(self):
+        """Semua parameter yang bisa di-override sebagai dict datar: "<gerakan>_<param>" -> nilai,
+        plus "milestone_reps" (berlaku untuk semua gerakan) dan "total_target_reps"."""
+        result = {}
+        for ex in self.exercises:
+            for p, value in ex.params.items():
+                result[f"{ex.name}_{p}"] = value
+        milestones = {ex.milestone_reps for ex in self.exercises}
+        result["milestone_reps"] = milestones.pop() if len(milestones) == 1 else None
+        result["total_target_reps"] = self.total_target_reps
+        return result
+
+    def with_overrides(self, overrides):
+        """Registry baru dengan parameter dari `parameters()` diganti. Nilai None diabaikan."""
+        known = self.parameters()
+        unknown = [k for k in overrides if k not in known]
+        if unknown:
+            raise ValueError(f"parameter tidak dikenal: {', '.join(unknown)}")
+        exercises = []
+        for ex in self.exercises:
+            d = ex.to_dict()
+            for p in ex.params:
+                value = overrides.get(f"{ex.name}_{p}")
+                if value is not None:
+                    d[p] = value
+            if overrides.get("milestone_reps") is not None:
+                d["milestone_reps"] = overrides["milestone_reps"]
+            exercises.append(ExerciseDef.from_dict(d))
+        total = overrides.get("total_target_reps")
+        return ExerciseRegistry(exercises, self.total_target_reps if total is None else total, self.success_message)
+
+    def compile(self, selected_exercise="all"):
+        return CompiledExercises(self.selected(selected_exercise), self)
+
+
+class CompiledExercises:
+    """Gerakan terpilih dalam bentuk siap-evaluasi: satu fungsi metrik + array threshold per gerakan."""
+
+    def __init__(self, exercises, registry):
+        self.exercises = exercises
+        self.names = tuple(ex.name for ex in exercises)
+        self.labels = [ex.label for ex in exercises]
+        self.messages = [(ex.message, ex.info) for ex in exercises]
+        self.milestone_reps = np.array([ex.milestone_reps for ex in exercises], dtype=np.int32)
+        self.total_target_reps = registry.total_target_reps
+        self.success_message = registry.success_message
+        n = len(exercises)
+
+        # hysteresis: metrik dikali `sign` supaya "naik" selalu berarti nilai < enter
+        self.hysteresis = np.array([ex.type == "hysteresis" for ex in exercises], dtype=bool)
+        self.bilateral = ~self.hysteresis
+        self.sign = np.ones(n)
+        self.enter = np.full(n, np.nan)
+        self.exit = np.full(n, np.nan)
+        self.right = np.full(n, np.nan)
+        self.left = np.full(n, np.nan)
+        self.center = np.full(n, np.nan)
+        self.neutral = np.zeros(n)
+        # segmen acuan kalibrasi: indeks dua joint (-1 = tidak ada) dan panjang acuannya
+        self.segments = np.full((n, 2), -1, dtype=np.intp)
+        self.scale_reference = np.full(n, np.nan)
+        for i, ex in enumerate(exercises):
+            if ex.scale_segment is not None:
+                self.segments[i] = [JOINT_IDS[j] for j in ex.scale_segment]
+                self.scale_reference[i] = ex.scale_reference
+            p = ex.params
+            if ex.type == "hysteresis":
+                if ex.direction == "below":
+                    self.enter[i] = p["up"] - p["deadzone"]
+                    self.exit[i] = p["down"] + p["deadzone"]
+                else:
+                    self.sign[i] = -1.0
+                    self.enter[i] = -(p["up"] + p["deadzone"])
+                    self.exit[i] = -(p["down"] - p["deadzone"])
+            else:
+                self.right[i] = p["right"]
+                self.left[i] = p["left"]
+                self.center[i] = p["center"]
+                self.neutral[i] = p["neutral"]
+
+        # satu fungsi untuk semua metrik: hanya ekspresi gerakan terpilih yang dihitung
+        body = ", ".join(ex.source for ex in exercises)
+        namespace = dict(FUNCTIONS, __builtins__={})
+        exec(f"def _metrics(p):\n    return ({body},)", namespace)
+        self._metrics = namespace["_metrics"]
+
+    def __len__(self):
+        return len(self.names)
+
+    def metrics(self, positions):
+        """positions (..., K4ABT_JOINT_COUNT, 3) -> array (n_gerakan, ...) nilai metrik."""
+        return np.array(self._metrics(positions), dtype=np.float64)
+
+
+def load_registry(path=DEFAULT_EXERCISES_PATH):
+    with open(path) as f:
+        config = json.load(f)
+    exercises = [ExerciseDef.from_dict(d) for d in config.get("exercises", [])]
+    if not exercises:
+        raise ValueError(f"{path}: tidak ada gerakan terdefinisi")
+    return ExerciseRegistry(exercises,
+                            total_target_reps=config.get("total_target_reps", 15),
+                            success_message=config.get("success_message", "SUCCESS"))
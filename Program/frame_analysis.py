@@ -0,0 +1,70 @@
+"""Tahap analitik per frame yang tidak bergantung pada kamera: ROI dan pemilihan target."""
+from identity_tracker import shoulder_centers
+
+# Manual ROI config
+ROI_W = 320  # width in pixels
+ROI_H = 480  # height in pixels
+ROI_CX = None  # set to an int to fix center X; keep None to use image center
+ROI_CY = None  # set to an int to fix center Y; keep None to use image center
+
+
+class FrameResult:
+    """Hasil stage analitik untuk satu frame, diteruskan ke stage render."""
+    __slots__ = ("frame", "roi", "selected_body_index", "labels", "distance_texts", "joint_pixels", "joint_valid")
+
+    def __init__(self, frame, roi, selected_body_index, labels, distance_texts, joint_pixels, joint_valid):
+        self.frame = frame
+        self.roi = roi
+        self.selected_body_index = selected_body_index
+        self.labels = labels
+        self.distance_texts = distance_texts
+        self.joint_pixels = joint_pixels
+        self.joint_valid = joint_valid
+
+
+def compute_roi(w, h, roi_w=ROI_W, roi_h=ROI_H, roi_cx=ROI_CX, roi_cy=ROI_CY):
+    """Return (roi_x1, roi_y1, roi_x2, roi_y2, roi_cx, roi_cy) untuk gambar berukuran w x h."""
+    roi_cx = roi_cx if roi_cx is not None else w // 2
+    roi_cy = roi_cy if roi_cy is not None else h // 2
+
+    roi_x1 = max(0, roi_cx - roi_w // 2)
+    roi_y1 = max(0, roi_cy - roi_h // 2)
+    roi_x2 = min(w - 1, roi_cx + roi_w // 2)
+    roi_y2 = min(h - 1, roi_cy + roi_h // 2)
+    return roi_x1, roi_y1, roi_x2, roi_y2, roi_cx, roi_cy
+
+
+def select_roi_target(bodies, projector, roi, selected_track_id=None, centers=None):
+    """Pilih track_id body yang pusat bahunya paling dekat ke tengah ROI (2D).
+
+    Target sebelumnya (`selected_track_id`) yang masih di dalam ROI dipertahankan
+    supaya hitungan tidak berpindah ke orang lain. Return None jika tidak ada body di ROI.
+    `centers` = pusat bahu (N, 3) yang sudah dihitung untuk frame ini, jika ada.
+    """
+    if not bodies:
+        return None
+    roi_x1, roi_y1, roi_x2, roi_y2, roi_cx, roi_cy = roi
+
+    target_candidate = None
+    min_dist = float("inf")
+
+    if centers is None:
+        centers = shoulder_centers(bodies)
+    center_pixels, center_valid = projector.project_pixels(centers)
+
+    for b, (sx, sy), ok in zip(bodies, center_pixels.tolist(), center_valid):
+        if not ok:
+            continue
+
+        # Jika shoulder center berada di dalam ROI, pertimbangkan sebagai kandidat
+        if roi_x1 <= sx <= roi_x2 and roi_y1 <= sy <= roi_y2:
+            # target sebelumnya yang masih di ROI dipertahankan (tidak pindah ke orang lain)
+            if selected_track_id is not None and b.track_id == selected_track_id:
+                return selected_track_id
+            # hitung jarak ke pusat ROI (2D)
+            dist = (sx - roi_cx) ** 2 + (sy - roi_cy) ** 2
+            if dist < min_dist:
+                min_dist = dist
+                target_candidate = b.track_id
+
+    return target_candidate
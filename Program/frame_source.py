@@ -0,0 +1,155 @@
+"""Sumber frame skeleton: live dari Azure Kinect atau replay dari log pose CSV.
+
+Semua sumber menghasilkan objek `Frame` yang sama sehingga logika hitung repetisi
+bisa dijalankan tanpa kamera, jendela OpenCV, atau port serial.
+"""
+import csv
+import time
+
+import numpy as np
+
+from kinect_joints import K4ABT_JOINT_COUNT, JOINT_INDEX_BY_NAME
+
+CSV_HEADER = ['timestamp', 'body_index', 'joint_name', 'pos_x', 'pos_y', 'pos_z']
+
+
+class Skeleton:
+    """Satu body pada satu frame: posisi 3D (mm) semua joint dalam array (K4ABT_JOINT_COUNT, 3).
+
+    `body_id` = id dari Body Tracking SDK (None jika tidak tercatat, misal CSV lama);
+    `track_id` diisi oleh `IdentityTracker`.
+    """
+    __slots__ = ("index", "body_id", "positions", "confidence", "track_id")
+
+    def __init__(self, index, positions, body_id=None, confidence=None):
+        self.index = index
+        self.body_id = body_id
+        self.positions = positions
+        self.confidence = confidence
+        self.track_id = None
+
+
+class Frame:
+    """Satu frame body tracking. `color_image` / `body_frame` / `capture` hanya terisi pada sumber live."""
+    __slots__ = ("timestamp", "bodies", "color_image", "body_frame", "capture")
+
+    def __init__(self, timestamp, bodies, color_image=None, body_frame=None, capture=None):
+        self.timestamp = timestamp
+        self.bodies = bodies
+        self.color_image = color_image
+        self.body_frame = body_frame
+        self.capture = capture
+
+
+def skeleton_from_body(body_frame, index):
+    """Salin joint dari body pykinect ke array numpy (sekali per body per frame)."""
+    body = body_frame.get_body(index)
+    positions = np.empty((K4ABT_JOINT_COUNT, 3))
+    confidence = np.empty(K4ABT_JOINT_COUNT, dtype=np.uint8)
+    for j, joint in enumerate(body.joints):
+        p = joint.position
+        positions[j, 0] = p.x
+        positions[j, 1] = p.y
+        positions[j, 2] = p.z
+        confidence[j] = joint.confidence_level
+    return Skeleton(index, positions, body_id=body_frame.get_body_id(index), confidence=confidence)
+
+
+class KinectFrameSource:
+    """Sumber live: device.update() -> body_tracker.update() untuk setiap iterasi.
+
+    `captures()` dan `track()` bisa dijalankan di thread berbeda (lihat pipeline.py);
+    iterasi biasa menjalankan keduanya berurutan.
+    """
+
+    def __init__(self, device, body_tracker):
+        self.device = device
+        self.body_tracker = body_tracker
+
+    def captures(self, with_color=True):
+        """Frame berisi capture + gambar warna, belum ada body (bodies = None).
+
+        `with_color=False` (mode headless): gambar warna tidak diambil, `color_image` = None.
+        """
+        while True:
+            capture = self.device.update()
+            if not capture:
+                print("Gagal mendapatkan capture")
+                continue
+
+            color_image = None
+            if with_color:
+                ret_color, color_image = capture.get_color_image()
+                if not ret_color or color_image is None:
+                    continue
+
+            yield Frame(time.time(), None, color_image, capture=capture)
+
+    def track(self, frame):
+        """Jalankan body tracker untuk frame dari `captures()`. Return frame, atau None jika gagal."""
+        # Masukkan capture ke body tracker untuk diproses
+        body_frame = self.body_tracker.update(frame.capture)
+        if not body_frame:
+            print("Gagal mendapatkan body frame")
+            return None
+
+        frame.body_frame = body_frame
+        frame.bodies = [skeleton_from_body(body_frame, i) for i in range(body_frame.get_num_bodies())]
+        frame.capture = None  # capture tidak diperlukan lagi setelah tracking
+        return frame
+
+    def __iter__(self):
+        for frame in self.captures():
+            if self.track(frame) is not None:
+                yield frame
+
+
+class CsvReplaySource:
+    """Sumber replay dari `data_gerakan.csv` (format panjang: satu baris per joint).
+
+    Writer lama memanggil time.time() per joint, jadi timestamp tidak bisa dipakai
+    untuk mengelompokkan frame. Batas frame dideteksi dari urutan baris: frame baru
+    dimulai saat pasangan (body_index, joint) yang sama muncul lagi. Timestamp frame
+    = timestamp baris pertamanya. Joint yang tidak tercatat bernilai NaN.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header != CSV_HEADER:
+                raise ValueError(f"Header CSV tidak dikenal: {header}")
+
+            timestamp = None
+            bodies = {}
+            seen = set()
+            for row in reader:
+                if not row:
+                    continue
+                body_index = int(row[1])
+                joint = JOINT_INDEX_BY_NAME[row[2]]
+                key = (body_index, joint)
+                if key in seen:
+                    yield _build_frame(timestamp, bodies)
+                    timestamp = None
+                    bodies = {}
+                    seen.clear()
+                seen.add(key)
+                if timestamp is None:
+                    timestamp = float(row[0])
+                positions = bodies.get(body_index)
+                if positions is None:
+                    positions = bodies[body_index] = np.full((K4ABT_JOINT_COUNT, 3), np.nan)
+                positions[joint, 0] = float(row[3])
+                positions[joint, 1] = float(row[4])
+                positions[joint, 2] = float(row[5])
+
+            if seen:
+                yield _build_frame(timestamp, bodies)
+
+
+def _build_frame(timestamp, bodies):
+    return Frame(timestamp, [Skeleton(i, bodies[i]) for i in sorted(bodies)])
@@ -0,0 +1,119 @@
+"""Identitas orang yang stabil antar frame.
+
+`body_index` hanyalah urutan body di frame saat ini dan bisa teracak ketika ada
+orang masuk/keluar. `IdentityTracker` mencocokkan body ke track yang sudah ada:
+pertama lewat body id dari Body Tracking SDK (jika tersedia), lalu lewat jarak
+pusat bahu dengan matriks biaya. Track yang tidak terlihat lebih dari `ttl`
+detik dihapus, dan jumlah track dibatasi `max_tracks` (yang paling lama tidak
+terlihat dibuang duluan), sehingga state per orang tidak tumbuh tanpa batas
+walaupun sesi berjalan seharian atau SDK sempat membuat banyak body palsu.
+"""
+import numpy as np
+
+from kinect_joints import K4ABT_JOINT_SHOULDER_RIGHT, K4ABT_JOINT_SHOULDER_LEFT
+
+DEFAULT_MAX_DISTANCE = 500.0  # mm, perpindahan pusat bahu maksimum antar frame untuk dianggap orang yang sama
+DEFAULT_TTL = 5.0             # detik, track dihapus jika tidak terlihat selama ini
+DEFAULT_MAX_TRACKS = 32       # batas track hidup sekaligus (state per orang di counter/filter ikut terbatas)
+
+
+def shoulder_centers(bodies, out=None):
+    """Pusat bahu semua body sebagai array (N, 3).
+
+    `out` = array (>= N, 3) yang dipakai ulang antar frame; hasilnya `out[:N]`.
+    """
+    centers = np.empty((len(bodies), 3)) if out is None else out[:len(bodies)]
+    for i, body in enumerate(bodies):
+        p = body.positions
+        c = centers[i]
+        np.add(p[K4ABT_JOINT_SHOULDER_RIGHT], p[K4ABT_JOINT_SHOULDER_LEFT], out=c)
+        c /= 2.0
+    return centers
+
+
+class Track:
+    __slots__ = ("track_id", "body_id", "center", "last_seen")
+
+    def __init__(self, track_id, body_id, center, last_seen):
+        self.track_id = track_id
+        self.body_id = body_id
+        self.center = center
+        self.last_seen = last_seen
+
+
+class IdentityTracker:
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE, ttl=DEFAULT_TTL, max_tracks=DEFAULT_MAX_TRACKS):
+        if max_tracks < 1:
+            raise ValueError(f"max_tracks harus >= 1, dapat {max_tracks!r}")
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.max_tracks = max_tracks
+        self.tracks = {}  # track_id -> Track
+        self._next_id = 0
+
+    def update(self, timestamp, bodies, centers=None):
+        """Beri `track_id` ke setiap body (diset di `body.track_id`).
+
+        `centers` = hasil `shoulder_centers(bodies)` jika sudah dihitung untuk frame ini.
+        Return list track_id yang kedaluwarsa di frame ini (untuk membersihkan state).
+        """
+        if centers is None:
+            centers = shoulder_centers(bodies)
+        assigned = [None] * len(bodies)
+        free_tracks = dict(self.tracks)
+
+        # 1) body id dari SDK stabil selama orang tetap terlacak
+        by_body_id = {t.body_id: t for t in free_tracks.values() if t.body_id is not None}
+        for i, body in enumerate(bodies):
+            track = by_body_id.get(body.body_id) if body.body_id is not None else None
+            if track is not None and track.track_id in free_tracks:
+                assigned[i] = track.track_id
+                del free_tracks[track.track_id]
+
+        # 2) sisanya: pasangan greedy dengan biaya jarak pusat bahu terkecil
+        pending = [i for i in range(len(bodies)) if assigned[i] is None and np.isfinite(centers[i]).all()]
+        if pending and free_tracks:
+            track_list = list(free_tracks.values())
+            track_centers = np.array([t.center for t in track_list])
+            cost = np.linalg.norm(centers[pending][:, None, :] - track_centers[None, :, :], axis=2)
+            used_rows = set()
+            used_cols = set()
+            for flat in np.argsort(cost, axis=None):
+                r, c = divmod(int(flat), len(track_list))
+                if cost[r, c] > self.max_distance:
+                    break
+                if r in used_rows or c in used_cols:
+                    continue
+                used_rows.add(r)
+                used_cols.add(c)
+                assigned[pending[r]] = track_list[c].track_id
+
+        # 3) body tanpa pasangan = orang baru
+        for i, body in enumerate(bodies):
+            track_id = assigned[i]
+            if track_id is None:
+                track_id = self._next_id
+                self._next_id += 1
+                # disalin: `centers` bisa berupa buffer yang ditimpa frame berikutnya
+                self.tracks[track_id] = Track(track_id, body.body_id, centers[i].copy(), timestamp)
+            else:
+                track = self.tracks[track_id]
+                track.body_id = body.body_id
+                if np.isfinite(centers[i]).all():
+                    track.center[:] = centers[i]
+                track.last_seen = timestamp
+            body.track_id = track_id
+
+        return self.expire(timestamp)
+
+    def expire(self, timestamp):
+        expired = [tid for tid, t in self.tracks.items() if timestamp - t.last_seen > self.ttl]
+        for tid in expired:
+            del self.tracks[tid]
+        overflow = len(self.tracks) - self.max_tracks
+        if overflow > 0:
+            stale = sorted(self.tracks.values(), key=lambda t: t.last_seen)[:overflow]
+            for track in stale:
+                del self.tracks[track.track_id]
+                expired.append(track.track_id)
+        return expired
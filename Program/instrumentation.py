@@ -0,0 +1,167 @@
+"""Instrumentasi ringan: timer monotonic per stage, histogram bergulir, dan ekspor metrik.
+
+Setiap nama metrik menyimpan `window` durasi terakhir di ring buffer NumPy yang
+dialokasikan sekali, sehingga `observe()` murah dan memori tetap. Ringkasan
+(p50/p99/rata-rata/maks + laju per detik) dihitung hanya saat diminta: untuk HUD
+di layar, atau untuk dump berkala ke file (format teks Prometheus atau JSON lines).
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_WINDOW = 256  # observasi terakhir yang disimpan per metrik (~8 detik pada 30 fps)
+METRIC_PREFIX = "workout"
+DUMP_FORMATS = ("prometheus", "jsonl")
+
+
+class RollingHistogram:
+    """Ring buffer durasi (detik) + waktu observasi (untuk menghitung laju)."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.values = np.zeros(window)
+        self.times = np.zeros(window)
+        self.window = window
+        self.count = 0      # total observasi sejak awal
+        self.total = 0.0    # total durasi sejak awal
+
+    def add(self, value, now):
+        i = self.count % self.window
+        self.values[i] = value
+        self.times[i] = now
+        self.count += 1
+        self.total += value
+
+    def summary(self):
+        n = min(self.count, self.window)
+        if n == 0:
+            return None
+        values = self.values[:n]
+        p50, p99 = np.percentile(values, (50, 99))
+        rate = 0.0
+        if n > 1:
+            times = self.times[:n]
+            span = times.max() - times.min()
+            if span > 0:
+                rate = (n - 1) / span
+        return {
+            "count": self.count,
+            "sum_s": self.total,
+            "p50_ms": float(p50) * 1000.0,
+            "p99_ms": float(p99) * 1000.0,
+            "mean_ms": float(values.mean()) * 1000.0,
+            "max_ms": float(values.max()) * 1000.0,
+            "rate_hz": rate,
+        }
+
+
+class Metrics:
+    """Kumpulan histogram bernama. Aman dipakai dari beberapa thread stage sekaligus."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self._hists = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        now = time.monotonic()
+        with self._lock:
+            hist = self._hists.get(name)
+            if hist is None:
+                hist = self._hists[name] = RollingHistogram(self.window)
+            hist.add(seconds, now)
+
+    def timed(self, name, fn):
+        """Bungkus `fn` sehingga setiap panggilan dicatat sebagai durasi `name`."""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.observe(name, time.perf_counter() - start)
+        return wrapper
+
+    def snapshot(self):
+        """dict nama -> ringkasan (lihat RollingHistogram.summary), urut nama."""
+        with self._lock:
+            hists = sorted(self._hists.items())
+            result = {}
+            for name, hist in hists:
+                summary = hist.summary()
+                if summary is not None:
+                    result[name] = summary
+        return result
+
+
+def hud_lines(snapshot, fps_stage="render"):
+    """Teks HUD: FPS tampilan lalu satu baris p50/p99 per stage."""
+    lines = []
+    fps = snapshot.get(fps_stage)
+    if fps is not None:
+        lines.append(f"FPS {fps['rate_hz']:.1f}")
+    for name, st in snapshot.items():
+        lines.append(f"{name}: {st['p50_ms']:.1f} / {st['p99_ms']:.1f} ms")
+    return lines
+
+
+def format_prometheus(snapshot, prefix=METRIC_PREFIX):
+    """Format teks Prometheus (summary per stage, dalam detik)."""
+    name = f"{prefix}_stage_duration_seconds"
+    lines = [f"# HELP {name} Durasi per stage pipeline (jendela bergulir).",
+             f"# TYPE {name} summary"]
+    for stage, st in snapshot.items():
+        lines.append(f'{name}{{stage="{stage}",quantile="0.5"}} {st["p50_ms"] / 1000.0:.6f}')
+        lines.append(f'{name}{{stage="{stage}",quantile="0.99"}} {st["p99_ms"] / 1000.0:.6f}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {st["sum_s"]:.6f}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {st["count"]}')
+    rate = f"{prefix}_stage_rate_hz"
+    lines += [f"# HELP {rate} Laju stage per detik (jendela bergulir).", f"# TYPE {rate} gauge"]
+    for stage, st in snapshot.items():
+        lines.append(f'{rate}{{stage="{stage}"}} {st["rate_hz"]:.3f}')
+    return "\n".join(lines) + "\n"
+
+
+def dump_metrics(snapshot, path, fmt="prometheus"):
+    """Prometheus: tulis ulang file secara atomik (cocok untuk textfile collector). JSON lines: tambah satu baris."""
+    if fmt == "prometheus":
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(format_prometheus(snapshot))
+        os.replace(tmp, path)
+    elif fmt == "jsonl":
+        with open(path, "a") as f:
+            f.write(json.dumps({"time": time.time(), "stages": snapshot}) + "\n")
+    else:
+        raise ValueError(f"format harus salah satu dari {DUMP_FORMATS}, dapat {fmt!r}")
+
+
+class MetricsDumper:
+    """Thread yang menulis snapshot `metrics` ke `path` setiap `interval` detik, dan sekali lagi saat `close()`."""
+
+    def __init__(self, metrics, path, fmt="prometheus", interval=5.0):
+        if fmt not in DUMP_FORMATS:
+            raise ValueError(f"format harus salah satu dari {DUMP_FORMATS}, dapat {fmt!r}")
+        self.metrics = metrics
+        self.path = path
+        self.fmt = fmt
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-dump", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._dump()
+        self._dump()
+
+    def _dump(self):
+        try:
+            dump_metrics(self.metrics.snapshot(), self.path, self.fmt)
+        except OSError as e:
+            print(f"Gagal menulis metrik ke {self.path}: {e}")
+
+    def close(self, timeout=None):
+        self._stop.set()
+        self._thread.join(timeout)
@@ -0,0 +1,138 @@
+"""Filter temporal joint per orang (One-Euro) dengan bobot berdasarkan confidence.
+
+One-Euro: low-pass adaptif per koordinat. Saat joint diam, cutoff rendah
+(`min_cutoff`) meredam jitter; saat bergerak cepat, cutoff naik sebanding
+kecepatan (`beta`) sehingga lag tetap kecil. Confidence dari Body Tracking SDK
+menurunkan bobot update: joint NONE (di luar jangkauan) dan nilai NaN tidak
+mengubah state sama sekali, joint LOW (hasil prediksi/tertutup) hanya sebagian.
+Jika jarak antar sampel lebih dari `max_dt` (frame terputus, rekaman ber-fps
+rendah), estimasi lama dianggap basi dan filter mulai ulang dari pengukuran:
+meng-low-pass sampel yang berjauhan hanya menambah lag satu sampel penuh, yang
+pada gerakan cepat kiri-kanan bisa membuat metrik lewat zona tengah dan
+menambah transisi palsu.
+
+State per track tetap (beberapa array (K4ABT_JOINT_COUNT, 3) yang dialokasikan
+saat track pertama kali terlihat); setiap frame hanya memakai operasi in-place.
+"""
+import math
+
+import numpy as np
+
+from kinect_joints import K4ABT_JOINT_COUNT
+
+# k4abt_joint_confidence_level_t
+K4ABT_JOINT_CONFIDENCE_NONE = 0
+K4ABT_JOINT_CONFIDENCE_LOW = 1
+K4ABT_JOINT_CONFIDENCE_MEDIUM = 2
+K4ABT_JOINT_CONFIDENCE_HIGH = 3
+
+MIN_CUTOFF = 1.0        # Hz, cutoff saat joint diam
+BETA = 0.004            # Hz per (mm/s), kenaikan cutoff terhadap kecepatan
+DERIVATIVE_CUTOFF = 1.0  # Hz, low-pass untuk estimasi kecepatan
+LOW_CONFIDENCE_WEIGHT = 0.3
+MIN_DT = 1e-3           # detik, jaga-jaga timestamp ganda
+MAX_DT = 0.2            # detik, jarak sampel lebih lama (< 5 fps) = state basi, filter mulai ulang
+
+# bobot update per level confidence (indeks = nilai enum; 255 = tidak diketahui -> bobot penuh)
+CONFIDENCE_WEIGHTS = np.ones(256)
+CONFIDENCE_WEIGHTS[K4ABT_JOINT_CONFIDENCE_NONE] = 0.0
+CONFIDENCE_WEIGHTS[K4ABT_JOINT_CONFIDENCE_LOW] = LOW_CONFIDENCE_WEIGHT
+
+
+def _alpha(dt, cutoff):
+    r = 2.0 * math.pi * cutoff * dt
+    return r / (r + 1.0)
+
+
+class _TrackState:
+    __slots__ = ("value", "velocity", "timestamp", "diff", "tmp", "weight", "joint_weight", "confidence",
+                 "invalid", "uninit")
+
+    def __init__(self):
+        shape = (K4ABT_JOINT_COUNT, 3)
+        self.value = np.full(shape, np.nan)  # posisi terfilter (mm)
+        self.velocity = np.zeros(shape)      # kecepatan terfilter (mm/s)
+        self.timestamp = None
+        self.diff = np.empty(shape)
+        self.tmp = np.empty(shape)
+        self.weight = np.empty(shape)
+        self.joint_weight = np.empty(K4ABT_JOINT_COUNT)
+        self.confidence = np.empty(K4ABT_JOINT_COUNT, dtype=np.intp)  # indeks untuk np.take tanpa konversi
+        self.invalid = np.empty(shape, dtype=bool)
+        self.uninit = np.empty(shape, dtype=bool)
+
+
+class JointFilter:
+    """One-Euro filter untuk banyak orang, dikunci dengan `track_id`."""
+
+    def __init__(self, min_cutoff=MIN_CUTOFF, beta=BETA, derivative_cutoff=DERIVATIVE_CUTOFF, max_dt=MAX_DT):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.derivative_cutoff = derivative_cutoff
+        self.max_dt = max_dt
+        self.tracks = {}  # track_id -> _TrackState
+
+    def apply(self, key, timestamp, positions, confidence=None):
+        """Update filter `key` dengan pengukuran baru; return array posisi terfilter (K4ABT_JOINT_COUNT, 3).
+
+        Array yang dikembalikan adalah buffer state filter: dipakai sebelum frame berikutnya, jangan diubah.
+        """
+        st = self.tracks.get(key)
+        if st is None:
+            st = self.tracks[key] = _TrackState()
+        np.isnan(st.value, out=st.uninit)
+
+        if st.timestamp is None or timestamp - st.timestamp > self.max_dt:
+            np.copyto(st.value, positions)
+            st.velocity.fill(0.0)
+            st.timestamp = timestamp
+            return st.value
+        dt = max(timestamp - st.timestamp, MIN_DT)
+        st.timestamp = timestamp
+
+        # bobot per koordinat: confidence joint x (pengukuran valid dan state sudah ada)
+        weight = st.weight
+        if confidence is None:
+            weight.fill(1.0)
+        else:
+            np.copyto(st.confidence, confidence)
+            np.take(CONFIDENCE_WEIGHTS, st.confidence, out=st.joint_weight)
+            for axis in range(3):
+                weight[:, axis] = st.joint_weight
+        invalid = st.invalid
+        np.isfinite(positions, out=invalid)
+        np.less_equal(invalid, st.uninit, out=invalid)  # pengukuran NaN atau state belum ada
+        np.copyto(weight, 0.0, where=invalid)
+
+        # selisih pengukuran - estimasi; koordinat tidak valid -> 0 (bobotnya juga 0)
+        diff = st.diff
+        np.subtract(positions, st.value, out=diff)
+        np.copyto(diff, 0.0, where=invalid)
+
+        # kecepatan terfilter
+        tmp = st.tmp
+        np.multiply(diff, 1.0 / dt, out=tmp)
+        tmp -= st.velocity
+        tmp *= _alpha(dt, self.derivative_cutoff)
+        tmp *= weight
+        st.velocity += tmp
+
+        # cutoff adaptif -> alpha per koordinat
+        np.abs(st.velocity, out=tmp)
+        tmp *= self.beta
+        tmp += self.min_cutoff
+        tmp *= 2.0 * math.pi * dt
+        tmp += 1.0
+        np.reciprocal(tmp, out=tmp)
+        np.subtract(1.0, tmp, out=tmp)  # r / (r + 1)
+        tmp *= weight
+
+        diff *= tmp
+        st.value += diff
+
+        # joint yang baru pertama kali valid langsung memakai pengukuran
+        np.copyto(st.value, positions, where=st.uninit)
+        return st.value
+
+    def forget(self, key):
+        self.tracks.pop(key, None)
@@ -0,0 +1,46 @@
+# Konstanta joint Azure Kinect Body Tracking (sama persis dengan enum k4abt_joint_id_t).
+#
+# Disalin di sini supaya mode tanpa kamera (replay, analisis, benchmark) tidak perlu
+# import pykinect_azure, yang ikut memuat cv2 dan binding ctypes SDK.
+
+K4ABT_JOINT_PELVIS = 0
+K4ABT_JOINT_SPINE_NAVEL = 1
+K4ABT_JOINT_SPINE_CHEST = 2
+K4ABT_JOINT_NECK = 3
+K4ABT_JOINT_CLAVICLE_LEFT = 4
+K4ABT_JOINT_SHOULDER_LEFT = 5
+K4ABT_JOINT_ELBOW_LEFT = 6
+K4ABT_JOINT_WRIST_LEFT = 7
+K4ABT_JOINT_HAND_LEFT = 8
+K4ABT_JOINT_HANDTIP_LEFT = 9
+K4ABT_JOINT_THUMB_LEFT = 10
+K4ABT_JOINT_CLAVICLE_RIGHT = 11
+K4ABT_JOINT_SHOULDER_RIGHT = 12
+K4ABT_JOINT_ELBOW_RIGHT = 13
+K4ABT_JOINT_WRIST_RIGHT = 14
+K4ABT_JOINT_HAND_RIGHT = 15
+K4ABT_JOINT_HANDTIP_RIGHT = 16
+K4ABT_JOINT_THUMB_RIGHT = 17
+K4ABT_JOINT_HIP_LEFT = 18
+K4ABT_JOINT_KNEE_LEFT = 19
+K4ABT_JOINT_ANKLE_LEFT = 20
+K4ABT_JOINT_FOOT_LEFT = 21
+K4ABT_JOINT_HIP_RIGHT = 22
+K4ABT_JOINT_KNEE_RIGHT = 23
+K4ABT_JOINT_ANKLE_RIGHT = 24
+K4ABT_JOINT_FOOT_RIGHT = 25
+K4ABT_JOINT_HEAD = 26
+K4ABT_JOINT_NOSE = 27
+K4ABT_JOINT_EYE_LEFT = 28
+K4ABT_JOINT_EAR_LEFT = 29
+K4ABT_JOINT_EYE_RIGHT = 30
+K4ABT_JOINT_EAR_RIGHT = 31
+K4ABT_JOINT_COUNT = 32
+
+K4ABT_JOINT_NAMES = ["pelvis", "spine - navel", "spine - chest", "neck", "left clavicle", "left shoulder", "left elbow",
+                     "left wrist", "left hand", "left handtip", "left thumb", "right clavicle", "right shoulder", "right elbow",
+                     "right wrist", "right hand", "right handtip", "right thumb", "left hip", "left knee", "left ankle", "left foot",
+                     "right hip", "right knee", "right ankle", "right foot", "head", "nose", "left eye", "left ear", "right eye", "right ear"]
+
+# joint_name (seperti di CSV) -> indeks joint
+JOINT_INDEX_BY_NAME = {name: i for i, name in enumerate(K4ABT_JOINT_NAMES)}
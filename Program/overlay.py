@@ -0,0 +1,64 @@
+"""Elemen overlay bersama: pasangan joint kerangka (tulang) dan HUD. Penyusunan gambar ada di renderer.py."""
+import cv2
+
+from kinect_joints import (
+    K4ABT_JOINT_HEAD,
+    K4ABT_JOINT_NECK,
+    K4ABT_JOINT_SPINE_CHEST,
+    K4ABT_JOINT_SPINE_NAVEL,
+    K4ABT_JOINT_PELVIS,
+    K4ABT_JOINT_CLAVICLE_RIGHT,
+    K4ABT_JOINT_SHOULDER_RIGHT,
+    K4ABT_JOINT_ELBOW_RIGHT,
+    K4ABT_JOINT_WRIST_RIGHT,
+    K4ABT_JOINT_CLAVICLE_LEFT,
+    K4ABT_JOINT_SHOULDER_LEFT,
+    K4ABT_JOINT_ELBOW_LEFT,
+    K4ABT_JOINT_WRIST_LEFT,
+    K4ABT_JOINT_HIP_RIGHT,
+    K4ABT_JOINT_KNEE_RIGHT,
+    K4ABT_JOINT_ANKLE_RIGHT,
+    K4ABT_JOINT_HIP_LEFT,
+    K4ABT_JOINT_KNEE_LEFT,
+    K4ABT_JOINT_ANKLE_LEFT,
+)
+
+# Pasangan joint yang digambar sebagai TULANG (bones)
+BONES = [
+    (K4ABT_JOINT_HEAD, K4ABT_JOINT_NECK),
+    (K4ABT_JOINT_NECK, K4ABT_JOINT_SPINE_CHEST),
+    (K4ABT_JOINT_SPINE_CHEST, K4ABT_JOINT_SPINE_NAVEL),
+    (K4ABT_JOINT_SPINE_NAVEL, K4ABT_JOINT_PELVIS),
+
+    (K4ABT_JOINT_SPINE_CHEST, K4ABT_JOINT_CLAVICLE_RIGHT),
+    (K4ABT_JOINT_CLAVICLE_RIGHT, K4ABT_JOINT_SHOULDER_RIGHT),
+    (K4ABT_JOINT_SHOULDER_RIGHT, K4ABT_JOINT_ELBOW_RIGHT),
+    (K4ABT_JOINT_ELBOW_RIGHT, K4ABT_JOINT_WRIST_RIGHT),
+
+    (K4ABT_JOINT_SPINE_CHEST, K4ABT_JOINT_CLAVICLE_LEFT),
+    (K4ABT_JOINT_CLAVICLE_LEFT, K4ABT_JOINT_SHOULDER_LEFT),
+    (K4ABT_JOINT_SHOULDER_LEFT, K4ABT_JOINT_ELBOW_LEFT),
+    (K4ABT_JOINT_ELBOW_LEFT, K4ABT_JOINT_WRIST_LEFT),
+
+    (K4ABT_JOINT_PELVIS, K4ABT_JOINT_HIP_RIGHT),
+    (K4ABT_JOINT_HIP_RIGHT, K4ABT_JOINT_KNEE_RIGHT),
+    (K4ABT_JOINT_KNEE_RIGHT, K4ABT_JOINT_ANKLE_RIGHT),
+
+    (K4ABT_JOINT_PELVIS, K4ABT_JOINT_HIP_LEFT),
+    (K4ABT_JOINT_HIP_LEFT, K4ABT_JOINT_KNEE_LEFT),
+    (K4ABT_JOINT_KNEE_LEFT, K4ABT_JOINT_ANKLE_LEFT),
+]
+
+
+def draw_hud(color_image, lines):
+    """Tulis baris-baris HUD (FPS / latensi) di pojok kiri bawah dengan latar gelap."""
+    if not lines:
+        return
+    h = color_image.shape[0]
+    line_h = 20
+    top = h - 10 - line_h * len(lines)
+    width = max(cv2.getTextSize(line, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0][0] for line in lines)
+    cv2.rectangle(color_image, (5, top - 5), (15 + width, h - 5), (0, 0, 0), -1)
+    for k, line in enumerate(lines):
+        cv2.putText(color_image, line, (10, top + line_h * (k + 1) - 5),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
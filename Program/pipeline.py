@@ -0,0 +1,101 @@
+"""Pipeline bertahap: setiap stage berjalan di thread sendiri, dihubungkan antrean kecil.
+
+    sumber (thread pemanggil) -> stage 1 -> stage 2 -> ... -> stage terakhir
+
+Setiap item membawa nomor urut frame. Satu worker per stage + antrean FIFO
+menjamin urutan frame tetap terjaga; frame yang datang tidak berurutan dibuang.
+Back-pressure diatur per stage lewat kebijakan overflow `BackgroundWriter`:
+"drop_oldest" membuang frame basi daripada menumpuk latensi, "block" menjamin
+setiap frame diproses (dipakai untuk analitik agar hitungan deterministik).
+Jika diberi `metrics` (instrumentation.Metrics), durasi setiap stage dan waktu
+menunggu sumber (nama "capture") dicatat per frame.
+"""
+import threading
+import time
+
+from background_writer import BackgroundWriter
+
+
+class Stage:
+    """Satu tahap pipeline. `fn(payload)` return payload untuk stage berikutnya, atau None untuk berhenti di sini."""
+
+    def __init__(self, name, fn, queue_size=2, overflow="drop_oldest"):
+        self.name = name
+        self.fn = fn
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.last_seq = -1
+        self.out_of_order = 0
+
+
+class Pipeline:
+    def __init__(self, stages, metrics=None):
+        if not stages:
+            raise ValueError("pipeline butuh minimal satu stage")
+        self.stages = stages
+        self.metrics = metrics
+        self._stop = threading.Event()
+        self.frames_in = 0
+
+        # bangun dari belakang supaya tiap handler tahu writer stage berikutnya
+        writers = []
+        next_writer = None
+        for stage in reversed(stages):
+            next_writer = BackgroundWriter(stage.name, self._make_handler(stage, next_writer),
+                                           maxsize=stage.queue_size, overflow=stage.overflow)
+            writers.append(next_writer)
+        self._writers = writers[::-1]
+
+    def _make_handler(self, stage, next_writer):
+        def handle(item):
+            seq, payload = item
+            if seq <= stage.last_seq:
+                stage.out_of_order += 1
+                return
+            stage.last_seq = seq
+            if self.metrics is None:
+                result = stage.fn(payload)
+            else:
+                start = time.perf_counter()
+                result = stage.fn(payload)
+                self.metrics.observe(stage.name, time.perf_counter() - start)
+            if result is not None and next_writer is not None:
+                next_writer.submit((seq, result))
+        return handle
+
+    def run(self, source):
+        """Tarik frame dari `source` di thread pemanggil sampai habis atau `stop()` dipanggil, lalu tutup."""
+        source = iter(source)
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                payload = next(source, None)
+                if payload is None:
+                    break
+                if self.metrics is not None:
+                    self.metrics.observe("capture", time.perf_counter() - start)
+                self._writers[0].submit((self.frames_in, payload))
+                self.frames_in += 1
+        finally:
+            self.close()
+
+    def stop(self):
+        """Minta sumber berhenti (aman dipanggil dari stage mana pun, misal render saat tombol 'q')."""
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def close(self, timeout=None):
+        """Kuras antrean stage satu per satu dari depan sehingga frame yang sudah masuk selesai diproses."""
+        for writer in self._writers:
+            writer.close(timeout)
+
+    def stats(self):
+        result = {}
+        for stage, writer in zip(self.stages, self._writers):
+            st = writer.stats()
+            st["out_of_order"] = stage.out_of_order
+            result[stage.name] = st
+        return result
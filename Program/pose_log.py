@@ -0,0 +1,287 @@
+"""Log pose biner: satu record ukuran tetap per body per frame.
+
+Layout file:
+    header  16 byte : magic b"KPOSELOG", versi (uint32), jumlah joint (uint32)
+    record 436 byte : frame (uint32), timestamp (float64), body_index (uint32),
+                      body_id (uint32), positions (float32 x K4ABT_JOINT_COUNT x 3),
+                      confidence (uint8 x K4ABT_JOINT_COUNT)
+
+Semua little-endian dan tanpa padding, sehingga file bisa dibaca langsung lewat
+`np.memmap` tanpa parsing. Record ditulis dalam chunk (bukan per joint seperti
+CSV lama) dan setiap frame hanya punya satu timestamp.
+
+Sesi panjang (seharian) memakai `RotatingPoseLogWriter`: log dipecah menjadi
+<nama>.0001.poselog, <nama>.0002.poselog, ... per ukuran atau durasi, setiap
+bagian adalah log utuh yang bisa dibaca/di-ingest sendiri.
+
+Konversi dari/ke format CSV lama:
+    python pose_log.py to-log data_gerakan.csv data_gerakan.poselog
+    python pose_log.py to-csv data_gerakan.poselog data_gerakan.csv
+"""
+import argparse
+import csv
+import os
+import struct
+
+import numpy as np
+
+from kinect_joints import K4ABT_JOINT_COUNT, K4ABT_JOINT_NAMES
+from frame_source import CsvReplaySource, Frame, Skeleton, CSV_HEADER
+
+MAGIC = b"KPOSELOG"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+
+RECORD_DTYPE = np.dtype([
+    ("frame", "<u4"),
+    ("timestamp", "<f8"),
+    ("body_index", "<u4"),
+    ("body_id", "<u4"),
+    ("positions", "<f4", (K4ABT_JOINT_COUNT, 3)),
+    ("confidence", "u1", (K4ABT_JOINT_COUNT,)),
+])
+
+# penanda nilai yang tidak tercatat (CSV lama tidak menyimpan confidence maupun body id)
+CONFIDENCE_UNKNOWN = 255
+BODY_ID_UNKNOWN = 0xFFFFFFFF
+
+DEFAULT_CHUNK_RECORDS = 512
+
+
+def part_path(path, part):
+    """Nama file bagian ke-`part` dari log/berkas berotasi: "data.poselog" -> "data.0003.poselog"."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{part:04d}{ext}"
+
+
+class PoseLogWriter:
+    """Tulis frame skeleton ke log biner dengan buffer chunk yang dialokasikan sekali."""
+
+    def __init__(self, path, chunk_records=DEFAULT_CHUNK_RECORDS):
+        self._buffer = np.zeros(chunk_records, dtype=RECORD_DTYPE)
+        self._fill = 0
+        self.frames_written = 0
+        self._open(path)
+
+    def _open(self, path):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, K4ABT_JOINT_COUNT))
+        self.records_in_file = 0
+
+    @property
+    def size(self):
+        """Ukuran file sekarang dalam byte (termasuk record yang masih di buffer)."""
+        return HEADER.size + self.records_in_file * RECORD_DTYPE.itemsize
+
+    def write_frame(self, timestamp, bodies):
+        """Simpan semua body dari satu frame (list `Skeleton`) dengan satu timestamp."""
+        frame = self.frames_written
+        for body in bodies:
+            if self._fill == len(self._buffer):
+                self.flush()
+            rec = self._buffer[self._fill]
+            rec["frame"] = frame
+            rec["timestamp"] = timestamp
+            rec["body_index"] = body.index
+            rec["body_id"] = BODY_ID_UNKNOWN if body.body_id is None else body.body_id
+            rec["positions"] = body.positions
+            rec["confidence"] = CONFIDENCE_UNKNOWN if body.confidence is None else body.confidence
+            self._fill += 1
+            self.records_in_file += 1
+        self.frames_written += 1
+
+    def flush(self):
+        if self._fill:
+            self._file.write(self._buffer[:self._fill].data)
+            self._fill = 0
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RotatingPoseLogWriter(PoseLogWriter):
+    """`PoseLogWriter` yang pindah ke file bagian berikutnya setiap `max_bytes` byte dan/atau `max_seconds`
+    detik (timestamp frame), dengan buffer chunk yang sama.
+
+    Rotasi hanya di batas frame dan baru terjadi saat frame berikutnya ditulis (tidak ada bagian kosong
+    berisi header saja di akhir sesi); nomor frame berlanjut antar bagian. `max_files` = jumlah bagian
+    selesai terbaru yang disimpan di samping bagian yang sedang ditulis (bagian lama dihapus, setelah
+    `close` tersisa `max_files` bagian), None = simpan semua. `on_rotate(path, part)` dipanggil setelah
+    bagian ke-`part` ditutup, sebelum bagian lama dihapus; bagian itu sendiri tidak ikut dihapus.
+    """
+
+    def __init__(self, path, max_bytes=None, max_seconds=None, max_files=None, on_rotate=None,
+                 chunk_records=DEFAULT_CHUNK_RECORDS):
+        if max_bytes is None and max_seconds is None:
+            raise ValueError("rotasi butuh max_bytes atau max_seconds")
+        if max_files is not None and max_files < 1:
+            raise ValueError(f"max_files harus >= 1, dapat {max_files!r}")
+        self.base_path = path
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.max_files = max_files
+        self.on_rotate = on_rotate
+        self.part = 1
+        self.parts = [part_path(path, 1)]  # bagian yang masih tersimpan, lama -> baru
+        self._part_started = None
+        self._full = False                 # bagian sekarang sudah mencapai max_bytes
+        super().__init__(self.parts[0], chunk_records)
+
+    def write_frame(self, timestamp, bodies):
+        if self._full or (self.max_seconds is not None and self._part_started is not None
+                          and timestamp - self._part_started >= self.max_seconds):
+            self.rotate()
+        if self._part_started is None:
+            self._part_started = timestamp
+        super().write_frame(timestamp, bodies)
+        if self.max_bytes is not None and self.size >= self.max_bytes:
+            self._full = True
+
+    def rotate(self):
+        """Tutup bagian sekarang dan lanjut ke bagian berikutnya."""
+        finished, part = self.path, self.part
+        super().close()
+        self.part += 1
+        self._part_started = None
+        self._full = False
+        self._open(part_path(self.base_path, self.part))
+        self.parts.append(self.path)
+        if self.on_rotate is not None:
+            self.on_rotate(finished, part)
+        self._prune(open_parts=1)
+
+    def close(self):
+        super().close()
+        self._prune(open_parts=0)
+
+    def _prune(self, open_parts):
+        """Hapus bagian selesai tertua sampai tersisa `max_files` (bagian yang masih ditulis tidak dihitung)."""
+        while self.max_files is not None and len(self.parts) - open_parts > self.max_files:
+            old = self.parts.pop(0)
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def read_pose_log(path):
+    """Buka log sebagai array record read-only lewat memory map (tanpa membaca seluruh file)."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path}: bukan log pose (file terlalu pendek)")
+    magic, version, joint_count = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or joint_count != K4ABT_JOINT_COUNT:
+        raise ValueError(f"{path}: header log pose tidak dikenal ({magic!r}, v{version}, {joint_count} joint)")
+
+    data_bytes = _file_size(path) - HEADER.size
+    # record terakhir yang terpotong (misal program berhenti paksa) diabaikan
+    n_records = data_bytes // RECORD_DTYPE.itemsize
+    if n_records == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(n_records,))
+
+
+def _file_size(path):
+    with open(path, "rb") as f:
+        return f.seek(0, 2)
+
+
+def frame_bounds(records):
+    """Return indeks awal tiap frame plus indeks akhir: records[b[i]:b[i+1]] = frame ke-i."""
+    frames = records["frame"]
+    starts = np.flatnonzero(np.diff(frames)) + 1
+    return np.concatenate(([0], starts, [len(frames)])) if len(frames) else np.zeros(1, dtype=np.intp)
+
+
+def poses_from_log(records):
+    """Versi cepat `batch_counter.poses_from_frames` untuk log biner: return (timestamps, poses)."""
+    bounds = frame_bounds(records)
+    n_frames = len(bounds) - 1
+    frame_of_record = np.repeat(np.arange(n_frames), np.diff(bounds))
+    body_index = np.asarray(records["body_index"])
+    n_bodies = int(body_index.max()) + 1 if len(body_index) else 0
+
+    poses = np.full((n_frames, n_bodies, K4ABT_JOINT_COUNT, 3), np.nan)
+    poses[frame_of_record, body_index] = records["positions"]
+    timestamps = np.asarray(records["timestamp"][bounds[:-1]], dtype=np.float64)
+    return timestamps, poses
+
+
+class PoseLogReplaySource:
+    """Sumber replay dari log biner; urutan dan isi frame sama dengan saat direkam."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        records = read_pose_log(self.path)
+        bounds = frame_bounds(records)
+        for i in range(len(bounds) - 1):
+            chunk = records[bounds[i]:bounds[i + 1]]
+            bodies = []
+            for rec in chunk:
+                confidence = rec["confidence"]
+                body_id = int(rec["body_id"])
+                bodies.append(Skeleton(int(rec["body_index"]),
+                                       rec["positions"].astype(np.float64),
+                                       body_id=None if body_id == BODY_ID_UNKNOWN else body_id,
+                                       confidence=None if confidence[0] == CONFIDENCE_UNKNOWN else confidence.copy()))
+            yield Frame(float(chunk[0]["timestamp"]), bodies)
+
+
+def open_pose_source(path):
+    """Pilih sumber replay sesuai format file (log biner atau CSV lama)."""
+    with open(path, "rb") as f:
+        is_log = f.read(len(MAGIC)) == MAGIC
+    return PoseLogReplaySource(path) if is_log else CsvReplaySource(path)
+
+
+def csv_to_pose_log(csv_path, log_path):
+    with PoseLogWriter(log_path) as writer:
+        for frame in CsvReplaySource(csv_path):
+            writer.write_frame(frame.timestamp, frame.bodies)
+        return writer.frames_written
+
+
+def pose_log_to_csv(log_path, csv_path):
+    """Tulis ulang log biner ke skema CSV lama (satu baris per joint, timestamp frame)."""
+    n_frames = 0
+    with open(csv_path, "w", newline="") as f:
+        csv_writer = csv.writer(f)
+        csv_writer.writerow(CSV_HEADER)
+        for frame in PoseLogReplaySource(log_path):
+            for body in frame.bodies:
+                for j, (x, y, z) in enumerate(body.positions.tolist()):
+                    csv_writer.writerow([frame.timestamp, body.index, K4ABT_JOINT_NAMES[j], x, y, z])
+            n_frames += 1
+    return n_frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Konversi log pose CSV <-> biner")
+    parser.add_argument("command", choices=("to-log", "to-csv"))
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    args = parser.parse_args(argv)
+
+    if args.command == "to-log":
+        n_frames = csv_to_pose_log(args.src, args.dst)
+    else:
+        n_frames = pose_log_to_csv(args.src, args.dst)
+    print(f"{args.src} -> {args.dst}: {n_frames} frame")
+
+
+if __name__ == "__main__":
+    main()
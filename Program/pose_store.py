@@ -0,0 +1,359 @@
+"""Penyimpanan log pose terindeks untuk analisis: query per joint / body / rentang waktu tanpa scan penuh.
+
+Setiap log (.poselog atau CSV lama) di-ingest sekali menjadi satu sesi di direktori store:
+    catalog.json          daftar sesi: file asal, jumlah record / frame, rentang waktu, body
+    <sesi>/timestamps.npy (N,) float64   \\
+    <sesi>/frame.npy      (N,) uint32     | satu baris per body per frame, urutan sama dengan log
+    <sesi>/body_index.npy (N,) uint32     |
+    <sesi>/body_id.npy    (N,) uint32    /
+    <sesi>/joints.npy     (J, N, 3) float32  joint-major: satu joint sepanjang waktu = satu blok berurutan
+    <sesi>/confidence.npy (J, N) uint8
+    <sesi>/chunks.npy     per `chunk_records` record: [start, stop), timestamp min/max, mask body_index
+
+Semua array dibuka dengan memory map. Query pertama menyaring tabel chunk (kecil) berdasarkan
+rentang waktu dan body, lalu hanya membaca chunk yang lolos; hasil dikembalikan / di-stream
+sebagai array NumPy per chunk (untuk plot atau training model).
+
+    python pose_store.py ingest store data_gerakan.poselog sesi1.csv [--replace]
+    python pose_store.py list store
+    python pose_store.py joint store data_gerakan left_knee --body 0 --from 10 --to 20 --out lutut.npy
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from exercise_registry import JOINT_IDS
+from kinect_joints import K4ABT_JOINT_COUNT, JOINT_INDEX_BY_NAME
+from pose_log import BODY_ID_UNKNOWN, MAGIC, csv_to_pose_log, frame_bounds, read_pose_log
+
+CATALOG = "catalog.json"
+CHUNK_RECORDS = 4096          # ~2 menit rekaman satu orang pada 30 fps
+ALL_BODIES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+CHUNK_DTYPE = np.dtype([
+    ("start", "<i8"),
+    ("stop", "<i8"),
+    ("t_min", "<f8"),
+    ("t_max", "<f8"),
+    ("body_mask", "<u8"),  # bit b = body_index b ada di chunk (body_index >= 64 -> semua bit)
+])
+COLUMNS = ("timestamps", "frame", "body_index", "body_id")
+
+
+def joint_index(joint):
+    """Nomor joint dari int, nama SDK ("left knee") atau nama ekspresi ("left_knee")."""
+    if isinstance(joint, (int, np.integer)):
+        if not 0 <= joint < K4ABT_JOINT_COUNT:
+            raise ValueError(f"nomor joint harus 0..{K4ABT_JOINT_COUNT - 1}, dapat {joint}")
+        return int(joint)
+    index = JOINT_IDS.get(joint, JOINT_INDEX_BY_NAME.get(joint))
+    if index is None:
+        raise ValueError(f"joint tidak dikenal: {joint!r}")
+    return index
+
+
+def _body_bits(body_index):
+    """Mask body untuk array body_index (satu chunk)."""
+    present = np.unique(body_index)
+    if len(present) and present[-1] >= 64:
+        return ALL_BODIES
+    return np.bitwise_or.reduce(np.left_shift(np.uint64(1), present.astype(np.uint64)), initial=np.uint64(0))
+
+
+class Session:
+    """Satu log yang sudah di-ingest; semua kolom berupa memmap read-only."""
+
+    def __init__(self, path, info):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.info = info
+        for column in COLUMNS:
+            setattr(self, column, np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r"))
+        self.joints = np.load(os.path.join(path, "joints.npy"), mmap_mode="r")
+        self.confidence = np.load(os.path.join(path, "confidence.npy"), mmap_mode="r")
+        self.chunks = np.load(os.path.join(path, "chunks.npy"))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def t_min(self):
+        return self.info["t_min"]
+
+    @property
+    def t_max(self):
+        return self.info["t_max"]
+
+    def chunk_range(self, t0=None, t1=None, body=None):
+        """Indeks chunk yang mungkin berisi record pada [t0, t1] untuk `body` (None = semua)."""
+        c = self.chunks
+        keep = np.ones(len(c), dtype=bool)
+        if t0 is not None:
+            keep &= c["t_max"] >= t0
+        if t1 is not None:
+            keep &= c["t_min"] <= t1
+        if body is not None:
+            bit = ALL_BODIES if body >= 64 else np.uint64(1) << np.uint64(body)
+            keep &= (c["body_mask"] & bit) != 0
+        return np.flatnonzero(keep)
+
+    def _selections(self, t0, t1, body, body_id):
+        """(start, stop, mask lokal atau None) per chunk yang lolos; hanya kolom kecil yang dibaca."""
+        for chunk in self.chunks[self.chunk_range(t0, t1, body)]:
+            start, stop = int(chunk["start"]), int(chunk["stop"])
+            mask = None
+            if t0 is not None and chunk["t_min"] < t0:
+                mask = self.timestamps[start:stop] >= t0
+            if t1 is not None and chunk["t_max"] > t1:
+                upper = self.timestamps[start:stop] <= t1
+                mask = upper if mask is None else mask & upper
+            if body is not None and chunk["body_mask"] != np.uint64(1) << np.uint64(min(body, 63)):
+                same = self.body_index[start:stop] == body
+                mask = same if mask is None else mask & same
+            if body_id is not None:
+                same = self.body_id[start:stop] == body_id
+                mask = same if mask is None else mask & same
+            if mask is None or mask.any():
+                yield start, stop, mask
+
+    def iter_chunks(self, joints=None, t0=None, t1=None, body=None, body_id=None, confidence=False):
+        """Stream record yang cocok per chunk sebagai dict array NumPy.
+
+        Kunci: "timestamp", "frame", "body_index", "body_id", "positions" (n, len(joints), 3) float32,
+        dan "confidence" (n, len(joints)) jika diminta. `joints` = daftar joint (None = semua).
+        """
+        columns = slice(None) if joints is None else [joint_index(j) for j in joints]
+        for start, stop, mask in self._selections(t0, t1, body, body_id):
+            rows = slice(None) if mask is None else mask
+            # joint-major: hanya blok joint yang diminta yang dibaca dari disk
+            positions = np.asarray(self.joints[columns, start:stop])[:, rows].transpose(1, 0, 2)
+            out = {
+                "timestamp": np.asarray(self.timestamps[start:stop])[rows],
+                "frame": np.asarray(self.frame[start:stop])[rows],
+                "body_index": np.asarray(self.body_index[start:stop])[rows],
+                "body_id": np.asarray(self.body_id[start:stop])[rows],
+                "positions": positions,
+            }
+            if confidence:
+                out["confidence"] = np.asarray(self.confidence[columns, start:stop])[:, rows].T
+            yield out
+
+    def read(self, joints=None, t0=None, t1=None, body=None, body_id=None, confidence=False):
+        """Seperti `iter_chunks`, tetapi hasil semua chunk digabung."""
+        parts = list(self.iter_chunks(joints, t0, t1, body, body_id, confidence))
+        if not parts:
+            n_joints = K4ABT_JOINT_COUNT if joints is None else len(joints)
+            empty = {"timestamp": np.zeros(0), "frame": np.zeros(0, np.uint32),
+                     "body_index": np.zeros(0, np.uint32), "body_id": np.zeros(0, np.uint32),
+                     "positions": np.zeros((0, n_joints, 3), np.float32)}
+            if confidence:
+                empty["confidence"] = np.zeros((0, n_joints), np.uint8)
+            return empty
+        return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+    def poses(self, t0=None, t1=None, joints=None):
+        """Frame pada [t0, t1] sebagai (timestamps (F,), poses (F, B, J, 3) float64, NaN = body tidak ada);
+        bentuk dan dtype sama dengan `pose_log.poses_from_log`, siap untuk batch_counter atau training."""
+        data = self.read(joints, t0, t1)
+        frames, frame_row = np.unique(data["frame"], return_inverse=True)
+        n_bodies = int(data["body_index"].max()) + 1 if len(frames) else 0
+        poses = np.full((len(frames), n_bodies) + data["positions"].shape[1:], np.nan)
+        poses[frame_row, data["body_index"]] = data["positions"]
+        timestamps = np.zeros(len(frames))
+        timestamps[frame_row] = data["timestamp"]
+        return timestamps, poses
+
+    def joint(self, joint, body=None, t0=None, t1=None, body_id=None):
+        """Lintasan satu joint: (timestamps (n,), posisi (n, 3) float32) untuk body / rentang waktu."""
+        j = joint_index(joint)
+        times, positions = [], []
+        for start, stop, mask in self._selections(t0, t1, body, body_id):
+            rows = slice(None) if mask is None else mask
+            times.append(np.asarray(self.timestamps[start:stop])[rows])
+            positions.append(np.asarray(self.joints[j, start:stop])[rows])
+        if not times:
+            return np.zeros(0), np.zeros((0, 3), np.float32)
+        return np.concatenate(times), np.concatenate(positions)
+
+
+class PoseStore:
+    """Direktori berisi banyak sesi hasil ingest; `catalog.json` ditulis ulang secara atomik."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.catalog_path = os.path.join(root, CATALOG)
+        self.catalog = {"version": 1, "joint_count": K4ABT_JOINT_COUNT, "sessions": {}}
+        if os.path.exists(self.catalog_path):
+            with open(self.catalog_path) as f:
+                self.catalog = json.load(f)
+        self._open = {}
+
+    def sessions(self):
+        return self.catalog["sessions"]
+
+    def session(self, name):
+        session = self._open.get(name)
+        if session is None:
+            info = self.sessions().get(name)
+            if info is None:
+                raise ValueError(f"sesi tidak ada di store: {name!r} (ada: {sorted(self.sessions())})")
+            session = self._open[name] = Session(os.path.join(self.root, name), info)
+        return session
+
+    def ingest(self, path, name=None, chunk_records=CHUNK_RECORDS, replace=False):
+        """Ingest satu log pose (biner atau CSV lama) sebagai sesi `name` (default nama file). Return nama sesi.
+
+        Sesi dengan nama yang sama hanya ditimpa jika `replace`; selain itu ValueError.
+        """
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        if name in self.sessions() and not replace:
+            raise ValueError(f"sesi {name!r} sudah ada di store (dari {self.sessions()[name]['source']}), "
+                             f"pakai --replace untuk menimpa")
+        with open(path, "rb") as f:
+            is_log = f.read(len(MAGIC)) == MAGIC
+        if is_log:
+            info = self._ingest_log(path, name, chunk_records)
+        else:
+            # CSV lama: konversi dulu ke log biner sementara (deteksi batas frame ada di CsvReplaySource)
+            fd, tmp_log = tempfile.mkstemp(suffix=".poselog", dir=self.root)
+            os.close(fd)
+            try:
+                csv_to_pose_log(path, tmp_log)
+                info = self._ingest_log(tmp_log, name, chunk_records)
+            finally:
+                os.remove(tmp_log)
+        info["source"] = os.path.abspath(path)
+        self.catalog["sessions"][name] = info
+        self._open.pop(name, None)
+        self._write_catalog()
+        return name
+
+    def _ingest_log(self, path, name, chunk_records):
+        records = read_pose_log(path)
+        n = len(records)
+        final = os.path.join(self.root, name)
+        tmp = final + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        def column(file_name, dtype, shape):
+            return np.lib.format.open_memmap(os.path.join(tmp, file_name), mode="w+", dtype=dtype, shape=shape)
+
+        timestamps = column("timestamps.npy", np.float64, (n,))
+        frame = column("frame.npy", np.uint32, (n,))
+        body_index = column("body_index.npy", np.uint32, (n,))
+        body_id = column("body_id.npy", np.uint32, (n,))
+        joints = column("joints.npy", np.float32, (K4ABT_JOINT_COUNT, n, 3))
+        confidence = column("confidence.npy", np.uint8, (K4ABT_JOINT_COUNT, n))
+        chunks = np.zeros(-(-n // chunk_records), dtype=CHUNK_DTYPE)
+
+        # log dibaca per chunk (memmap), tidak pernah dimuat utuh
+        for c, start in enumerate(range(0, n, chunk_records)):
+            stop = min(start + chunk_records, n)
+            block = records[start:stop]
+            ts = block["timestamp"]
+            timestamps[start:stop] = ts
+            frame[start:stop] = block["frame"]
+            body_index[start:stop] = block["body_index"]
+            body_id[start:stop] = block["body_id"]
+            joints[:, start:stop] = block["positions"].transpose(1, 0, 2)
+            confidence[:, start:stop] = block["confidence"].T
+            chunks[c] = (start, stop, ts.min(), ts.max(), _body_bits(block["body_index"]))
+        np.save(os.path.join(tmp, "chunks.npy"), chunks)
+        for array in (timestamps, frame, body_index, body_id, joints, confidence):
+            array.flush()
+        del timestamps, frame, body_index, body_id, joints, confidence
+
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(tmp, final)
+        bodies = sorted(set(np.unique(records["body_index"]).tolist())) if n else []
+        ids = np.unique(records["body_id"]) if n else []
+        return {
+            "records": n,
+            "frames": len(frame_bounds(records)) - 1,
+            "chunks": len(chunks),
+            "t_min": float(chunks["t_min"].min()) if n else None,
+            "t_max": float(chunks["t_max"].max()) if n else None,
+            "bodies": bodies,
+            "body_ids": [int(i) for i in ids if i != BODY_ID_UNKNOWN],
+            "ingested": time.time(),
+        }
+
+    def _write_catalog(self):
+        tmp = self.catalog_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.catalog, f, indent=1)
+        os.replace(tmp, self.catalog_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Store log pose terindeks (waktu, joint, body)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="ingest log pose (.poselog / CSV) ke store")
+    ingest.add_argument("store")
+    ingest.add_argument("logs", nargs="+")
+    ingest.add_argument("--chunk-records", type=int, default=CHUNK_RECORDS)
+    ingest.add_argument("--replace", action="store_true", help="timpa sesi yang namanya sudah ada")
+    listing = sub.add_parser("list", help="daftar sesi di store")
+    listing.add_argument("store")
+    joint = sub.add_parser("joint", help="lintasan satu joint untuk body / rentang waktu")
+    joint.add_argument("store")
+    joint.add_argument("session")
+    joint.add_argument("joint", help="nama joint (left_knee / 'left knee') atau nomor")
+    joint.add_argument("--body", type=int, default=None, help="body_index")
+    joint.add_argument("--from", dest="t0", type=float, default=None, help="detik sejak awal sesi")
+    joint.add_argument("--to", dest="t1", type=float, default=None, help="detik sejak awal sesi")
+    joint.add_argument("--out", default=None, help="simpan (N, 4) [timestamp, x, y, z] ke .npy")
+    args = parser.parse_args(argv)
+
+    store = PoseStore(args.store)
+    if args.command == "ingest":
+        status = 0
+        for path in args.logs:
+            start = time.perf_counter()
+            try:
+                name = store.ingest(path, chunk_records=args.chunk_records, replace=args.replace)
+            except ValueError as e:
+                print(f"{path}: {e}")
+                status = 1
+                continue
+            info = store.sessions()[name]
+            print(f"{path} -> {name}: {info['records']} record, {info['frames']} frame, "
+                  f"{info['chunks']} chunk dalam {time.perf_counter() - start:.2f} s")
+        return status
+
+    if args.command == "list":
+        for name, info in sorted(store.sessions().items()):
+            span = (info["t_max"] - info["t_min"]) if info["records"] else 0.0
+            print(f"{name}: {info['records']} record, {info['frames']} frame, {span:.1f} s, "
+                  f"body {info['bodies']} <- {info['source']}")
+        return 0
+
+    session = store.session(args.session)
+    joint = int(args.joint) if args.joint.isdigit() else args.joint
+    t0 = None if args.t0 is None else session.t_min + args.t0
+    t1 = None if args.t1 is None else session.t_min + args.t1
+    start = time.perf_counter()
+    times, positions = session.joint(joint, args.body, t0, t1)
+    elapsed = time.perf_counter() - start
+    print(f"{len(times)} titik dari {len(session)} record dalam {elapsed * 1000:.2f} ms "
+          f"({len(session.chunk_range(t0, t1, args.body))}/{len(session.chunks)} chunk dibaca)")
+    if len(times):
+        valid = positions[np.isfinite(positions).all(axis=1)].astype(np.float64)
+        if len(valid):
+            print(f"  rata-rata {np.round(valid.mean(axis=0), 1).tolist()} mm, "
+                  f"min {np.round(valid.min(axis=0), 1).tolist()}, max {np.round(valid.max(axis=0), 1).tolist()}")
+    if args.out:
+        np.save(args.out, np.column_stack([times, positions]))
+        print(f"  tersimpan di {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
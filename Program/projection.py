@@ -0,0 +1,197 @@
+"""Proyeksi 3D -> 2D batch tanpa memanggil SDK per joint.
+
+Intrinsik dan ekstrinsik dibaca sekali dari struct kalibrasi Azure Kinect, lalu
+seluruh titik diproyeksikan sekaligus dengan NumPy. Rumusnya mengikuti
+`transformation_3d_to_2d` di Azure Kinect SDK (intrinsic_transformation.c):
+transformasi ekstrinsik, pembagian perspektif, distorsi radial rasional k1..k6,
+distorsi tangensial p1/p2 (Brown-Conrady atau Rational 6KT), dan batas
+`metric_radius` untuk validitas.
+"""
+import numpy as np
+
+# nilai enum dari k4atypes.h (disalin supaya modul ini tidak perlu import pykinect_azure)
+K4A_CALIBRATION_TYPE_DEPTH = 0
+K4A_CALIBRATION_TYPE_COLOR = 1
+K4A_CALIBRATION_LENS_DISTORTION_MODEL_RATIONAL_6KT = 3
+K4A_CALIBRATION_LENS_DISTORTION_MODEL_BROWN_CONRADY = 4
+
+_SUPPORTED_MODELS = (K4A_CALIBRATION_LENS_DISTORTION_MODEL_RATIONAL_6KT,
+                     K4A_CALIBRATION_LENS_DISTORTION_MODEL_BROWN_CONRADY)
+_PARAM_NAMES = ("cx", "cy", "fx", "fy", "k1", "k2", "k3", "k4", "k5", "k6", "codx", "cody", "p2", "p1")
+
+WORK_ROWS = 13             # array perantara per titik di `Projector.project`
+WORKSPACE_POINTS = 256     # kapasitas awal array kerja (8 body x 32 joint)
+PIXEL_BUFFER_DEPTH = 4     # hasil proyeksi yang bisa hidup bersamaan (analitik -> antrean render -> render)
+
+
+class Projector:
+    """Proyeksikan titik 3D (mm, koordinat kamera sumber) ke piksel kamera tujuan."""
+
+    def __init__(self, rotation, translation, params, model, metric_radius):
+        if model not in _SUPPORTED_MODELS:
+            raise ValueError(f"Model distorsi lensa {model} tidak didukung")
+        if not (params["fx"] > 0 and params["fy"] > 0):
+            raise ValueError("fx / fy kalibrasi harus positif")
+        self.rotation = np.asarray(rotation, dtype=np.float64).reshape(3, 3)
+        self.translation = np.asarray(translation, dtype=np.float64).reshape(3)
+        self.params = dict(params)
+        self.model = model
+        self.metric_radius = float(metric_radius)
+        self._work = self._mask = self._target = self._points2d = None
+
+    @classmethod
+    def from_calibration(cls, calibration, source=K4A_CALIBRATION_TYPE_DEPTH, target=K4A_CALIBRATION_TYPE_COLOR):
+        """Ambil parameter dari `pykinect.Calibration` (struct ctypes k4a_calibration_t) sekali saja."""
+        handle = calibration._handle
+        camera = (handle.color_camera_calibration if target == K4A_CALIBRATION_TYPE_COLOR
+                  else handle.depth_camera_calibration)
+        extrinsics = handle.extrinsics[source][target]
+        param = camera.intrinsics.parameters.param
+        return cls(rotation=list(extrinsics.rotation),
+                   translation=list(extrinsics.translation),
+                   params={name: float(getattr(param, name)) for name in _PARAM_NAMES},
+                   model=camera.intrinsics.type,
+                   metric_radius=camera.metric_radius)
+
+    def _workspace(self, n):
+        """Array kerja (float per titik, bool per titik, titik 3D) untuk `n` titik; dialokasikan ulang hanya jika
+        jumlah titik melebihi kapasitas (kapasitas tumbuh 2x), jadi proyeksi per frame tidak membuat array baru."""
+        if self._work is None or self._work.shape[1] < n:
+            capacity = max(n, 2 * self._work.shape[1] if self._work is not None else WORKSPACE_POINTS)
+            self._work = np.empty((WORK_ROWS, capacity))
+            self._mask = np.empty(capacity, dtype=bool)
+            self._target = np.empty((capacity, 3))
+            self._points2d = np.empty((capacity, 2))
+        return self._work[:, :n], self._mask[:n], self._target[:n]
+
+    def project(self, points, out=None):
+        """points: array (N, 3). Return (points2d (N, 2) float, valid (N,) bool).
+
+        Titik tidak valid (di belakang kamera, di luar metric_radius, atau NaN)
+        tetap punya nilai di points2d tetapi tidak boleh dipakai. `out` = (points2d, valid)
+        yang sudah dialokasikan untuk diisi; hasil perantara memakai array kerja milik
+        Projector (satu Projector hanya dipakai dari satu thread).
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        n = len(points)
+        p = self.params
+        if out is None:
+            out = (np.empty((n, 2)), np.empty(n, dtype=bool))
+        points2d, valid = out
+        work, mask, target = self._workspace(n)
+        safe_z, xp, yp, xp2, yp2, xyp, rs, rss, rsc, a, b, tmp, tmp2 = work
+
+        np.matmul(points, self.rotation.T, out=target)
+        target += self.translation
+        x, y, z = target[:, 0], target[:, 1], target[:, 2]
+        np.isfinite(x, out=valid)
+        for v in (y, z):
+            np.isfinite(v, out=mask)
+            valid &= mask
+        np.greater(z, 0, out=mask)
+        valid &= mask
+        np.copyto(safe_z, z)
+        np.logical_not(valid, out=mask)
+        np.copyto(safe_z, 1.0, where=mask)
+
+        np.divide(x, safe_z, out=xp)
+        xp -= p["codx"]
+        np.divide(y, safe_z, out=yp)
+        yp -= p["cody"]
+
+        np.multiply(xp, xp, out=xp2)
+        np.multiply(yp, yp, out=yp2)
+        np.multiply(xp, yp, out=xyp)
+        np.add(xp2, yp2, out=rs)
+        np.less_equal(rs, self.metric_radius * self.metric_radius, out=mask)
+        valid &= mask
+
+        np.multiply(rs, rs, out=rss)
+        np.multiply(rss, rs, out=rsc)
+        # a = 1 + k1*rs + k2*rss + k3*rsc, b = 1 + k4*rs + k5*rss + k6*rsc (urutan penjumlahan sama dengan SDK)
+        for poly, (k1, k2, k3) in ((a, ("k1", "k2", "k3")), (b, ("k4", "k5", "k6"))):
+            poly.fill(1.0)
+            for power, k in ((rs, k1), (rss, k2), (rsc, k3)):
+                np.multiply(power, p[k], out=tmp)
+                poly += tmp
+        np.equal(b, 0.0, out=mask)
+        np.copyto(b, 1.0, where=mask)
+        d = np.divide(a, b, out=a)
+
+        # Brown-Conrady memakai faktor 2 pada suku tangensial xyp * p1 / xyp * p2
+        tangential = 2.0 if self.model == K4A_CALIBRATION_LENS_DISTORTION_MODEL_BROWN_CONRADY else 1.0
+        for coord, square, radial_p, cross_p, center, focal, principal, column in (
+                (xp, xp2, "p2", "p1", "codx", "fx", "cx", 0),
+                (yp, yp2, "p1", "p2", "cody", "fy", "cy", 1)):
+            coord *= d
+            # coord += (rs + 2 * square) * radial_p + tangential * xyp * cross_p
+            np.multiply(square, 2.0, out=tmp)
+            tmp += rs
+            tmp *= p[radial_p]
+            np.multiply(xyp, tangential, out=tmp2)
+            tmp2 *= p[cross_p]
+            tmp += tmp2
+            coord += tmp
+            coord += p[center]
+            coord *= p[focal]
+            coord += p[principal]
+            points2d[:, column] = coord
+        return points2d, valid
+
+    def project_pixels(self, points, out=None):
+        """Seperti `project`, tetapi piksel dibulatkan ke int (truncate, sama dengan int() per titik).
+
+        `out` = (pixels int64 (N, 2), valid (N,)) yang diisi ulang, misal dari `PixelBuffers`.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        n = len(points)
+        if out is None:
+            out = (np.empty((n, 2), dtype=np.int64), np.empty(n, dtype=bool))
+        pixels, valid = out
+        self._workspace(n)
+        points2d, valid = self.project(points, (self._points2d[:n], valid))
+        pixels.fill(0)
+        np.copyto(pixels, points2d, casting="unsafe", where=valid[:, None])
+        return pixels, valid
+
+
+class PixelBuffers:
+    """Buffer output `project_pixels` yang dipakai ulang bergiliran antar frame.
+
+    Piksel satu frame masih dibaca stage render (thread lain) setelah frame berikutnya
+    dianalisis, jadi satu buffer baru diisi lagi setelah `depth` frame; `depth` harus
+    lebih besar dari jumlah hasil yang bisa tertahan di antrean render + yang sedang digambar.
+    """
+
+    def __init__(self, depth=PIXEL_BUFFER_DEPTH):
+        self._slots = [None] * depth
+        self._next = 0
+
+    def get(self, n):
+        """(pixels (n, 2) int64, valid (n,) bool) berikutnya di ring."""
+        i = self._next
+        self._next = (i + 1) % len(self._slots)
+        slot = self._slots[i]
+        if slot is None or len(slot[1]) < n:
+            capacity = max(n, 2 * len(slot[1]) if slot is not None else WORKSPACE_POINTS)
+            slot = self._slots[i] = (np.empty((capacity, 2), dtype=np.int64), np.empty(capacity, dtype=bool))
+        return slot[0][:n], slot[1][:n]
+
+
+def compare_with_sdk(projector, points, sdk_project):
+    """Bandingkan hasil batch dengan fungsi SDK per titik.
+
+    `sdk_project(point) -> (x, y)` float atau None jika tidak valid.
+    Return (error piksel maksimum, jumlah titik yang status validnya berbeda).
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    points2d, valid = projector.project(points)
+    max_error = 0.0
+    mismatched = 0
+    for point, p2d, ok in zip(points, points2d, valid):
+        ref = sdk_project(point)
+        if (ref is not None) != bool(ok):
+            mismatched += 1
+        elif ref is not None:
+            max_error = max(max_error, float(np.hypot(p2d[0] - ref[0], p2d[1] - ref[1])))
+    return max_error, mismatched
@@ -0,0 +1,94 @@
+"""Jarak antar orang: matriks jarak pusat bahu, tetangga terdekat, dan peringatan terlalu dekat.
+
+Pusat bahu semua body diambil sekali per frame (`identity_tracker.shoulder_centers`)
+lalu seluruh pasangan dihitung dalam satu operasi NumPy. Body dengan pusat bahu
+NaN (joint tidak tercatat) tidak ikut dipasangkan.
+"""
+import numpy as np
+
+from identity_tracker import shoulder_centers
+
+DEFAULT_MIN_DISTANCE = 1000.0  # mm, dua orang lebih dekat dari ini -> peringatan
+MAX_DISTANCE_LINES = 10        # baris teks jarak maksimum di layar (pasangan terdekat dulu)
+
+
+def distance_matrix(centers):
+    """Matriks jarak (N, N) dalam mm. Diagonal = inf, baris/kolom body tidak valid = NaN."""
+    diff = centers[:, None, :] - centers[None, :, :]
+    dist = np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+    np.fill_diagonal(dist, np.inf)
+    return dist
+
+
+class Proximity:
+    """Hasil jarak satu frame. Indeks = posisi body di list `frame.bodies`.
+
+    `nearest[i]` = indeks tetangga terdekat body i (-1 jika tidak ada),
+    `pairs` = (i, j, jarak) semua pasangan valid urut dari yang terdekat,
+    `alerts` = bagian dari `pairs` yang lebih dekat dari `min_distance`.
+    """
+    __slots__ = ("matrix", "nearest", "nearest_distance", "pairs", "alerts")
+
+    def __init__(self, centers, min_distance=DEFAULT_MIN_DISTANCE):
+        n = len(centers)
+        self.matrix = distance_matrix(centers)
+        finite = np.where(np.isnan(self.matrix), np.inf, self.matrix)
+
+        if n:
+            self.nearest = finite.argmin(axis=1)
+            self.nearest_distance = finite[np.arange(n), self.nearest]
+            self.nearest[~np.isfinite(self.nearest_distance)] = -1
+        else:
+            self.nearest = np.empty(0, dtype=np.intp)
+            self.nearest_distance = np.empty(0)
+
+        rows, cols = np.triu_indices(n, 1)
+        dist = finite[rows, cols]
+        ok = np.isfinite(dist)
+        rows, cols, dist = rows[ok], cols[ok], dist[ok]
+        order = np.argsort(dist, kind="stable")
+        self.pairs = list(zip(rows[order].tolist(), cols[order].tolist(), dist[order].tolist()))
+        self.alerts = [p for p in self.pairs if p[2] < min_distance]
+
+
+class ProximityMonitor:
+    """Hitung `Proximity` per frame dan laporkan pasangan yang BARU masuk jarak terlalu dekat.
+
+    Pasangan dikenali lewat `track_id` (atau `index` jika belum dilacak) sehingga
+    peringatan tidak diulang setiap frame selama dua orang tetap berdekatan.
+    """
+
+    def __init__(self, min_distance=DEFAULT_MIN_DISTANCE):
+        self.min_distance = min_distance
+        self.active = set()  # pasangan (id_a, id_b) yang sedang terlalu dekat
+
+    def update(self, bodies, centers=None):
+        """Return (Proximity, list (id_a, id_b, jarak_mm) peringatan baru di frame ini)."""
+        if centers is None:
+            centers = shoulder_centers(bodies)
+        prox = Proximity(centers, self.min_distance)
+
+        active = set()
+        new_alerts = []
+        for i, j, dist in prox.alerts:
+            a, b = _body_key(bodies[i]), _body_key(bodies[j])
+            key = (a, b) if a <= b else (b, a)
+            active.add(key)
+            if key not in self.active:
+                new_alerts.append((key[0], key[1], dist))
+        self.active = active
+        return prox, new_alerts
+
+
+def _body_key(body):
+    return body.track_id if body.track_id is not None else body.index
+
+
+def distance_texts(prox, max_lines=MAX_DISTANCE_LINES):
+    """Teks jarak antar orang sebagai list (teks, y_offset), satu baris per pasangan, terdekat dulu."""
+    texts = []
+    alerts = set((i, j) for i, j, _ in prox.alerts)
+    for k, (i, j, dist) in enumerate(prox.pairs[:max_lines]):
+        warn = " TERLALU DEKAT" if (i, j) in alerts else ""
+        texts.append((f"Jarak {i+1}-{j+1}: {dist / 1000.0:.2f} m{warn}", 50 + k * 30))
+    return texts
@@ -0,0 +1,217 @@
+"""Subsistem render: gambar hasil analitik ke jendela dan/atau file video.
+
+Biaya render dipangkas di beberapa tempat:
+    - output diperkecil (`scale`) dan opsional dipotong ke ROI sebelum digambar,
+      sehingga kerangka, teks, dan imshow bekerja pada piksel yang jauh lebih sedikit;
+    - layer statis (kotak ROI) dirender sekali per ukuran output lalu hanya disalin
+      piksel-pikselnya; teks label dan jarak dirender sekali per isi teks (cache);
+    - laju tampil/rekam dibatasi `max_fps`, terpisah dari laju analitik (`due()`);
+    - mode headless (tanpa `Renderer` sama sekali) dipilih di workout.py: gambar warna
+      tidak diambil dan tidak ada yang digambar.
+"""
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from kinect_joints import K4ABT_JOINT_COUNT, K4ABT_JOINT_HEAD
+from overlay import BONES, draw_hud
+
+RENDER_SCALE = 0.5       # ukuran output relatif terhadap gambar warna
+CROP_TO_ROI = False      # True = hanya area ROI yang ditampilkan
+DISPLAY_FPS = 15.0       # laju tampil/rekam maksimum; None = setiap frame hasil analitik
+WINDOW_NAME = "Azure Kinect Body Tracking"
+TEXT_CACHE_SIZE = 64     # jumlah teks berbeda yang disimpan hasil rendernya
+MIN_FONT_SCALE = 0.4
+
+_BONE_A = np.array([a for a, _ in BONES])
+_BONE_B = np.array([b for _, b in BONES])
+
+
+class Renderer:
+    """Menyusun gambar output dari `FrameResult` dan menampilkan / merekamnya.
+
+    `frame_size` = (lebar, tinggi) gambar warna, `roi` = (x1, y1, x2, y2) di koordinat gambar warna.
+    """
+
+    def __init__(self, frame_size, roi, scale=RENDER_SCALE, crop_to_roi=CROP_TO_ROI, max_fps=DISPLAY_FPS,
+                 window=WINDOW_NAME, record_path=None, show=True):
+        if scale <= 0:
+            raise ValueError(f"scale harus > 0, dapat {scale!r}")
+        w, h = frame_size
+        roi_x1, roi_y1, roi_x2, roi_y2 = roi[:4]
+        self.crop = (roi_x1, roi_y1, roi_x2, roi_y2) if crop_to_roi else (0, 0, w, h)
+        x0, y0, x1, y1 = self.crop
+        self.cropped = crop_to_roi  # body di luar ROI tidak diberi label cadangan di pojok
+        self.scale = scale
+        self.origin = np.array([x0, y0], dtype=np.float64)
+        self.size = (max(1, round((x1 - x0) * scale)), max(1, round((y1 - y0) * scale)))
+        # INTER_AREA punya jalur cepat untuk faktor bulat (1/2, 1/3, ...); skala lain pakai linear
+        self.interpolation = cv2.INTER_AREA if (1.0 / scale).is_integer() else cv2.INTER_LINEAR
+        self.font_scale = max(MIN_FONT_SCALE, 0.8 * scale)
+        self.thickness = 2 if scale >= 0.75 else 1
+        self.joint_thickness = 2 * max(1, round(3 * scale)) + 1  # diameter titik joint (radius 3 px pada skala penuh)
+        self.window = window
+        self.show = show
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self._next_due = None
+        self.frames_rendered = 0
+
+        out_w, out_h = self.size
+        self.output = np.empty((out_h, out_w, 3), dtype=np.uint8)
+        self._resized = np.empty((out_h, out_w, 4), dtype=np.uint8)
+        self._static = self._static_layer((roi_x1, roi_y1, roi_x2, roi_y2))
+        self._texts = OrderedDict()
+
+        self.writer = None
+        if record_path is not None:
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+            self.writer = cv2.VideoWriter(record_path, fourcc, max_fps or 30.0, self.size)
+            if not self.writer.isOpened():
+                raise ValueError(f"tidak bisa membuat file video {record_path!r}")
+
+    def to_output(self, points):
+        """Koordinat gambar warna (N, 2) -> koordinat output (N, 2) int."""
+        return ((np.asarray(points, dtype=np.float64) - self.origin) * self.scale).round().astype(np.int32)
+
+    def due(self, timestamp):
+        """True jika frame dengan `timestamp` perlu dirender (laju dibatasi `max_fps`)."""
+        if not self.interval:
+            return True
+        if self._next_due is None or timestamp - self._next_due > self.interval:
+            self._next_due = timestamp  # awal, atau tertinggal jauh: mulai jadwal baru
+        if timestamp < self._next_due:
+            return False
+        self._next_due += self.interval
+        return True
+
+    def _static_layer(self, roi):
+        """Piksel kotak ROI + teks "ROI" di output, sebagai (indeks baris, indeks kolom, warna)."""
+        layer = np.zeros_like(self.output)
+        (x1, y1), (x2, y2) = self.to_output([roi[:2], roi[2:]])
+        x2, y2 = min(x2, self.size[0] - 1), min(y2, self.size[1] - 1)  # saat crop, kotak = tepi output
+        cv2.rectangle(layer, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 255), self.thickness)
+        cv2.putText(layer, "ROI", (int(x1) + 6, int(y1) + round(22 * self.scale)),
+                    cv2.FONT_HERSHEY_SIMPLEX, max(MIN_FONT_SCALE, 0.7 * self.scale), (0, 255, 255), self.thickness)
+        rows, cols = np.nonzero(layer.any(axis=2))
+        return rows, cols, layer[rows, cols]
+
+    def _text(self, text, color, background):
+        """Teks yang sudah dirender: (gambar, mask piksel teks atau None jika latar penuh, (dx, dy) titik
+        awal baseline di gambar). Disimpan per (teks, warna, latar) sehingga putText hanya dipanggil saat
+        isi teks berubah."""
+        key = (text, color, background)
+        patch = self._texts.get(key)
+        if patch is not None:
+            self._texts.move_to_end(key)
+            return patch
+        (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, self.thickness)
+        pad = 6 if background is not None else 0
+        image = np.zeros((text_h + baseline + 2 * pad, text_w + 2 * pad, 3), dtype=np.uint8)
+        if background is not None:
+            image[:] = background
+        cv2.putText(image, text, (pad, pad + text_h), cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, color,
+                    self.thickness)
+        mask = None if background is not None else image.any(axis=2).astype(np.uint8)
+        patch = self._texts[key] = (image, mask, (pad, pad + text_h))
+        if len(self._texts) > TEXT_CACHE_SIZE:
+            self._texts.popitem(last=False)
+        return patch
+
+    def _blit_text(self, text, x, y, color, background=None):
+        """Tempel teks dengan baseline kiri di (x, y) output; bagian di luar gambar dipotong."""
+        image, mask, (dx, dy) = self._text(text, color, background)
+        top, left = y - dy, x - dx
+        out_h, out_w = self.output.shape[:2]
+        y0, x0 = max(top, 0), max(left, 0)
+        y1, x1 = min(top + image.shape[0], out_h), min(left + image.shape[1], out_w)
+        if y0 >= y1 or x0 >= x1:
+            return
+        src = (slice(y0 - top, y1 - top), slice(x0 - left, x1 - left))
+        if mask is None:
+            self.output[y0:y1, x0:x1] = image[src]
+        else:
+            cv2.copyTo(image[src], mask[src], self.output[y0:y1, x0:x1])
+
+    def compose(self, result, hud=None):
+        """Susun gambar output (BGR, buffer milik renderer) untuk satu `FrameResult`."""
+        x0, y0, x1, y1 = self.crop
+        source = result.frame.color_image[y0:y1, x0:x1]
+        if self.scale == 1.0:
+            cv2.cvtColor(source, cv2.COLOR_BGRA2BGR, dst=self.output)
+        else:
+            cv2.resize(source, self.size, dst=self._resized, interpolation=self.interpolation)
+            cv2.cvtColor(self._resized, cv2.COLOR_BGRA2BGR, dst=self.output)
+        out = self.output
+        rows, cols, colors = self._static
+        out[rows, cols] = colors
+
+        s = self.scale
+        for text, y_offset in result.distance_texts:
+            self._blit_text(text, round(50 * s), round(y_offset * s), (0, 0, 250))
+
+        bodies = result.frame.bodies
+        if bodies:
+            self._draw_bodies(result, bodies)
+        if hud:
+            draw_hud(out, hud)
+        return out
+
+    def _draw_bodies(self, result, bodies):
+        out = self.output
+        out_h, out_w = out.shape[:2]
+        pixels = self.to_output(result.joint_pixels).reshape(len(bodies), K4ABT_JOINT_COUNT, 2)
+        inside = (result.joint_valid.reshape(len(bodies), K4ABT_JOINT_COUNT)
+                  & (pixels[..., 0] >= 0) & (pixels[..., 0] < out_w)
+                  & (pixels[..., 1] >= 0) & (pixels[..., 1] < out_h))
+        selected = np.array([result.selected_body_index == body.index for body in bodies])
+
+        # tulang: satu polylines per warna untuk semua body
+        bones = inside[:, _BONE_A] & inside[:, _BONE_B]
+        for is_selected, color in ((False, (120, 120, 120)), (True, (255, 0, 0))):
+            mask = bones & (selected == is_selected)[:, None]
+            if mask.any():
+                body, bone = np.nonzero(mask)
+                segments = np.stack([pixels[body, _BONE_A[bone]], pixels[body, _BONE_B[bone]]], axis=1)
+                cv2.polylines(out, list(segments), False, color, self.thickness)
+
+        # joint: segmen sepanjang nol dengan ujung bulat = titik, semua joint satu warna dalam satu panggilan
+        for is_selected, color in ((False, (80, 80, 80)), (True, (0, 255, 0))):
+            joints = pixels[inside & (selected == is_selected)[:, None]]
+            if len(joints):
+                cv2.polylines(out, list(np.stack([joints, joints], axis=1)), False, color, self.joint_thickness)
+
+        # label di atas kepala, atau di pojok kiri atas jika kepala tidak terlihat
+        for n, body in enumerate(bodies):
+            label = result.labels[n]
+            if inside[n, K4ABT_JOINT_HEAD]:
+                head_x, head_y = pixels[n, K4ABT_JOINT_HEAD].tolist()
+                text_x = max(5, head_x - round(80 * self.scale))
+                text_y = max(20, head_y - round(40 * self.scale))
+                self._blit_text(label, text_x, text_y, (0, 255, 255), background=(0, 0, 0))
+            elif not self.cropped or selected[n]:
+                self._blit_text(label, 10, round((30 + 20 * body.index) * self.scale) + 10, (0, 255, 255))
+
+    def render(self, result, hud=None):
+        """Susun lalu tampilkan dan/atau rekam satu frame. Return gambar output."""
+        out = self.compose(result, hud)
+        if self.show:
+            cv2.imshow(self.window, out)
+        if self.writer is not None:
+            self.writer.write(out)
+        self.frames_rendered += 1
+        return out
+
+    def poll_key(self, delay=1):
+        """Tombol yang ditekan di jendela (kode 8 bit) atau None; tanpa jendela selalu None."""
+        if not self.show:
+            return None
+        key = cv2.waitKey(delay)
+        return None if key < 0 else key & 0xFF
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+        if self.show:
+            cv2.destroyWindow(self.window)
@@ -0,0 +1,110 @@
+"""Analitik per repetisi dan ringkasan sesi.
+
+`RepCounter` membuat satu `RepRecord` setiap repetisi selesai (kembali ke posisi
+awal), langsung dari transisi state machine: waktu mulai (frame terakhir di zona
+istirahat), puncak metrik, range of motion, serta waktu konsentrik (mulai -> puncak)
+dan eksentrik (puncak -> selesai). `SessionSummary` mengumpulkan record tersebut
+dan menulis satu file JSON ringkas per sesi (agregat per track per gerakan + tabel
+rep), sehingga pelatih tidak perlu mengolah log pose mentah.
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+REP_FIELDS = ("track", "exercise", "number", "start", "end", "peak", "rom", "concentric", "eccentric", "side")
+
+
+def _round(value, digits):
+    return None if value is None else round(value, digits)
+
+
+class RepRecord:
+    """Satu repetisi selesai. Waktu dalam detik (timestamp frame), metrik dalam mm.
+
+    `rom` = None jika posisi istirahat sebelum rep tidak pernah terlihat (ROM tidak diketahui).
+    """
+    __slots__ = REP_FIELDS
+
+    def __init__(self, track, exercise, number, start, end, peak, rom, concentric, eccentric, side=None):
+        self.track = track
+        self.exercise = exercise
+        self.number = number
+        self.start = start
+        self.end = end
+        self.peak = peak
+        self.rom = rom
+        self.concentric = concentric
+        self.eccentric = eccentric
+        self.side = side  # "right" / "left" untuk gerakan bilateral
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def to_row(self):
+        return [self.track, self.exercise, self.number, round(self.start, 3), round(self.end, 3),
+                round(self.peak, 1), _round(self.rom, 1), round(self.concentric, 3), round(self.eccentric, 3),
+                self.side]
+
+    def __repr__(self):
+        rom = "?" if self.rom is None else f"{self.rom:.0f}"
+        return (f"RepRecord({self.exercise} #{self.number} track={self.track} {self.duration:.2f}s "
+                f"rom={rom} {self.concentric:.2f}/{self.eccentric:.2f}s)")
+
+
+class SessionSummary:
+    """Kumpulan `RepRecord` satu sesi; `add` bisa langsung dipakai sebagai callback `on_rep` RepCounter."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.records = []
+
+    def add(self, record):
+        self.records.append(record)
+
+    def aggregates(self):
+        """{track: {gerakan: statistik}} dari semua rep yang tercatat.
+
+        Rep dengan ROM tidak diketahui tetap dihitung, tetapi tidak ikut `rom_mean` / `rom_min`
+        (None jika tidak ada ROM sama sekali).
+        """
+        groups = {}
+        for r in self.records:
+            groups.setdefault(r.track, {}).setdefault(r.exercise, []).append(r)
+        result = {}
+        for track, exercises in groups.items():
+            result[track] = {}
+            for exercise, reps in exercises.items():
+                duration = np.array([r.duration for r in reps])
+                rom = np.array([r.rom for r in reps if r.rom is not None and np.isfinite(r.rom)])
+                span = reps[-1].end - reps[0].start
+                result[track][exercise] = {
+                    "reps": len(reps),
+                    "duration_mean_s": round(float(duration.mean()), 3),
+                    "duration_min_s": round(float(duration.min()), 3),
+                    "duration_max_s": round(float(duration.max()), 3),
+                    "rom_mean": round(float(rom.mean()), 1) if len(rom) else None,
+                    "rom_min": round(float(rom.min()), 1) if len(rom) else None,
+                    "concentric_mean_s": round(float(np.mean([r.concentric for r in reps])), 3),
+                    "eccentric_mean_s": round(float(np.mean([r.eccentric for r in reps])), 3),
+                    "reps_per_min": round(60.0 * len(reps) / span, 1) if span > 0 else None,
+                }
+        return result
+
+    def to_dict(self):
+        return {
+            "started": self.started,
+            "written": time.time(),
+            "tracks": {str(track): stats for track, stats in self.aggregates().items()},
+            "rep_fields": list(REP_FIELDS),
+            "reps": [r.to_row() for r in self.records],
+        }
+
+    def write(self, path):
+        """Tulis ringkasan ke `path` secara atomik (file lama diganti utuh)."""
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp, path)
@@ -0,0 +1,235 @@
+import time
+
+import numpy as np
+
+from exercise_registry import load_registry
+from rep_analytics import RepRecord
+
+# Definisi gerakan (metrik, threshold, milestone, pesan ESP32) ada di exercises.json
+DEFAULT_REGISTRY = load_registry()
+EXERCISES = DEFAULT_REGISTRY.names
+EXERCISE_CHOICES = DEFAULT_REGISTRY.choices
+
+INITIAL_CAPACITY = 8  # jumlah body awal di array state (tumbuh 2x jika penuh)
+THRESHOLD_FIELDS = ("enter", "exit", "right", "left", "center", "neutral")  # array per baris
+# analitik rep berjalan per baris: posisi istirahat sebelum rep dan puncak rep
+ANALYTICS_FIELDS = ("rest_excursion", "rest_value", "rest_time", "peak_excursion", "peak_value", "peak_time")
+REST_TOLERANCE = 20.0  # mm, masih dianggap di posisi istirahat (awal rep = frame terakhir di sini)
+
+
+class RepCounter:
+    """State machine semua gerakan terpilih untuk banyak body.
+
+    Tidak bergantung pada kamera, OpenCV, maupun serial: notifikasi milestone
+    diteruskan ke callback `notify(message, info)` sehingga bisa dipakai baik di
+    loop live maupun replay headless.
+
+    State per body disimpan sebagai satu baris di array NumPy (keadaan, hitungan,
+    flag milestone) sehingga semua gerakan dievaluasi sekaligus per frame dan
+    body baru hanya mengambil baris kosong, tanpa membuat dict baru. Threshold juga
+    disimpan per baris (default dari registry) sehingga hasil kalibrasi per orang
+    (`set_thresholds`) tidak mempengaruhi body lain.
+
+    Setiap repetisi yang selesai diteruskan sebagai `RepRecord` ke callback
+    `on_rep(record)` (durasi, puncak, range of motion, waktu konsentrik/eksentrik);
+    state analitiknya juga berupa beberapa kolom tetap per baris.
+    """
+
+    def __init__(self, selected_exercise="all", registry=None, notify=None, verbose=True, on_rep=None):
+        self.registry = registry or DEFAULT_REGISTRY
+        self.selected_exercise = selected_exercise
+        self.compiled = self.registry.compile(selected_exercise)
+        self.notify = notify
+        self.verbose = verbose
+        self.on_rep = on_rep
+
+        n = len(self.compiled)
+        self.slots = {}  # body_key -> baris di array state
+        self._free = []
+        # keadaan: 0 = down / tengah, 1 = up / miring kanan, -1 = miring kiri
+        self.states = np.zeros((INITIAL_CAPACITY, n), dtype=np.int8)
+        self.counts_array = np.zeros((INITIAL_CAPACITY, n), dtype=np.int32)
+        self.milestone_sent = np.zeros((INITIAL_CAPACITY, n), dtype=bool)
+        self.success_sent = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        for name in THRESHOLD_FIELDS:
+            setattr(self, name, np.tile(getattr(self.compiled, name), (INITIAL_CAPACITY, 1)))
+        for name in ANALYTICS_FIELDS:
+            setattr(self, name, np.full((INITIAL_CAPACITY, n), np.nan))
+
+    def slot(self, body_key):
+        """Baris state untuk `body_key` (dialokasikan saat pertama kali terlihat)."""
+        row = self.slots.get(body_key)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                row = len(self.slots)
+                if row >= len(self.states):
+                    self._grow()
+            self.slots[body_key] = row
+        return row
+
+    def _grow(self):
+        capacity = 2 * len(self.states)
+        for name in ("states", "counts_array", "milestone_sent", "success_sent"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        for name in THRESHOLD_FIELDS:
+            old = getattr(self, name)
+            new = np.tile(getattr(self.compiled, name), (capacity, 1))
+            new[:len(old)] = old
+            setattr(self, name, new)
+        for name in ANALYTICS_FIELDS:
+            old = getattr(self, name)
+            new = np.full((capacity,) + old.shape[1:], np.nan)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def set_thresholds(self, body_key, registry):
+        """Pakai threshold dari `registry` (misal hasil kalibrasi) khusus untuk `body_key`."""
+        compiled = registry.compile(self.selected_exercise)
+        if compiled.names != self.compiled.names:
+            raise ValueError(f"gerakan registry {compiled.names} tidak sama dengan counter {self.compiled.names}")
+        row = self.slot(body_key)
+        for name in THRESHOLD_FIELDS:
+            getattr(self, name)[row] = getattr(compiled, name)
+
+    def _send(self, message, info):
+        if self.notify is not None:
+            self.notify(message, info)
+
+    def compute_metrics(self, positions):
+        """Nilai metrik semua gerakan terpilih untuk satu skeleton, urut `self.compiled.names`."""
+        return self.compiled.metrics(positions)
+
+    def update(self, body_key, positions, is_target, metrics=None, timestamp=None):
+        """Proses satu body untuk satu frame (`timestamp` detik, default waktu sekarang).
+
+        Return tuple nama gerakan yang bertambah hitungannya di frame ini.
+        """
+        row = self.slot(body_key)
+        if not is_target:
+            return ()
+
+        c = self.compiled
+        metric = c.metrics(positions) if metrics is None else metrics
+        state = self.states[row]
+        if timestamp is None:
+            timestamp = time.time()
+
+        # semua mask dihitung dari keadaan lama sebelum ada yang diubah
+        signed = metric * c.sign
+        up = c.hysteresis & (signed < self.enter[row])
+        down = c.hysteresis & ~up & (signed > self.exit[row])
+        centered = state == 0
+        m = metric - self.neutral[row]
+        back = c.bilateral & ~centered & (np.abs(m) < self.center[row])
+        right = c.bilateral & centered & (m > self.right[row])
+        left = c.bilateral & centered & ~right & (m < self.left[row])
+        counted = (up & centered) | back
+        resting = centered & (down | (c.bilateral & (np.abs(m) < self.center[row])))
+        finished = (down & ~centered) | back
+
+        state[up | right] = 1
+        state[left] = -1
+        state[down | back] = 0
+
+        # -------- ANALITIK REP: awal = frame terakhir di posisi istirahat, puncak = simpangan terjauh --------
+        # simpangan: makin besar makin jauh dari posisi istirahat (hysteresis bertanda, bilateral |m|)
+        excursion = np.where(c.hysteresis, -signed, np.abs(m))
+        rest = self.rest_excursion[row]
+        lower = resting & ~(excursion >= rest)  # juga saat belum ada posisi istirahat (NaN)
+        near = resting & (excursion <= rest + REST_TOLERANCE)
+        rest[lower] = excursion[lower]
+        self.rest_value[row][lower] = metric[lower]
+        self.rest_time[row][lower | near] = timestamp
+        peak = self.peak_excursion[row]
+        started = (up & centered) | right | left
+        improved = (state != 0) & (started | (excursion > peak))
+        if improved.any():
+            peak[improved] = excursion[improved]
+            self.peak_value[row][improved] = metric[improved]
+            self.peak_time[row][improved] = timestamp
+
+        counts = self.counts_array[row]
+        counted_names = ()
+        if counted.any():
+            counts += counted
+            sent = self.milestone_sent[row]
+            for i in np.flatnonzero(counted):
+                name = c.names[i]
+                counted_names += (name,)
+                if self.verbose:
+                    print(f"{name.capitalize()} count: {counts[i]}")
+                if counts[i] == c.milestone_reps[i] and not sent[i]:
+                    self._send(*c.messages[i])
+                    sent[i] = True
+
+        if finished.any():
+            if self.on_rep is not None:
+                for i in np.flatnonzero(finished):
+                    self.on_rep(self._record(body_key, row, i, timestamp))
+            rest[finished] = np.nan  # posisi istirahat rep berikutnya dicari ulang
+
+        # -------- CEK TOTAL REP & KIRIM NOTIF KE ESP32 --------
+        total_rep = int(counts.sum())
+        if total_rep >= c.total_target_reps and not self.success_sent[row]:
+            self._send(c.success_message, f"total rep: {total_rep}")
+            self.success_sent[row] = True
+
+        return counted_names
+
+    def _record(self, body_key, row, i, end):
+        peak_time = self.peak_time[row, i]
+        start = self.rest_time[row, i]
+        if not np.isfinite(start):
+            start = peak_time  # body sudah di luar zona istirahat sejak pertama terlihat
+        peak = self.peak_value[row, i]
+        rest = self.rest_value[row, i]
+        rom = float(abs(peak - rest)) if np.isfinite(rest) else None  # posisi istirahat tidak pernah terlihat
+        side = None
+        if self.compiled.bilateral[i]:
+            side = "right" if peak - self.neutral[row, i] > 0 else "left"
+        return RepRecord(body_key, self.compiled.names[i], int(self.counts_array[row, i]), float(start), float(end),
+                         float(peak), rom, float(peak_time - start), float(end - peak_time), side)
+
+    def forget(self, body_key):
+        """Hapus state satu body (misal track kedaluwarsa). Return hitungan terakhirnya atau None."""
+        row = self.slots.pop(body_key, None)
+        if row is None:
+            return None
+        counts = self._counts_of(row)
+        self.states[row] = 0
+        self.counts_array[row] = 0
+        self.milestone_sent[row] = False
+        self.success_sent[row] = False
+        for name in THRESHOLD_FIELDS:
+            getattr(self, name)[row] = getattr(self.compiled, name)
+        for name in ANALYTICS_FIELDS:
+            getattr(self, name)[row] = np.nan
+        self._free.append(row)
+        return counts
+
+    def _counts_of(self, row):
+        counts = dict.fromkeys(self.registry.names, 0)
+        for name, value in zip(self.compiled.names, self.counts_array[row].tolist()):
+            counts[name] = value
+        return counts
+
+    def counts(self, body_key):
+        """Hitungan semua gerakan di registry (0 untuk yang tidak dipilih)."""
+        return self._counts_of(self.slot(body_key))
+
+    def progress(self, body_key):
+        """(hitungan, flag milestone tercapai, flag total tercapai) gerakan terpilih - state untuk ESP32."""
+        row = self.slot(body_key)
+        return self.counts_array[row].tolist(), self.milestone_sent[row].tolist(), bool(self.success_sent[row])
+
+    def label(self, body_key, is_target):
+        """Teks ringkasan di atas kepala: hitungan untuk target, "Other" untuk lainnya."""
+        if not is_target:
+            return "Other"
+        counts = self.counts_array[self.slot(body_key)].tolist()
+        return " ".join(f"{label}:{count}" for label, count in zip(self.compiled.labels, counts))
@@ -0,0 +1,231 @@
+"""Replay headless: jalankan penghitung repetisi dari log pose tanpa Kinect.
+
+Contoh:
+    python replay.py data_gerakan.poselog --exercise all
+    python replay.py data_gerakan.csv --exercise all
+    python replay.py sesi1.csv sesi2.csv --knee-up 70 --shoulder-down 50
+    python replay.py sesi1.csv --batch   # hitung seluruh rekaman sekaligus (NumPy)
+    python replay.py sesi1.csv --filter  # haluskan joint (One-Euro) sebelum menghitung
+    python replay.py sesi1.csv --calibrate  # threshold per orang dari 3 s diam + 6 s contoh per gerakan
+    python replay.py sesi1.csv --summary    # tulis analitik per rep ke sesi1_summary.json
+    python replay.py sesi1.csv --exercises latihan_lain.json  # definisi gerakan lain
+    python replay.py sesi1.csv --station B   # kirim rep ke daemon agregasi sebagai stasiun B
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from kinect_joints import K4ABT_JOINT_SHOULDER_RIGHT, K4ABT_JOINT_SHOULDER_LEFT
+from calibration import NEUTRAL_SECONDS, SAMPLE_SECONDS, ThresholdCalibrator
+from identity_tracker import IdentityTracker
+from joint_filter import JointFilter
+from pipeline import Pipeline, Stage
+from rep_analytics import SessionSummary
+from pose_log import PoseLogReplaySource, open_pose_source, poses_from_log, read_pose_log
+from batch_counter import count_reps_batch, poses_from_frames, select_center_body_batch
+from exercise_registry import DEFAULT_EXERCISES_PATH, GLOBAL_PARAMS, load_registry
+from rep_counter import RepCounter
+from station_client import DEFAULT_PORT, StationClient
+
+
+def select_center_body(bodies):
+    """Pengganti ROI tanpa kalibrasi kamera: body dengan pusat bahu paling dekat sumbu kamera (|x| terkecil)."""
+    target = None
+    min_dist = float("inf")
+    for body in bodies:
+        p = body.positions
+        sx = (p[K4ABT_JOINT_SHOULDER_RIGHT][0] + p[K4ABT_JOINT_SHOULDER_LEFT][0]) / 2.0
+        dist = abs(sx)
+        if dist < min_dist:
+            min_dist = dist
+            target = body.index
+    return target
+
+
+def count_frame(frame, counter, tracker, select_target=select_center_body, joint_filter=None,
+                calibrator=None):
+    """Proses satu frame: identitas -> pilih target -> (filter) -> (kalibrasi) -> hitung.
+
+    Return list rep (timestamp, track_id, exercise). Target yang masih di fase diam kalibrasi tidak dihitung.
+    """
+    for track_id in tracker.update(frame.timestamp, frame.bodies):
+        counter.forget(track_id)
+        if joint_filter is not None:
+            joint_filter.forget(track_id)
+        if calibrator is not None:
+            calibrator.forget(track_id)
+    target = select_target(frame.bodies)
+    counted = []
+    for body in frame.bodies:
+        positions = body.positions
+        if joint_filter is not None:
+            positions = joint_filter.apply(body.track_id, frame.timestamp, positions, body.confidence)
+        is_target = body.index == target
+        if is_target and calibrator is not None and calibrator.calibrated(body.track_id) is None:
+            thresholds = calibrator.update(body.track_id, frame.timestamp, positions)
+            if thresholds is not None:
+                counter.set_thresholds(body.track_id, thresholds)
+            is_target = calibrator.counting(body.track_id)
+        for exercise in counter.update(body.track_id, positions, is_target, timestamp=frame.timestamp):
+            counted.append((frame.timestamp, body.track_id, exercise))
+    return counted
+
+
+def run_replay(frames, counter, select_target=select_center_body, tracker=None, joint_filter=None,
+               calibrator=None):
+    """Umpankan frame ke `counter`. Return list rep (timestamp, track_id, exercise) dan jumlah frame."""
+    tracker = tracker or IdentityTracker()
+    reps = []
+    n_frames = 0
+    for frame in frames:
+        n_frames += 1
+        reps.extend(count_frame(frame, counter, tracker, select_target, joint_filter, calibrator))
+    return reps, n_frames
+
+
+def run_replay_pipeline(frames, counter, select_target=select_center_body, tracker=None, joint_filter=None,
+                        calibrator=None):
+    """Seperti `run_replay`, tetapi lewat `Pipeline` (stage analitik + pengumpul di thread sendiri)."""
+    tracker = tracker or IdentityTracker()
+    reps = []
+    pipeline = Pipeline([
+        Stage("analytics",
+              lambda frame: count_frame(frame, counter, tracker, select_target, joint_filter, calibrator),
+              queue_size=4, overflow="block"),
+        Stage("collect", reps.extend, queue_size=4, overflow="block"),
+    ])
+    pipeline.run(frames)
+    return reps, pipeline.frames_in
+
+
+def filter_poses(timestamps, poses, joint_filter):
+    """Terapkan `joint_filter` ke array pose mode batch (in-place), dikunci dengan body_index."""
+    for f, timestamp in enumerate(timestamps):
+        for b in range(poses.shape[1]):
+            if not np.isnan(poses[f, b]).all():
+                poses[f, b] = joint_filter.apply(b, timestamp, poses[f, b])
+
+
+def run_batch(path, selected_exercise, registry, joint_filter=None):
+    start = time.perf_counter()
+    source = open_pose_source(path)
+    if isinstance(source, PoseLogReplaySource):
+        timestamps, poses = poses_from_log(read_pose_log(path))
+    else:
+        timestamps, poses = poses_from_frames(source)
+    if joint_filter is not None:
+        filter_poses(timestamps, poses, joint_filter)
+    target = select_center_body_batch(poses)
+    target_mask = target[:, None] == np.arange(poses.shape[1])[None, :]
+    result = count_reps_batch(poses, timestamps, registry, selected_exercise, target_mask)
+    elapsed = time.perf_counter() - start
+
+    print(f"{path}: {len(timestamps)} frame dalam {elapsed:.3f} s (batch)")
+    for body_index in range(poses.shape[1]):
+        print_counts(f"Body {body_index}", {ex: int(result.counts[ex][body_index]) for ex in registry.names})
+
+
+def print_counts(name, counts):
+    summary = " ".join(f"{ex}={n}" for ex, n in counts.items())
+    print(f"  {name}: {summary}")
+
+
+def main(argv=None):
+    # file definisi gerakan dibaca dulu: pilihan --exercise dan flag threshold dibuat dari isinya
+    pre = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    pre.add_argument("--exercises", default=DEFAULT_EXERCISES_PATH)
+    known, _ = pre.parse_known_args(argv)
+    registry = load_registry(known.exercises)
+
+    parser = argparse.ArgumentParser(description="Replay log pose ke penghitung repetisi (tanpa kamera)",
+                                     parents=[pre], allow_abbrev=False)
+    parser.add_argument("logs", nargs="+", help="file log pose (.poselog biner atau CSV lama)")
+    parser.add_argument("--exercise", choices=registry.choices, default="all")
+    parser.add_argument("--verbose", action="store_true", help="cetak setiap repetisi & notifikasi")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="jalankan analitik lewat pipeline berthread (uji tanpa hardware)")
+    parser.add_argument("--batch", action="store_true",
+                        help="evaluasi vektor seluruh rekaman (tanpa notifikasi milestone)")
+    parser.add_argument("--filter", action="store_true",
+                        help="haluskan joint dengan filter One-Euro + bobot confidence sebelum menghitung")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="kalibrasi threshold per orang dari awal rekaman (diam lalu contoh gerakan)")
+    parser.add_argument("--neutral-seconds", type=float, default=NEUTRAL_SECONDS,
+                        help=f"durasi berdiri diam untuk kalibrasi (default {NEUTRAL_SECONDS})")
+    parser.add_argument("--sample-seconds", type=float, default=SAMPLE_SECONDS,
+                        help=f"durasi contoh per gerakan untuk kalibrasi (default {SAMPLE_SECONDS})")
+    parser.add_argument("--summary", action="store_true",
+                        help="tulis ringkasan sesi (durasi, ROM, tempo per rep) ke <log>_summary.json")
+    parser.add_argument("--station", default=None, help="kirim event rep ke daemon agregasi sebagai stasiun ini")
+    parser.add_argument("--aggregator", default=f"127.0.0.1:{DEFAULT_PORT}", help="alamat daemon agregasi")
+    params = registry.parameters()
+    for name, default in params.items():
+        parser.add_argument("--" + name.replace("_", "-"), type=int if name in GLOBAL_PARAMS else float,
+                            default=None, help=f"default {default}")
+    args = parser.parse_args(argv)
+
+    registry = registry.with_overrides({name: getattr(args, name) for name in params})
+
+    for path in args.logs:
+        if args.batch:
+            run_batch(path, args.exercise, registry, JointFilter() if args.filter else None)
+            continue
+
+        notifications = []
+        summary = SessionSummary()
+        station = StationClient(args.station, args.aggregator) if args.station is not None else None
+
+        def on_rep(record, summary=summary, station=station):
+            summary.add(record)
+            if station is not None:
+                station.rep(record)
+
+        counter = RepCounter(args.exercise, registry,
+                             notify=lambda msg, info: notifications.append(msg),
+                             verbose=args.verbose, on_rep=on_rep)
+        if station is not None:
+            station.session_start(args.exercise)
+        calibrator = None
+        if args.calibrate:
+            calibrator = ThresholdCalibrator(registry, args.exercise, args.neutral_seconds, args.sample_seconds)
+        start = time.perf_counter()
+        run = run_replay_pipeline if args.pipeline else run_replay
+        reps, n_frames = run(open_pose_source(path), counter,
+                             joint_filter=JointFilter() if args.filter else None, calibrator=calibrator)
+        elapsed = time.perf_counter() - start
+
+        print(f"{path}: {n_frames} frame dalam {elapsed:.3f} s")
+        # hitung dari daftar rep supaya track yang sudah kedaluwarsa tetap tercantum
+        per_track = {}
+        for _, track_id, exercise in reps:
+            counts = per_track.setdefault(track_id, dict.fromkeys(registry.names, 0))
+            counts[exercise] += 1
+        for track_id in sorted(set(per_track) | set(counter.slots)):
+            print_counts(f"Track {track_id}", per_track.get(track_id, dict.fromkeys(registry.names, 0)))
+        if calibrator is not None:
+            for track_id, overrides in sorted(calibrator.overrides.items()):
+                print(f"  Kalibrasi track {track_id}: " + " ".join(f"{k}={v}" for k, v in overrides.items()))
+        if notifications:
+            print(f"  Notifikasi: {' '.join(notifications)}")
+        if args.summary:
+            summary_path = os.path.splitext(path)[0] + "_summary.json"
+            summary.write(summary_path)
+            for track_id, exercises in sorted(summary.aggregates().items()):
+                for exercise, st in exercises.items():
+                    rom = "-" if st["rom_mean"] is None else f"{st['rom_mean']:.0f}"
+                    print(f"  Track {track_id} {exercise}: {st['reps']} rep selesai, durasi {st['duration_mean_s']:.2f} s, "
+                          f"ROM {rom} mm, konsentrik/eksentrik "
+                          f"{st['concentric_mean_s']:.2f}/{st['eccentric_mean_s']:.2f} s")
+            print(f"  Ringkasan sesi: {summary_path}")
+        if station is not None:
+            station.session_end(summary)
+            delivered = station.close(timeout=10)
+            st = station.stats()
+            print(f"  Stasiun {args.station}: {st['acked']}/{st['queued'] + st['restored']} event terkirim"
+                  + ("" if delivered else f", sisa di {station.spool_path}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Uji soak sesi panjang tanpa kamera: berjam-jam input sintetis diputar secepat mungkin lewat jalur analitik live.
+
+Rombongan orang datang dan pergi (body id baru setiap kunjungan, jeda lebih lama dari TTL tracker),
+log pose dirotasi, dan setiap `--sample-minutes` menit waktu sintetis dicatat RSS proses serta waktu
+analitik per frame (`WorkoutSession.analyze`, plus susun overlay jika `--render-scale` diberikan).
+Gagal (exit code 1) jika RSS setelah pemanasan naik lebih dari `--max-rss-growth-mb`, p50 waktu frame
+di akhir sesi lebih lambat dari `--max-slowdown` x awal sesi (median sepertiga jendela), atau state
+per orang / bagian log melewati batasnya:
+
+    python soak.py --hours 4
+    python soak.py --hours 1 --bodies 5 --rotate-minutes 10 --keep-logs 3
+    python soak.py --render-scale 0.5   # ikut menyusun overlay (butuh OpenCV)
+"""
+import argparse
+import functools
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from frame_source import Frame, Skeleton
+from identity_tracker import DEFAULT_MAX_TRACKS, DEFAULT_TTL
+from synthetic import SyntheticSkeletons, synthetic_projector
+from workout import WorkoutSession, rotation_options
+
+IMAGE_W, IMAGE_H = 1280, 720  # resolusi warna 720P
+
+
+def rss_mb():
+    """Resident set size proses sekarang (MB); tanpa /proc memakai puncak RSS, None jika tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024.0
+
+
+def soak_frames(hours, bodies, fps=30.0, visit_minutes=3.0, gap_seconds=DEFAULT_TTL + 1.0, seed=0, start=None):
+    """Frame sintetis selama `hours` jam: `bodies` orang berlatih `visit_minutes` menit, pergi `gap_seconds`
+    detik (frame kosong), lalu rombongan baru dengan body id baru datang.
+
+    Gerakan satu kunjungan dibuat sekali lalu diputar ulang (objek `Skeleton` tetap baru setiap frame,
+    seperti dari kamera), jadi pembuatan input tidak mendominasi waktu uji.
+    """
+    start = time.time() if start is None else start
+    visit = [[(b.positions, b.confidence) for b in frame.bodies]
+             for frame in SyntheticSkeletons(bodies, int(visit_minutes * 60 * fps), fps=fps, seed=seed)]
+    gap = int(gap_seconds * fps)
+    total = int(hours * 3600 * fps)
+    n = 0
+    next_body_id = 1
+    while n < total:
+        for poses in visit:
+            if n >= total:
+                return
+            bodies_now = [Skeleton(i, positions, body_id=next_body_id + i, confidence=confidence)
+                          for i, (positions, confidence) in enumerate(poses)]
+            yield Frame(start + n / fps, bodies_now)
+            n += 1
+        next_body_id += bodies
+        for _ in range(min(gap, total - n)):
+            yield Frame(start + n / fps, [])
+            n += 1
+
+
+def run_soak(hours=2.0, bodies=3, fps=30.0, sample_minutes=10.0, visit_minutes=3.0, rotation=None,
+             max_tracks=DEFAULT_MAX_TRACKS, render_options=None, workdir=None, progress=True):
+    """Jalankan soak; return dict laporan (jendela per `sample_minutes` + info akhir)."""
+    session = WorkoutSession("all", pose_log_path=os.path.join(workdir, "soak.poselog"), rotation=rotation,
+                             max_tracks=max_tracks, summary_path=os.path.join(workdir, "soak_session.json"))
+    logging.getLogger("workout").setLevel(logging.ERROR)  # peringatan jarak antar orang sintetis tidak dicetak
+    make_renderer = image = None
+    if render_options is not None:
+        from renderer import Renderer  # butuh OpenCV
+        image = np.zeros((IMAGE_H, IMAGE_W, 4), dtype=np.uint8)
+        make_renderer = functools.partial(Renderer, max_fps=None, show=False, **render_options)
+    session.attach(synthetic_projector(), (IMAGE_W, IMAGE_H), make_renderer=make_renderer)
+
+    start = time.time()
+    frames = soak_frames(hours, bodies, fps, visit_minutes, start=start)
+    window_frames = int(sample_minutes * 60 * fps)
+    windows = []
+    samples = np.empty(window_frames, dtype=np.int64)
+    fill = 0
+    peak_tracks = peak_slots = 0
+    clock = time.perf_counter_ns
+    gc.collect()
+    gc.freeze()  # sama seperti workout.py --long
+    wall = time.monotonic()
+
+    for n, frame in enumerate(frames):
+        if image is not None:
+            frame.color_image = image
+        t0 = clock()
+        result = session.analyze(frame)
+        if result is not None:
+            session.renderer.compose(result)
+        samples[fill] = clock() - t0
+        fill += 1
+        peak_tracks = max(peak_tracks, len(session.identity_tracker.tracks))
+        peak_slots = max(peak_slots, len(session.counter.slots))
+        if fill == window_frames:
+            us = samples / 1000.0
+            windows.append({
+                "minute": round((n + 1) / fps / 60.0, 1),
+                "p50_us": round(float(np.percentile(us, 50)), 1),
+                "p99_us": round(float(np.percentile(us, 99)), 1),
+                "rss_mb": rss_mb(),
+                "tracks": len(session.identity_tracker.tracks),
+                "counter_rows": len(session.counter.states),
+                "log_part": getattr(session.pose_log, "part", 1),
+                "summary_reps": len(session.session_summary.records),
+            })
+            fill = 0
+            if progress:
+                w = windows[-1]
+                rss = "-" if w["rss_mb"] is None else f"{w['rss_mb']:.1f}"
+                print(f"{w['minute']:>7.1f} mnt  p50 {w['p50_us']:>7.1f} us  p99 {w['p99_us']:>8.1f} us  "
+                      f"RSS {rss:>7} MB  track {w['tracks']:>2}  baris counter {w['counter_rows']:>3}  "
+                      f"bagian log {w['log_part']:>3}  rep {w['summary_reps']:>5}", flush=True)
+
+    wall = time.monotonic() - wall
+    gc.unfreeze()
+    session.close()
+    parts_on_disk = sorted(name for name in os.listdir(workdir) if name.endswith(".poselog"))
+    summaries_on_disk = sorted(name for name in os.listdir(workdir) if name.endswith(".json"))
+    return {
+        "hours": hours,
+        "bodies": bodies,
+        "frames": int(hours * 3600 * fps),
+        "wall_s": round(wall, 1),
+        "speedup": round(hours * 3600 / wall, 1) if wall > 0 else None,
+        "peak_tracks": peak_tracks,
+        "peak_counter_slots": peak_slots,
+        "log_parts_on_disk": len(parts_on_disk),
+        "summary_parts_on_disk": len(summaries_on_disk),
+        "windows": windows,
+    }
+
+
+def check(report, max_rss_growth_mb, max_slowdown, max_tracks, keep_logs=None):
+    """Return list pesan kegagalan (kosong = lulus). Jendela pertama = pemanasan, tidak dinilai."""
+    failures = []
+    windows = report["windows"]
+    if len(windows) < 3:
+        return [f"butuh minimal 3 jendela sampel, dapat {len(windows)} (tambah --hours atau kurangi --sample-minutes)"]
+    # waktu frame: median p50 sepertiga jendela terakhir vs sepertiga pertama (satu jendela saja terlalu bising)
+    k = max(1, (len(windows) - 1) // 3)
+    early = float(np.median([w["p50_us"] for w in windows[1:1 + k]]))
+    late = float(np.median([w["p50_us"] for w in windows[-k:]]))
+    rss = [w["rss_mb"] for w in windows[1:]]
+    if rss[0] is None:
+        print("RSS tidak bisa dibaca di platform ini: cek memori dilewati")
+    else:
+        growth = max(rss) - rss[0]
+        if growth > max_rss_growth_mb:
+            failures.append(f"RSS naik {growth:.1f} MB setelah pemanasan (batas {max_rss_growth_mb} MB)")
+    slowdown = late / early if early > 0 else 1.0
+    if slowdown > max_slowdown:
+        failures.append(f"p50 waktu frame akhir sesi {slowdown:.2f}x awal sesi (batas {max_slowdown}x)")
+    if report["peak_tracks"] > max_tracks:
+        failures.append(f"track hidup mencapai {report['peak_tracks']} (batas {max_tracks})")
+    if report["peak_counter_slots"] > max_tracks:
+        failures.append(f"baris state counter mencapai {report['peak_counter_slots']} (batas {max_tracks})")
+    if keep_logs is not None and report["log_parts_on_disk"] > keep_logs:
+        failures.append(f"{report['log_parts_on_disk']} bagian log tersimpan (batas {keep_logs})")
+    if keep_logs is not None and report["summary_parts_on_disk"] > keep_logs:
+        failures.append(f"{report['summary_parts_on_disk']} ringkasan per bagian tersimpan (batas {keep_logs})")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji soak sesi panjang dengan input sintetis (tanpa kamera)")
+    parser.add_argument("--hours", type=float, default=2.0, help="durasi sintetis (jam)")
+    parser.add_argument("--bodies", type=int, default=3, help="orang per kunjungan")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--visit-minutes", type=float, default=3.0, help="lama satu rombongan sebelum diganti")
+    parser.add_argument("--sample-minutes", type=float, default=10.0, help="panjang jendela sampel (waktu sintetis)")
+    parser.add_argument("--rotate-mb", type=float, default=None, help="rotasi log pose setiap N MB")
+    parser.add_argument("--rotate-minutes", type=float, default=30.0, help="rotasi log pose setiap N menit")
+    parser.add_argument("--keep-logs", type=int, default=2, help="bagian log terbaru yang disimpan")
+    parser.add_argument("--max-tracks", type=int, default=DEFAULT_MAX_TRACKS)
+    parser.add_argument("--render-scale", type=float, default=None, help="ikut menyusun overlay pada skala ini")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=8.0)
+    parser.add_argument("--max-slowdown", type=float, default=1.5)
+    parser.add_argument("--workdir", default=None, help="folder log hasil soak (default folder sementara)")
+    parser.add_argument("--out", default=None, help="tulis laporan JSON ke file ini")
+    args = parser.parse_args(argv)
+
+    rotation = rotation_options(args.rotate_mb, args.rotate_minutes, args.keep_logs)
+    render_options = None if args.render_scale is None else {"scale": args.render_scale}
+    if args.workdir is not None:
+        os.makedirs(args.workdir, exist_ok=True)
+        report = run_soak(args.hours, args.bodies, args.fps, args.sample_minutes, args.visit_minutes, rotation,
+                          args.max_tracks, render_options, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            report = run_soak(args.hours, args.bodies, args.fps, args.sample_minutes, args.visit_minutes, rotation,
+                              args.max_tracks, render_options, workdir)
+
+    print(f"\n{report['hours']:g} jam sintetis ({report['frames']} frame) dalam {report['wall_s']} s "
+          f"(x{report['speedup']} real-time); track puncak {report['peak_tracks']}, "
+          f"bagian log tersimpan {report['log_parts_on_disk']}")
+    failures = check(report, args.max_rss_growth_mb, args.max_slowdown, args.max_tracks, args.keep_logs)
+    report["failures"] = failures
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    for message in failures:
+        print(f"GAGAL: {message}")
+    if not failures:
+        print("LULUS: memori datar, waktu frame stabil, state per orang dan log terbatas")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
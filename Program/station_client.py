@@ -0,0 +1,222 @@
+"""Mode stasiun: kirim event rep dan sesi ke daemon agregasi (aggregator.py) lewat TCP.
+
+Setiap event punya kunci unik (stasiun, sesi, seq) sehingga daemon bisa membuang duplikat;
+karena itu stasiun cukup mengirim ulang semua event yang belum di-ACK setelah sambungan putus.
+Event yang belum di-ACK juga ditulis ke file spool (satu baris JSON per event, oleh thread pengirim
+sebelum event itu dikirim - loop analitik tidak pernah menunggu disk) dan dimuat lagi saat stasiun
+start, jadi event tidak hilang walaupun daemon mati lama atau stasiun di-restart.
+
+Protokol (satu baris JSON per pesan, UTF-8):
+    stasiun -> daemon : {"station": id, "events": [event, ...]}
+    daemon -> stasiun : {"ok": jumlah event baru, "rejected": event rusak yang dibuang, "seq": seq terakhir}
+                        atau {"error": pesan, "retry": bool}; retry = gangguan sementara di daemon (batch
+                        tetap di antrean dan dikirim ulang), tanpa retry = batch dibuang
+    event             : {"session": id, "seq": n, "type": "start" | "rep" | "end", "at": detik, "data": ...}
+    data rep          : baris `RepRecord.to_row()` (kolom `REP_FIELDS`) + kunci member di akhir
+"""
+import json
+import os
+import socket
+import threading
+import time
+
+DEFAULT_PORT = 8765
+BATCH_SIZE = 200           # event maksimal per pesan (backlog setelah putus dikirim bertahap)
+RECONNECT_INTERVAL = 1.0   # detik antar percobaan sambung ulang
+SOCKET_TIMEOUT = 5.0       # detik menunggu ACK
+
+
+def parse_address(address):
+    """"host:port" atau "host" -> (host, port)."""
+    host, _, port = address.rpartition(":")
+    if not host:
+        return port, DEFAULT_PORT
+    return host, int(port)
+
+
+class StationClient:
+    """Antrekan event dari loop analitik (tidak pernah menunggu jaringan) dan kirim dari thread sendiri.
+
+    `member_of(track_id)` memetakan track ke kunci member; default "<stasiun>/<sesi>/<track>"
+    (tanpa identifikasi anggota, satu track = satu member anonim).
+    """
+
+    def __init__(self, station, address, spool_path=None, member_of=None, batch_size=BATCH_SIZE,
+                 reconnect_interval=RECONNECT_INTERVAL):
+        self.station = station
+        self.address = parse_address(address) if isinstance(address, str) else tuple(address)
+        self.spool_path = spool_path or f"station_{station}.spool"
+        self.session = str(int(time.time() * 1000))
+        self.member_of = member_of or (lambda track: f"{station}/{self.session}/{track}")
+        self.batch_size = batch_size
+        self.reconnect_interval = reconnect_interval
+
+        self._cond = threading.Condition()
+        self._pending = []   # event yang belum di-ACK, urut seq
+        self._unspooled = []  # event baru yang belum ditulis ke spool (oleh thread pengirim)
+        self._seq = 0
+        self._closed = False
+        self._sock = None
+        self._reader = None
+
+        # statistik (dibaca lewat stats())
+        self.queued = 0
+        self.acked = 0
+        self.duplicates = 0  # event yang ternyata sudah ada di daemon (dikirim ulang)
+        self.rejected = 0    # event yang dibuang daemon karena rusak
+        self.disconnects = 0
+        self.errors = 0      # balasan error dari daemon (sementara maupun permanen)
+        self.restored = self._load_spool()
+        self._spool = open(self.spool_path, "a", encoding="utf-8")
+
+        self._thread = threading.Thread(target=self._run, name=f"station-{station}", daemon=True)
+        self._thread.start()
+
+    def _load_spool(self):
+        """Event dari run sebelumnya yang belum sampai ke daemon."""
+        if not os.path.exists(self.spool_path):
+            return 0
+        with open(self.spool_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    self._pending.append(json.loads(line))
+                except ValueError:
+                    break  # baris terakhir terpotong saat crash
+        return len(self._pending)
+
+    def _emit(self, event_type, data, at=None):
+        with self._cond:
+            if self._closed:
+                return False
+            event = {"session": self.session, "seq": self._seq, "type": event_type,
+                     "at": time.time() if at is None else at, "data": data}
+            self._seq += 1
+            self._pending.append(event)
+            self._unspooled.append(event)
+            self.queued += 1
+            self._cond.notify_all()
+        return True
+
+    def session_start(self, exercise="all"):
+        return self._emit("start", {"exercise": exercise})
+
+    def rep(self, record):
+        """Satu `RepRecord`; bisa langsung dipakai sebagai callback `on_rep` RepCounter."""
+        return self._emit("rep", record.to_row() + [self.member_of(record.track)], at=record.end)
+
+    def session_end(self, summary=None):
+        """`summary` = `SessionSummary` (agregat per track per gerakan ikut dikirim) atau None."""
+        aggregates = None
+        if summary is not None:
+            aggregates = {str(track): stats for track, stats in summary.aggregates().items()}
+        return self._emit("end", {"tracks": aggregates})
+
+    def _connect(self):
+        sock = socket.create_connection(self.address, timeout=SOCKET_TIMEOUT)
+        self._sock = sock
+        self._reader = sock.makefile("r", encoding="utf-8")
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    def _write_spool(self, events):
+        if events:
+            self._spool.write("".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events))
+            self._spool.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                unspooled, self._unspooled = self._unspooled, []
+                if not self._pending:
+                    break
+                batch = self._pending[:self.batch_size]
+            # semua event di batch sudah ada di spool sebelum dikirim
+            self._write_spool(unspooled)
+            fresh = self._sock is None
+            try:
+                if fresh:
+                    self._connect()
+                message = {"station": self.station, "events": batch}
+                self._sock.sendall((json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8"))
+                line = self._reader.readline()
+                if not line:
+                    raise ConnectionError("daemon menutup sambungan")
+                reply = json.loads(line)
+            except (OSError, ValueError) as e:
+                self._disconnect()
+                self.disconnects += 1
+                with self._cond:
+                    if not self._closed:
+                        self._cond.wait(self.reconnect_interval)
+                    elif fresh:
+                        break  # sisa event tetap di spool untuk run berikutnya
+                    # sambungan lama sudah diputus daemon (misal restart): saat menutup langsung dicoba sekali lagi
+                if self.disconnects == 1 or self.disconnects % 60 == 0:
+                    print(f"[station {self.station}] Daemon tidak terjangkau ({e}), event disimpan di {self.spool_path}")
+                continue
+            if "error" in reply:
+                self.errors += 1
+                if reply.get("retry", True):
+                    # daemon gagal menyimpan sementara: batch tetap di antrean (dan spool), tunggu lalu kirim ulang
+                    if self.errors == 1 or self.errors % 60 == 0:
+                        print(f"[station {self.station}] Daemon gagal menyimpan ({reply['error']}), dikirim ulang")
+                    with self._cond:
+                        if self._closed:
+                            break
+                        self._cond.wait(self.reconnect_interval)
+                    continue
+                print(f"[station {self.station}] Daemon menolak batch ({reply['error']}), {len(batch)} event dibuang")
+            with self._cond:
+                del self._pending[:len(batch)]
+                if "error" in reply:
+                    self.rejected += len(batch)
+                else:
+                    rejected = reply.get("rejected", 0)
+                    self.acked += len(batch)
+                    self.rejected += rejected
+                    self.duplicates += len(batch) - reply.get("ok", 0) - rejected
+                if not self._pending:
+                    # semua sudah tersimpan di daemon: spool dikosongkan
+                    self._spool.seek(0)
+                    self._spool.truncate()
+        with self._cond:
+            unspooled, self._unspooled = self._unspooled, []
+            if self._pending:
+                self._write_spool(unspooled)  # berhenti sebelum semua terkirim: sisanya untuk run berikutnya
+        self._disconnect()
+
+    def close(self, timeout=None):
+        """Tolak event baru, kirim sisa event selama daemon terjangkau (maksimal `timeout` detik), lalu berhenti.
+
+        Return True jika semua event sudah sampai; sisanya tetap di spool untuk run berikutnya.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return False
+        self._spool.close()
+        return not self._pending
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "queued": self.queued,
+            "restored": self.restored,
+            "acked": self.acked,
+            "pending": pending,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "disconnects": self.disconnects,
+            "errors": self.errors,
+        }
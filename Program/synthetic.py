@@ -0,0 +1,165 @@
+"""Generator skeleton sintetis yang deterministik untuk benchmark dan uji tanpa kamera.
+
+Setiap body mengulang blok gerakan knee raise -> shoulder front raise -> side bend
+(urutan digeser per body) dengan amplitudo yang melewati threshold di `exercises.json`,
+ditambah noise Gaussian per joint. Seed yang sama selalu menghasilkan frame yang sama.
+"""
+import numpy as np
+
+from frame_source import Frame, Skeleton
+from kinect_joints import (
+    K4ABT_JOINT_COUNT,
+    K4ABT_JOINT_PELVIS,
+    K4ABT_JOINT_HEAD,
+    K4ABT_JOINT_SHOULDER_LEFT,
+    K4ABT_JOINT_ELBOW_LEFT,
+    K4ABT_JOINT_WRIST_LEFT,
+    K4ABT_JOINT_HAND_LEFT,
+    K4ABT_JOINT_HANDTIP_LEFT,
+    K4ABT_JOINT_THUMB_LEFT,
+    K4ABT_JOINT_SHOULDER_RIGHT,
+    K4ABT_JOINT_ELBOW_RIGHT,
+    K4ABT_JOINT_WRIST_RIGHT,
+    K4ABT_JOINT_HAND_RIGHT,
+    K4ABT_JOINT_HANDTIP_RIGHT,
+    K4ABT_JOINT_THUMB_RIGHT,
+    K4ABT_JOINT_HIP_LEFT,
+    K4ABT_JOINT_KNEE_LEFT,
+    K4ABT_JOINT_ANKLE_LEFT,
+    K4ABT_JOINT_FOOT_LEFT,
+    K4ABT_JOINT_HIP_RIGHT,
+    K4ABT_JOINT_KNEE_RIGHT,
+    K4ABT_JOINT_ANKLE_RIGHT,
+    K4ABT_JOINT_FOOT_RIGHT,
+)
+from projection import Projector, K4A_CALIBRATION_LENS_DISTORTION_MODEL_BROWN_CONRADY
+
+# Pose berdiri netral relatif terhadap pelvis (mm, x kiri = +, y ke bawah = +, z menjauhi kamera = +).
+# Diambil dari median data_gerakan.csv.
+TEMPLATE = np.array([
+    (0, 0, 0), (9, -171, 8), (16, -308, 13), (26, -514, -3),                      # pelvis, spine, chest, neck
+    (57, -477, 1), (190, -431, -2), (235, -170, 10), (218, 44, -97),             # lengan kiri
+    (224, 128, -99), (215, 189, -91), (183, 152, -107),
+    (-2, -482, 0), (-123, -457, -29), (-187, -205, -52), (-218, 0, -132),       # lengan kanan
+    (-218, 65, -145), (-211, 121, -153), (-189, 84, -149),
+    (87, 4, 4), (95, 368, -126), (58, 715, -29), (78, 855, -139),               # kaki kiri
+    (-79, -4, -3), (-128, 357, -151), (-143, 707, -43), (-156, 834, -147),      # kaki kanan
+    (33, -588, -23), (55, -614, -174), (75, -642, -135), (120, -633, -21),      # kepala, wajah
+    (29, -651, -145), (-36, -661, -37),
+], dtype=np.float64)
+
+LEFT_ARM = [K4ABT_JOINT_ELBOW_LEFT, K4ABT_JOINT_WRIST_LEFT, K4ABT_JOINT_HAND_LEFT,
+            K4ABT_JOINT_HANDTIP_LEFT, K4ABT_JOINT_THUMB_LEFT]
+RIGHT_ARM = [K4ABT_JOINT_ELBOW_RIGHT, K4ABT_JOINT_WRIST_RIGHT, K4ABT_JOINT_HAND_RIGHT,
+             K4ABT_JOINT_HANDTIP_RIGHT, K4ABT_JOINT_THUMB_RIGHT]
+LOWER_LEGS = [K4ABT_JOINT_KNEE_LEFT, K4ABT_JOINT_ANKLE_LEFT, K4ABT_JOINT_FOOT_LEFT,
+              K4ABT_JOINT_KNEE_RIGHT, K4ABT_JOINT_ANKLE_RIGHT, K4ABT_JOINT_FOOT_RIGHT]
+# semua joint di atas pinggul ikut miring saat side bend
+UPPER_BODY = [j for j in range(K4ABT_JOINT_COUNT)
+              if j not in LOWER_LEGS and j not in (K4ABT_JOINT_PELVIS, K4ABT_JOINT_HIP_LEFT, K4ABT_JOINT_HIP_RIGHT)]
+
+SCRIPTED_EXERCISES = ("knee", "shoulder", "sidebend")  # gerakan yang bisa dibuat `pose_at`
+KNEE_LIFT_Z = 350.0          # mm, lutut maju ke arah kamera saat diangkat
+FRONT_RAISE_ANGLE = np.pi / 2  # lengan lurus ke depan
+SIDEBEND_ANGLE = np.radians(20)
+# kepala template sedikit ke kiri; putar balik supaya posisi netral tepat di atas pelvis
+NEUTRAL_LEAN = np.arctan2(TEMPLATE[K4ABT_JOINT_HEAD, 0], -TEMPLATE[K4ABT_JOINT_HEAD, 1])
+
+
+def _rotate(points, pivot, angle, axes):
+    """Putar `points` di sekitar `pivot` pada bidang dua sumbu `axes`."""
+    a, b = axes
+    c, s = np.cos(angle), np.sin(angle)
+    rel = points - pivot
+    out = points.copy()
+    out[:, a] = pivot[a] + rel[:, a] * c - rel[:, b] * s
+    out[:, b] = pivot[b] + rel[:, a] * s + rel[:, b] * c
+    return out
+
+
+def pose_at(exercise, progress, amplitude=1.0, scale=1.0):
+    """Pose relatif pelvis untuk `exercise` pada `progress` dalam satu repetisi (0..1).
+
+    `amplitude` < 1 = gerakan tidak penuh, `scale` = ukuran tubuh relatif terhadap template.
+    """
+    pose = _rotate(TEMPLATE * scale, TEMPLATE[K4ABT_JOINT_PELVIS], -NEUTRAL_LEAN, (0, 1))
+    wave = amplitude * (0.5 - 0.5 * np.cos(2 * np.pi * progress))  # 0 -> amplitude -> 0
+
+    if exercise == "knee":
+        # kedua lutut naik sampai setinggi pinggul, tungkai bawah ikut
+        lift = pose[[K4ABT_JOINT_KNEE_LEFT, K4ABT_JOINT_KNEE_RIGHT], 1].mean() * wave
+        pose[LOWER_LEGS, 1] -= lift
+        pose[LOWER_LEGS, 2] -= KNEE_LIFT_Z * wave
+    elif exercise == "shoulder":
+        angle = FRONT_RAISE_ANGLE * wave
+        for shoulder, arm in ((K4ABT_JOINT_SHOULDER_LEFT, LEFT_ARM), (K4ABT_JOINT_SHOULDER_RIGHT, RIGHT_ARM)):
+            pose[arm] = _rotate(pose[arm], pose[shoulder], -angle, (1, 2))
+    elif exercise == "sidebend":
+        # kanan lalu kiri; pangkat 3 membuat tubuh bertahan sebentar di tengah
+        lean = np.sin(2 * np.pi * progress)
+        angle = amplitude * SIDEBEND_ANGLE * np.sign(lean) * abs(lean) ** 3
+        pose[UPPER_BODY] = _rotate(pose[UPPER_BODY], pose[K4ABT_JOINT_PELVIS], -angle, (0, 1))
+    return pose
+
+
+class SyntheticSkeletons:
+    """Sumber frame sintetis: `num_bodies` orang bergerak bersamaan selama `num_frames` frame.
+
+    Body ke-i berdiri di grid 5 kolom (jarak 700 mm, baris kedua 1 m lebih jauh),
+    melakukan `reps_per_block` repetisi per gerakan dengan periode sedikit berbeda.
+    `neutral_seconds` pertama semua body berdiri diam (pemanasan untuk kalibrasi).
+    """
+
+    def __init__(self, num_bodies=1, num_frames=300, fps=30.0, noise_mm=8.0, seed=0,
+                 period=2.0, reps_per_block=3, neutral_seconds=0.0, amplitude=1.0, scale=1.0):
+        self.num_bodies = num_bodies
+        self.num_frames = num_frames
+        self.fps = fps
+        self.noise_mm = noise_mm
+        self.seed = seed
+        self.period = period
+        self.reps_per_block = reps_per_block
+        self.neutral_seconds = neutral_seconds
+        self.amplitude = amplitude
+        self.scale = scale
+
+    def origin(self, i):
+        row, col = divmod(i, 5)
+        return np.array([(col - 2) * 700.0, -90.0, 2200.0 + 1000.0 * row])
+
+    def script(self, i, t):
+        """(gerakan, progress 0..1) body ke-i pada waktu t detik."""
+        t -= self.neutral_seconds
+        if t < 0:
+            return SCRIPTED_EXERCISES[i % len(SCRIPTED_EXERCISES)], 0.0
+        period = self.period * (1.0 + 0.05 * i)
+        rep, progress = divmod(t / period + 0.13 * i, 1.0)
+        block = int(rep) // self.reps_per_block
+        return SCRIPTED_EXERCISES[(block + i) % len(SCRIPTED_EXERCISES)], progress
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed)
+        origins = [self.origin(i) for i in range(self.num_bodies)]
+        confidence = np.full(K4ABT_JOINT_COUNT, 2, dtype=np.uint8)  # K4ABT_JOINT_CONFIDENCE_MEDIUM
+        for n in range(self.num_frames):
+            t = n / self.fps
+            bodies = []
+            for i in range(self.num_bodies):
+                exercise, progress = self.script(i, t)
+                positions = pose_at(exercise, progress, self.amplitude, self.scale) + origins[i]
+                positions += rng.normal(0.0, self.noise_mm, positions.shape)
+                bodies.append(Skeleton(i, positions, body_id=i + 1, confidence=confidence.copy()))
+            yield Frame(t, bodies)
+
+
+def synthetic_projector():
+    """Projector depth -> color 720p dengan intrinsik khas Azure Kinect (untuk benchmark tanpa device)."""
+    tilt = np.radians(-6.0)
+    rotation = [[1, 0, 0],
+                [0, np.cos(tilt), -np.sin(tilt)],
+                [0, np.sin(tilt), np.cos(tilt)]]
+    params = {"cx": 638.0, "cy": 367.0, "fx": 605.0, "fy": 605.0,
+              "k1": 0.5, "k2": -2.6, "k3": 1.5, "k4": 0.4, "k5": -2.4, "k6": 1.4,
+              "codx": 0.0, "cody": 0.0, "p2": 0.0002, "p1": 0.0004}
+    return Projector(rotation, [-32.0, -2.0, 4.0], params,
+                     K4A_CALIBRATION_LENS_DISTORTION_MODEL_BROWN_CONRADY, metric_radius=1.7)
@@ -1,138 +1,172 @@
-import cv2
-import numpy as np
-import pykinect_azure as pykinect
+"""Workout tracker Azure Kinect + ESP32 (mode live) dan peluncur alat-alat tanpa kamera.
+
+Pemakaian:
+    python workout.py --exercise knee --port COM8 [--calibrate] [--headless] [--station A]
+    python workout.py --long --rotate-minutes 30 --keep-logs 48      # satu shift gym
+    python workout.py replay data_gerakan.poselog --exercise all
+    python workout.py {replay,benchmark,soak,store,aggregate,esp32,pose-log} -h
+
+Modul ini aman di-import: pykinect_azure, pyserial, dan cv2 baru dimuat di dalam mode live,
+jadi alat replay/analisis start tanpa menunggu library kamera. Kinect + body tracker dan port
+serial dinyalakan bersamaan di thread sendiri, sementara thread utama menyiapkan counter, log pose,
+dan renderer.
+"""
+import argparse
+import functools
+import gc
+import importlib
+import logging
+import os
+import sys
 import time
-import csv
-import ctypes
-import serial  # SERIAL UNTUK ESP32
-
-from pykinect_azure.k4a import _k4a
-from pykinect_azure import (
-    K4A_CALIBRATION_TYPE_COLOR,
-    K4A_CALIBRATION_TYPE_DEPTH,
-    K4ABT_JOINT_HEAD,
-    K4ABT_JOINT_HAND_RIGHT,
-    K4ABT_JOINT_HAND_LEFT,
-    K4ABT_JOINT_PELVIS,
-    K4ABT_JOINT_KNEE_RIGHT,
-    K4ABT_JOINT_ANKLE_RIGHT,
-    K4ABT_JOINT_ANKLE_LEFT,
-    K4ABT_JOINT_COUNT,
-    K4ABT_JOINT_NAMES,
-    # tambahan joint untuk gambar skeleton / workout
-    K4ABT_JOINT_NECK,
-    K4ABT_JOINT_SPINE_CHEST,
-    K4ABT_JOINT_SPINE_NAVEL,
-    K4ABT_JOINT_CLAVICLE_RIGHT,
-    K4ABT_JOINT_SHOULDER_RIGHT,
-    K4ABT_JOINT_ELBOW_RIGHT,
-    K4ABT_JOINT_WRIST_RIGHT,
-    K4ABT_JOINT_CLAVICLE_LEFT,
-    K4ABT_JOINT_SHOULDER_LEFT,
-    K4ABT_JOINT_ELBOW_LEFT,
-    K4ABT_JOINT_WRIST_LEFT,
-    K4ABT_JOINT_HIP_RIGHT,
-    K4ABT_JOINT_HIP_LEFT,
-    K4ABT_JOINT_KNEE_LEFT,
-    K4ABT_JOINT_KNEE_RIGHT,
-    K4ABT_JOINT_ANKLE_LEFT,
-    K4ABT_JOINT_ANKLE_RIGHT
-)
-
-# 1. INISIALISASI
-print("Menginisialisasi library...")
-pykinect.initialize_libraries(track_body=True)
-
-# Konfigurasi perangkat
-device_config = pykinect.default_configuration
-device_config.color_resolution = pykinect.K4A_COLOR_RESOLUTION_720P
-device_config.depth_mode = pykinect.K4A_DEPTH_MODE_NFOV_UNBINNED
-device_config.synchronized_images_only = True
-
-# Mulai perangkat
-print("Membuka kamera Kinect...")
-device = pykinect.start_device(config=device_config)
-
-# Dapatkan kalibrasi (penting untuk memetakan 3D ke 2D)
-calibration = device.get_calibration(device_config.depth_mode, device_config.color_resolution)
-
-# Mulai body tracker
-print("Memulai Body Tracker...")
-body_tracker = pykinect.start_body_tracker(calibration)
-
-# 2. PERSIAPAN FILE CSV
-print("Membuka file CSV untuk menyimpan data...")
-try:
-    csv_file = open('data_gerakan.csv', 'w', newline='')
-    csv_writer = csv.writer(csv_file)
-    csv_writer.writerow(['timestamp', 'body_index', 'joint_name', 'pos_x', 'pos_y', 'pos_z'])
-except IOError as e:
-    print(f"Error membuka file CSV: {e}. Pastikan file tidak sedang dibuka program lain.")
-    exit()
-
-# 2b. PERSIAPAN SERIAL KE ESP32
-try:
-    # GANTI 'COM8' SESUAI PORT ESP32 KAMU
-    ser = serial.Serial('COM8', 115200, timeout=1)
-    time.sleep(2)  # beri waktu ESP32 reset
-    print("Terhubung ke ESP32 via serial.")
-except Exception as e:
-    print(f"Gagal membuka port serial: {e}")
-    ser = None  # supaya aman kalau serial tidak tersedia
-
-print("🎥 Sistem siap. Tekan 'q' untuk keluar.")
-
-# Pilihan exercise di awal
-selected_exercise = input("Pilih exercise (knee/shoulder/sidebend/all) [all]: ").strip().lower() or "all"
-if selected_exercise not in ("knee", "shoulder", "sidebend", "all"):
-    print("Pilihan tidak valid, menggunakan 'all'")
-    selected_exercise = "all"
-
-# Tambahkan: state & counter untuk tiap body (persisten di luar loop)
-# body_index -> {
-#   knee_count, knee_state,
-#   shoulder_count, shoulder_state,
-#   sidebend_count, sidebend_state,
-#   success_sent,
-#   knee_led_sent, shoulder_led_sent, side_led_sent
-# }
-exercise_state = {}
-
-# ==========================
-# THRESHOLD GERAKAN BARU
-# ==========================
-
-# 1) STANDING KNEE RAISE
-# gunakan jarak vertikal pelvis - rata-rata lutut (semakin kecil = lutut makin naik)
-KNEE_UP_THRESH = 80     # kalau |pelvis.y - knee.y| < ini -> dianggap KNEE UP
-KNEE_DOWN_THRESH = 130  # kalau |pelvis.y - knee.y| > ini -> kembali DOWN
-KNEE_DEADZONE = 10      # zona aman biar tidak jitter
-
-# 2) SHOULDER FRONT RAISE
-# gunakan selisih Y pergelangan tangan rata-rata terhadap bahu rata-rata
-# wrist_y - shoulder_y:
-#   > 60  => tangan turun (di bawah bahu)
-#   <  0  => tangan naik (sejajar / di atas bahu)
-SHOULDER_UP_THRESH = 0      # lebih kecil dari ini + deadzone -> dianggap RAISE
-SHOULDER_DOWN_THRESH = 60   # lebih besar dari ini + deadzone -> dianggap turun
-SHOULDER_DEADZONE = 10
-
-# 3) SIDE BEND
-# gunakan selisih X kepala terhadap pelvis -> miring kiri/kanan
-SIDEBEND_RIGHT_THRESH = 70    # head.x - pelvis.x > ini -> miring ke kanan
-SIDEBEND_LEFT_THRESH = -70    # head.x - pelvis.x < ini -> miring ke kiri
-SIDEBEND_CENTER_THRESH = 30   # |diff| < ini -> dianggap kembali ke tengah
-
-
-def convert_to_2d(calibration, position_3d):
-    """Helper function to convert 3D coordinates to 2D screen coordinates"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from background_writer import BackgroundWriter
+from calibration import ThresholdCalibrator
+from esp32_link import SerialLink, ACK_TIMEOUT
+from frame_analysis import FrameResult, compute_roi, select_roi_target
+from frame_source import KinectFrameSource
+from identity_tracker import IdentityTracker, shoulder_centers, DEFAULT_MAX_TRACKS
+from instrumentation import Metrics, MetricsDumper, hud_lines
+from joint_filter import JointFilter
+from kinect_joints import K4ABT_JOINT_COUNT
+from pipeline import Pipeline, Stage
+from pose_log import PoseLogWriter, RotatingPoseLogWriter, part_path
+from projection import Projector, PixelBuffers, compare_with_sdk
+from proximity import ProximityMonitor, distance_texts
+from rep_analytics import SessionSummary
+from rep_counter import RepCounter, EXERCISE_CHOICES
+from station_client import StationClient
+
+# Logging bertingkat: DEBUG menampilkan metrik per body per frame (mahal di 30 fps), INFO untuk pemakaian biasa
+LOG_LEVEL = logging.INFO
+log = logging.getLogger("workout")
+
+# Instrumentasi: durasi tiap stage, HUD di layar (tombol 'h'), dan dump metrik berkala
+SHOW_HUD = True
+HUD_REFRESH = 0.5              # detik antar pembaruan teks HUD
+METRICS_PATH = "workout_metrics.prom"
+METRICS_FORMAT = "prometheus"  # "prometheus" (file ditulis ulang) atau "jsonl" (satu baris per dump)
+METRICS_INTERVAL = 5.0         # detik
+
+# Render: output diperkecil dan lajunya dibatasi, terpisah dari laju analitik (30 fps).
+# Tanpa jendela dan tanpa rekaman = headless: gambar warna tidak diambil, tidak ada yang digambar
+# (hentikan dengan Ctrl+C).
+SHOW_WINDOW = True
+RECORD_PATH = None      # misal "sesi_workout.mp4" untuk merekam output overlay
+RENDER_SCALE = 0.5      # ukuran output relatif terhadap gambar warna 720p
+CROP_TO_ROI = False     # True = hanya area ROI yang ditampilkan
+DISPLAY_FPS = 15.0      # laju tampil/rekam maksimum; None = setiap frame
+
+# Serial ke ESP32: membuka port me-reset ESP32; tunggu baris "siap" darinya (maksimal SERIAL_READY_TIMEOUT),
+# frame yang terkirim sebelum ESP32 siap dikirim ulang oleh SerialLink
+SERIAL_PORT = "COM8"    # GANTI SESUAI PORT ESP32 KAMU (atau --port)
+SERIAL_BAUD = 115200
+SERIAL_READY_TIMEOUT = 2.0
+
+# Mode stasiun (beberapa Kinect/ESP32 dalam satu gym): event rep & sesi dikirim ke daemon agregasi
+# (python aggregator.py serve); event di-spool ke file selama daemon tidak terjangkau lalu dikirim ulang
+STATION_ID = None                      # misal "A"; None = berdiri sendiri
+AGGREGATOR_ADDRESS = "127.0.0.1:8765"
+POSE_LOG_PATH = "data_gerakan.poselog"  # stasiun: data_gerakan_<id>.poselog
+
+# Worker I/O (log pose ditulis di thread terpisah, loop capture tidak menunggu disk)
+# kebijakan overflow: "drop_oldest" (loop tidak pernah menunggu) atau "block" (tidak ada data hilang)
+POSE_LOG_QUEUE = 256      # ~8 detik frame pada 30 fps
+POSE_LOG_OVERFLOW = "drop_oldest"
+
+# Analitik per rep (durasi, ROM, tempo) dikumpulkan selama sesi lalu ditulis sekali saat keluar
+SESSION_SUMMARY_PATH = "workout_session.json"
+
+# Sesi panjang (--long, misal satu shift gym): log pose dirotasi per ukuran/durasi, ringkasan sesi ditulis
+# per bagian log (workout_session.0001.json, ...) lalu dikosongkan, jumlah track dibatasi, dan objek
+# hasil start dibekukan dari GC sehingga memori dan waktu per frame tetap datar
+LONG_ROTATE_MB = 256.0
+LONG_ROTATE_MINUTES = 60.0
+LONG_KEEP_LOGS = None    # jumlah bagian log terbaru yang disimpan; None = semua
+
+# Antrean antar stage pipeline: (ukuran, kebijakan overflow)
+TRACKER_QUEUE = (1, "drop_oldest")     # capture basi dibuang, tracker selalu memproses yang terbaru
+ANALYTICS_QUEUE = (4, "block")         # setiap frame hasil tracking dihitung berurutan (deterministik)
+RENDER_QUEUE = (1, "drop_oldest")      # tampilan boleh melewatkan frame
+
+MIN_PERSON_DISTANCE = 1000.0  # mm, peringatan jika dua orang lebih dekat dari ini
+FILTER_JOINTS = True          # haluskan joint (One-Euro + bobot confidence) sebelum menghitung repetisi
+PROJECTION_TOLERANCE_PX = 0.5
+
+# Subperintah -> modul alat tanpa kamera (masing-masing punya main(argv))
+TOOLS = {
+    "replay": "replay",
+    "benchmark": "benchmark",
+    "soak": "soak",
+    "store": "pose_store",
+    "aggregate": "aggregator",
+    "esp32": "esp32_link",
+    "pose-log": "pose_log",
+}
+
+
+def start_kinect():
+    """Nyalakan kamera dan body tracker (memuat model tracking, beberapa detik).
+
+    Return (device, calibration, body_tracker).
+    """
+    import pykinect_azure as pykinect
+
+    print("Menginisialisasi library...")
+    pykinect.initialize_libraries(track_body=True)
+
+    # Konfigurasi perangkat
+    device_config = pykinect.default_configuration
+    device_config.color_resolution = pykinect.K4A_COLOR_RESOLUTION_720P
+    device_config.depth_mode = pykinect.K4A_DEPTH_MODE_NFOV_UNBINNED
+    device_config.synchronized_images_only = True
+
+    print("Membuka kamera Kinect...")
+    device = pykinect.start_device(config=device_config)
+
+    # Dapatkan kalibrasi (penting untuk memetakan 3D ke 2D)
+    calibration = device.get_calibration(device_config.depth_mode, device_config.color_resolution)
+
+    print("Memulai Body Tracker...")
+    body_tracker = pykinect.start_body_tracker(calibration)
+    return device, calibration, body_tracker
+
+
+def open_serial(port, baud=SERIAL_BAUD, ready_timeout=SERIAL_READY_TIMEOUT):
+    """Buka port ESP32 lalu tunggu baris "siap" setelah reset. Return objek serial atau None."""
+    try:
+        import serial
+        ser = serial.Serial(port, baud, timeout=ACK_TIMEOUT)
+    except Exception as e:
+        print(f"Gagal membuka port serial: {e}")
+        return None
+    deadline = time.monotonic() + ready_timeout
+    while time.monotonic() < deadline:
+        if b"siap" in ser.readline():
+            break
+    print(f"Terhubung ke ESP32 via serial ({port}).")
+    return ser
+
+
+def sdk_3d_to_2d(calibration, position_3d):
+    """Konversi 3D -> 2D lewat SDK (satu panggilan FFI per titik), hanya untuk memverifikasi `Projector`.
+
+    Return (x, y) piksel kamera warna, atau None jika SDK menandai titik tidak valid.
+    """
+    import ctypes
+    from pykinect_azure.k4a import _k4a
+    from pykinect_azure import K4A_CALIBRATION_TYPE_COLOR, K4A_CALIBRATION_TYPE_DEPTH
+
     point3d = _k4a.k4a_float3_t()
     point2d = _k4a.k4a_float2_t()
     valid = ctypes.c_long()
 
-    point3d.xyz.x = ctypes.c_float(position_3d.x)
-    point3d.xyz.y = ctypes.c_float(position_3d.y)
-    point3d.xyz.z = ctypes.c_float(position_3d.z)
+    point3d.xyz.x = ctypes.c_float(position_3d[0])
+    point3d.xyz.y = ctypes.c_float(position_3d[1])
+    point3d.xyz.z = ctypes.c_float(position_3d[2])
 
     result = _k4a.k4a_calibration_3d_to_2d(
         calibration._handle,
@@ -144,378 +178,439 @@ def convert_to_2d(calibration, position_3d):
     )
 
     if result == 0 and valid.value:  # K4A_RESULT_SUCCEEDED = 0
-        return (int(point2d.xy.x), int(point2d.xy.y))
+        return (point2d.xy.x, point2d.xy.y)
     return None
 
 
-# Utility kecil untuk membuat objek 3D dari angka
-class Vec3:
-    def __init__(self, x=0.0, y=0.0, z=0.0):
-        self.x = x
-        self.y = y
-        self.z = z
-
-
-# 3. LOOP UTAMA
-selected_body_index = None  # indeks body yang dipilih berdasarkan ROI tengah
-
-while True:
-    capture = device.update()
-    if not capture:
-        print("Gagal mendapatkan capture")
-        continue
-
-    ret_color, color_image = capture.get_color_image()
-    if not ret_color or color_image is None:
-        continue
-
-    # Manual ROI config
-    ROI_W = 320  # width in pixels
-    ROI_H = 480  # height in pixels
-    ROI_CX = None  # set to an int to fix center X; keep None to use image center
-    ROI_CY = None  # set to an int to fix center Y; keep None to use image center
-
-    h, w, _ = color_image.shape
-    roi_w, roi_h = ROI_W, ROI_H
-
-    roi_cx = ROI_CX if ROI_CX is not None else w // 2
-    roi_cy = ROI_CY if ROI_CY is not None else h // 2
-
-    roi_x1 = max(0, roi_cx - roi_w // 2)
-    roi_y1 = max(0, roi_cy - roi_h // 2)
-    roi_x2 = min(w - 1, roi_cx + roi_w // 2)
-    roi_y2 = min(h - 1, roi_cy + roi_h // 2)
-
-    cv2.rectangle(color_image, (roi_x1, roi_y1), (roi_x2, roi_y2), (0, 255, 255), 2)
-    cv2.putText(color_image, "ROI", (roi_x1 + 6, roi_y1 + 22),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-
-    # Masukkan capture ke body tracker untuk diproses
-    body_frame = body_tracker.update(capture)
-    if not body_frame:
-        print("Gagal mendapatkan body frame")
-        continue
-
-    # Dapatkan jumlah tubuh yang terdeteksi
-    num_bodies = body_frame.get_num_bodies()
-
-    # Pilih satu body yang berada paling dekat di tengah ROI (berdasarkan pundak)
-    target_candidate = None
-    min_dist = float("inf")
-
-    for i in range(num_bodies):
-        try:
-            b = body_frame.get_body(i)
-            sr = b.joints[K4ABT_JOINT_SHOULDER_RIGHT].position
-            sl = b.joints[K4ABT_JOINT_SHOULDER_LEFT].position
-            # rata-rata 3D
-            sc = Vec3((sr.x + sl.x) / 2.0,
-                      (sr.y + sl.y) / 2.0,
-                      (sr.z + sl.z) / 2.0)
-            p2 = convert_to_2d(calibration, sc)
-            if p2 is None:
-                continue
-            sx, sy = p2
-
-            # Jika shoulder center berada di dalam ROI, pertimbangkan sebagai kandidat
-            if roi_x1 <= sx <= roi_x2 and roi_y1 <= sy <= roi_y2:
-                # hitung jarak ke pusat ROI (2D)
-                dist = (sx - roi_cx) ** 2 + (sy - roi_cy) ** 2
-                if dist < min_dist:
-                    min_dist = dist
-                    target_candidate = i
-        except Exception:
-            pass
-
-    # Jika ada kandidat, set selected_body_index ke kandidat; jika tidak, clear (tidak menghitung)
-    selected_body_index = target_candidate
-
-    # 4. HITUNG JARAK ANTAR ORANG (SHOULDER TO SHOULDER) - opsional tampil
-    if num_bodies >= 2:
-        for i in range(num_bodies):
-            for j in range(i + 1, num_bodies):
+class WorkoutSession:
+    """State satu sesi live: counter per orang, log pose, stasiun, ESP32, dan stage analitik/render.
+
+    Bagian yang tidak butuh perangkat dibangun di konstruktor (selagi kamera menyala);
+    kalibrasi kamera, serial, dan renderer dipasang lewat `attach`.
+    """
+
+    __slots__ = ("metrics", "counter", "calibrator", "session_summary", "summary_base", "summary_part", "summary_parts",
+                 "station", "station_id",
+                 "pose_log", "pose_log_writer", "identity_tracker", "proximity_monitor", "joint_filter",
+                 "projector", "sdk_project", "projection_checked", "roi", "esp32", "renderer",
+                 "pipeline", "selected_track_id", "show_hud", "hud_text", "hud_updated",
+                 "pixel_buffers", "_centers", "_positions")
+
+    def __init__(self, exercise, calibrate=False, pose_log_path=POSE_LOG_PATH, station_id=None,
+                 aggregator=AGGREGATOR_ADDRESS, metrics=None, rotation=None, max_tracks=DEFAULT_MAX_TRACKS,
+                 summary_path=SESSION_SUMMARY_PATH):
+        """`rotation` = argumen `RotatingPoseLogWriter` (max_bytes, max_seconds, max_files) untuk sesi panjang;
+        None = satu file log dan satu ringkasan sesi."""
+        self.metrics = metrics or Metrics()
+        # log pose dibuka pertama: kalau gagal (IOError), belum ada yang perlu ditutup
+        if rotation is None:
+            pose_log = PoseLogWriter(pose_log_path)
+        else:
+            pose_log = RotatingPoseLogWriter(pose_log_path, **rotation)
+        self.pose_log = pose_log
+        self.pose_log_writer = BackgroundWriter(
+            "pose-log", self.metrics.timed("pose_log", lambda item: pose_log.write_frame(*item)),
+            maxsize=POSE_LOG_QUEUE, overflow=POSE_LOG_OVERFLOW, on_close=pose_log.close)
+
+        self.session_summary = SessionSummary()
+        self.summary_base = summary_path
+        self.summary_part = getattr(pose_log, "part", None)  # bagian log yang sedang diringkas
+        self.summary_parts = []  # file ringkasan per bagian yang tersimpan, lama -> baru
+        self.station_id = station_id
+        self.station = StationClient(station_id, aggregator) if station_id is not None else None
+
+        # State & counter untuk tiap orang (dikunci dengan track_id), definisi gerakan di exercises.json.
+        # Setiap rep sudah dicatat lewat logger di `catat_rep`, jadi print per rep dari counter dimatikan.
+        self.counter = RepCounter(exercise, notify=self.catat_milestone, verbose=False, on_rep=self.catat_rep)
+        if self.station is not None:
+            self.station.session_start(exercise)
+        # Kalibrasi per orang: target baru berdiri diam lalu memberi contoh gerakan sebelum mulai dihitung
+        self.calibrator = ThresholdCalibrator(self.counter.registry, exercise) if calibrate else None
+
+        self.identity_tracker = IdentityTracker(max_tracks=max_tracks)
+        self.proximity_monitor = ProximityMonitor(MIN_PERSON_DISTANCE)
+        self.joint_filter = JointFilter() if FILTER_JOINTS else None
+        self.selected_track_id = None  # track_id orang yang sedang dihitung (dipilih dari ROI tengah)
+
+        # buffer per frame yang dipakai ulang (tumbuh 2x jika jumlah body bertambah)
+        self._centers = np.empty((8, 3))
+        self._positions = np.empty((8 * K4ABT_JOINT_COUNT, 3))
+        self.pixel_buffers = PixelBuffers()
+
+        self.projector = self.sdk_project = self.roi = None
+        self.projection_checked = False
+        self.esp32 = self.renderer = self.pipeline = None
+        self.show_hud = SHOW_HUD
+        self.hud_text = []
+        self.hud_updated = 0.0
+
+    def attach(self, projector, size, ser=None, make_renderer=None, sdk_project=None):
+        """Pasang proyeksi depth -> color, ukuran gambar warna (lebar, tinggi), port serial (atau None),
+        dan renderer.
+
+        `make_renderer(frame_size, roi)` membuat `Renderer`; None = headless (tidak ada yang digambar).
+        `sdk_project(point)` = proyeksi referensi SDK untuk verifikasi sekali; None = tanpa verifikasi.
+        """
+        self.projector = projector
+        self.sdk_project = sdk_project
+        self.projection_checked = sdk_project is None
+        # ROI dihitung sekali dari resolusi gambar warna (tidak bergantung pada gambar tiap frame)
+        self.roi = compute_roi(*size)
+
+        # Progres target (hitungan, milestone, target total) dikirim ke ESP32 sebagai state lengkap lewat
+        # protokol biner ber-ACK (esp32_link.py): update digabung & dibatasi ~10 Hz, frame hilang dikirim ulang
+        if ser is not None:
+            self.esp32 = SerialLink(ser, self.counter.compiled.labels,
+                                    [message for message, _ in self.counter.compiled.messages])
+
+        if make_renderer is not None:
+            self.renderer = make_renderer(size, self.roi)
+
+    def catat_milestone(self, message, info):
+        log.info("Milestone %s (%s)", info, message)
+
+    def catat_rep(self, record):
+        self.session_summary.add(record)
+        if self.station is not None:
+            self.station.rep(record)
+        log.info("%s #%d selesai (track %s): %.2f s, ROM %s mm, naik/turun %.2f/%.2f s",
+                 record.exercise, record.number, record.track, record.duration,
+                 "-" if record.rom is None else f"{record.rom:.0f}", record.concentric, record.eccentric)
+
+    def summary_path(self):
+        if self.summary_part is None:
+            return self.summary_base
+        return part_path(self.summary_base, self.summary_part)
+
+    def write_summary(self):
+        """Tulis ringkasan bagian sekarang; ringkasan per bagian dihapus bersama log-nya (`max_files`)."""
+        path = self.summary_path()
+        self.session_summary.write(path)
+        if self.summary_part is not None:
+            self.summary_parts.append(path)
+            max_files = self.pose_log.max_files
+            while max_files is not None and len(self.summary_parts) > max_files:
                 try:
-                    shoulder_right1 = body_frame.get_body(i).joints[K4ABT_JOINT_SHOULDER_RIGHT].position
-                    shoulder_left1 = body_frame.get_body(i).joints[K4ABT_JOINT_SHOULDER_LEFT].position
-                    center1 = np.array([
-                        (shoulder_right1.x + shoulder_left1.x) / 2,
-                        (shoulder_right1.y + shoulder_left1.y) / 2,
-                        (shoulder_right1.z + shoulder_left1.z) / 2
-                    ])
-
-                    shoulder_right2 = body_frame.get_body(j).joints[K4ABT_JOINT_SHOULDER_RIGHT].position
-                    shoulder_left2 = body_frame.get_body(j).joints[K4ABT_JOINT_SHOULDER_LEFT].position
-                    center2 = np.array([
-                        (shoulder_right2.x + shoulder_left2.x) / 2,
-                        (shoulder_right2.y + shoulder_left2.y) / 2,
-                        (shoulder_right2.z + shoulder_left2.z) / 2
-                    ])
-
-                    distance = np.sqrt(np.sum((center2 - center1) ** 2))
-                    distance_m = distance / 1000.0  # Konversi ke meter
-
-                    y_offset = 50 + (i * 30)
-                    cv2.putText(color_image,
-                                f"Jarak {i+1}-{j+1}: {distance_m:.2f} m",
-                                (50, y_offset),
-                                cv2.FONT_HERSHEY_SIMPLEX,
-                                0.8, (0, 0, 250), 2)
-                except Exception:
+                    os.remove(self.summary_parts.pop(0))
+                except OSError:
                     pass
-
-    # 5. LOOP SETIAP TUBUH
-    for body_index in range(num_bodies):
-        body = body_frame.get_body(body_index)
-        joints = body.joints
-
-        # Inisialisasi label gesture/default
-        gesture_label = "..."
+        return path
+
+    def roll_summary(self):
+        """Tulis ringkasan bagian log yang sudah ditutup lalu mulai ringkasan baru (memori tetap terbatas)."""
+        path = self.write_summary()
+        log.info("Bagian %d: %d rep, ringkasan di %s", self.summary_part, len(self.session_summary.records), path)
+        self.session_summary = SessionSummary()
+        self.summary_part = self.pose_log.part
+
+    def analyze(self, frame):
+        """Stage analitik: pilih target di ROI, hitung jarak antar orang, log pose, dan hitung repetisi.
+
+        Return `FrameResult` hanya untuk frame yang akan dirender; selain itu None (stage render dilewati).
+        """
+        counter = self.counter
+        calibrator = self.calibrator
+        joint_filter = self.joint_filter
+        bodies = frame.bodies
+        show = self.renderer is not None and self.renderer.due(frame.timestamp)
+
+        joint_pixels = joint_valid = None
+
+        # Ringkasan per bagian log (sesi panjang): bagian baru dimulai setelah log pose berotasi
+        if self.summary_part is not None and self.pose_log.part != self.summary_part:
+            self.roll_summary()
+
+        # Pusat bahu diambil sekali per frame, dipakai tracker identitas, ROI, dan jarak antar orang
+        if len(bodies) > len(self._centers):
+            self._centers = np.empty((2 * len(bodies), 3))
+        centers = shoulder_centers(bodies, self._centers)
+
+        # Proyeksikan semua joint semua body sekaligus, hanya untuk frame yang digambar (ROI cukup pakai pusat bahu)
+        if bodies and (show or not self.projection_checked):
+            n_points = len(bodies) * K4ABT_JOINT_COUNT
+            if n_points > len(self._positions):
+                self._positions = np.empty((2 * n_points, 3))
+            all_positions = np.concatenate([b.positions for b in bodies], out=self._positions[:n_points])
+            if show:
+                joint_pixels, joint_valid = self.projector.project_pixels(
+                    all_positions, self.pixel_buffers.get(n_points))
+
+            # Cek sekali terhadap fungsi SDK pada data nyata pertama
+            if not self.projection_checked:
+                max_err, mismatched = compare_with_sdk(self.projector, all_positions, self.sdk_project)
+                status = "OK" if (max_err <= PROJECTION_TOLERANCE_PX and mismatched == 0) else "PERIKSA KALIBRASI"
+                print(f"Verifikasi proyeksi batch vs SDK: error maks {max_err:.4f} px, "
+                      f"beda validitas {mismatched} titik -> {status}")
+                self.projection_checked = True
+
+        # Identitas stabil per orang: state repetisi dikunci dengan track_id, bukan urutan body_index
+        for track_id in self.identity_tracker.update(frame.timestamp, bodies, centers):
+            counter.forget(track_id)
+            if joint_filter is not None:
+                joint_filter.forget(track_id)
+            if calibrator is not None:
+                calibrator.forget(track_id)
+
+        # Pilih satu body yang berada paling dekat di tengah ROI (berdasarkan pundak)
+        # Jika ada kandidat, set target ke kandidat; jika tidak, clear (tidak menghitung)
+        selected_track_id = select_roi_target(bodies, self.projector, self.roi, self.selected_track_id, centers)
+        self.selected_track_id = selected_track_id
+        selected_body_index = next((b.index for b in bodies if b.track_id == selected_track_id), None)
+
+        # 4. HITUNG JARAK ANTAR ORANG (SHOULDER TO SHOULDER) - satu matriks jarak untuk semua pasangan
+        prox, new_alerts = self.proximity_monitor.update(bodies, centers)
+        for a, b, dist in new_alerts:
+            log.warning("Track %s dan %s terlalu dekat (%.2f m)", a, b, dist / 1000.0)
+
+        # 5. SIMPAN LOG POSE (satu record per body, satu timestamp per frame)
+        self.pose_log_writer.submit((frame.timestamp, bodies))
 
         # 6. LOGIKA WORKOUT DETECTION (knee raise, shoulder front raise, side bend)
-        try:
-            # Ambil posisi 3D dari sendi yang relevan
-            head_pos = joints[K4ABT_JOINT_HEAD].position
-            pelvis_pos = joints[K4ABT_JOINT_PELVIS].position
-            shoulder_right_pos = joints[K4ABT_JOINT_SHOULDER_RIGHT].position
-            shoulder_left_pos = joints[K4ABT_JOINT_SHOULDER_LEFT].position
-            knee_right_pos = joints[K4ABT_JOINT_KNEE_RIGHT].position
-            knee_left_pos = joints[K4ABT_JOINT_KNEE_LEFT].position
-            wrist_right_pos = joints[K4ABT_JOINT_WRIST_RIGHT].position
-            wrist_left_pos = joints[K4ABT_JOINT_WRIST_LEFT].position
-
-            # Inisialisasi state untuk body ini jika belum ada
-            if body_index not in exercise_state:
-                exercise_state[body_index] = {
-                    'knee_count': 0,
-                    'knee_state': 'down',
-                    'shoulder_count': 0,
-                    'shoulder_state': 'down',
-                    'sidebend_count': 0,
-                    'sidebend_state': 'center',
-                    'success_sent': False,
-                    'knee_led_sent': False,
-                    'shoulder_led_sent': False,
-                    'side_led_sent': False
-                }
-
-            st = exercise_state[body_index]
-
-            # Hitung metrik dasar
-            knee_avg_y = (knee_left_pos.y + knee_right_pos.y) / 2
-            shoulder_avg_y = (shoulder_left_pos.y + shoulder_right_pos.y) / 2
-            wrist_avg_y = (wrist_left_pos.y + wrist_right_pos.y) / 2
-
-            # Standing Knee Raise -> jarak vertikal pelvis-ke-lutut
-            knee_dist = abs(pelvis_pos.y - knee_avg_y)
-
-            # Shoulder Front Raise -> selisih Y pergelangan tangan dan bahu
-            wrist_shoulder_diff = wrist_avg_y - shoulder_avg_y
-
-            # Side Bend -> selisih X kepala dan pelvis
-            head_pelvis_x_diff = head_pos.x - pelvis_pos.x
-
-            # Debug singkat
-            print(f"[Body {body_index}] "
-                  f"knee_dist: {knee_dist:.1f}, "
-                  f"wrist-shoulder: {wrist_shoulder_diff:.1f}, "
-                  f"head-pelvis-x: {head_pelvis_x_diff:.1f} "
-                  f"target={body_index == selected_body_index}")
+        labels = []
+        debug_enabled = log.isEnabledFor(logging.DEBUG)
+        for body in bodies:
+            body_index = body.index
+            positions = body.positions
+            if joint_filter is not None:
+                # log pose tetap menyimpan data mentah; hanya logika repetisi yang memakai posisi terfilter
+                positions = joint_filter.apply(body.track_id, frame.timestamp, positions, body.confidence)
 
             # Hanya update counter jika body ini target
-            is_target = (selected_body_index is not None and body_index == selected_body_index)
-
-            # -------- STANDING KNEE RAISE --------
-            if is_target and selected_exercise in ("knee", "all"):
-                # Knee UP: lutut naik mendekati pelvis (knee_dist kecil)
-                if knee_dist < (KNEE_UP_THRESH - KNEE_DEADZONE):
-                    if st['knee_state'] == 'down':
-                        st['knee_state'] = 'up'
-                        st['knee_count'] += 1
-                        print(f"Knee count: {st['knee_count']}")
-
-                        # Kirim RED saat tepat 7x
-                        if st['knee_count'] == 7 and not st['knee_led_sent']:
-                            if ser is not None:
-                                try:
-                                    ser.write(b"RED\n")
-                                    print("Mengirim RED (Knee Raise 7x)")
-                                except Exception as e:
-                                    print(f"Gagal kirim RED: {e}")
-                            st['knee_led_sent'] = True
-
-                # Knee DOWN: kaki lurus lagi (knee_dist besar)
-                elif knee_dist > (KNEE_DOWN_THRESH + KNEE_DEADZONE):
-                    st['knee_state'] = 'down'
-
-            # -------- SHOULDER FRONT RAISE --------
-            if is_target and selected_exercise in ("shoulder", "all"):
-                # tangan naik cukup tinggi (di sekitar / di atas bahu)
-                if wrist_shoulder_diff < (SHOULDER_UP_THRESH - SHOULDER_DEADZONE):
-                    if st['shoulder_state'] == 'down':
-                        st['shoulder_state'] = 'up'
-                        st['shoulder_count'] += 1
-                        print(f"Shoulder count: {st['shoulder_count']}")
-
-                        # Kirim YELLOW saat tepat 7x
-                        if st['shoulder_count'] == 7 and not st['shoulder_led_sent']:
-                            if ser is not None:
-                                try:
-                                    ser.write(b"YELLOW\n")
-                                    print("Mengirim YELLOW (Shoulder Raise 7x)")
-                                except Exception as e:
-                                    print(f"Gagal kirim YELLOW: {e}")
-                            st['shoulder_led_sent'] = True
-
-                # tangan kembali turun (jauh di bawah bahu)
-                elif wrist_shoulder_diff > (SHOULDER_DOWN_THRESH + SHOULDER_DEADZONE):
-                    st['shoulder_state'] = 'down'
-
-            # -------- SIDE BEND (MIRING KIRI–KANAN) --------
-            if is_target and selected_exercise in ("sidebend", "all"):
-                # dari center, cek apakah miring cukup ke kiri / kanan
-                if st['sidebend_state'] == 'center':
-                    if head_pelvis_x_diff > SIDEBEND_RIGHT_THRESH:
-                        st['sidebend_state'] = 'right'
-                    elif head_pelvis_x_diff < SIDEBEND_LEFT_THRESH:
-                        st['sidebend_state'] = 'left'
-                else:
-                    # jika sudah di kiri/kanan, tunggu sampai kembali ke tengah -> hitung 1 repetisi
-                    if abs(head_pelvis_x_diff) < SIDEBEND_CENTER_THRESH:
-                        st['sidebend_count'] += 1
-                        print(f"Sidebend count: {st['sidebend_count']}")
-
-                        # Kirim GREEN saat tepat 7x
-                        if st['sidebend_count'] == 7 and not st['side_led_sent']:
-                            if ser is not None:
-                                try:
-                                    ser.write(b"GREEN\n")
-                                    print("Mengirim GREEN (Side Bend 7x)")
-                                except Exception as e:
-                                    print(f"Gagal kirim GREEN: {e}")
-                            st['side_led_sent'] = True
-
-                        st['sidebend_state'] = 'center'
-
-            # -------- CEK TOTAL REP & KIRIM NOTIF KE ESP32 --------
-            # syarat: knee + shoulder + sidebend >= 15
-            if is_target:
-                total_rep = st['knee_count'] + st['shoulder_count'] + st['sidebend_count']
-                if total_rep >= 15 and not st['success_sent']:
-                    if ser is not None:
-                        try:
-                            ser.write(b"SUCCESS\n")
-                            print(f"Mengirim SUCCESS ke ESP32 (total rep: {total_rep})")
-                        except Exception as e:
-                            print(f"Gagal mengirim SUCCESS: {e}")
-                    st['success_sent'] = True
-
-            # Tampilkan ringkasan hanya untuk target, atau "Other" untuk non-target
-            if is_target:
-                if selected_exercise == "knee":
-                    gesture_label = f"Knee:{st['knee_count']}"
-                elif selected_exercise == "shoulder":
-                    gesture_label = f"Sh:{st['shoulder_count']}"
-                elif selected_exercise == "sidebend":
-                    gesture_label = f"Side:{st['sidebend_count']}"
-                else:
-                    gesture_label = (f"Knee:{st['knee_count']} "
-                                     f"Sh:{st['shoulder_count']} "
-                                     f"Side:{st['sidebend_count']}")
+            is_target = (selected_track_id is not None and body.track_id == selected_track_id)
+
+            try:
+                body_metrics = counter.compute_metrics(positions)
+
+                # Debug singkat (hanya diformat jika level DEBUG aktif)
+                if debug_enabled:
+                    values = ", ".join(f"{name}: {value:.1f}" for name, value in zip(counter.compiled.names, body_metrics))
+                    log.debug("[Body %d / track %s] %s target=%s", body_index, body.track_id, values, is_target)
+
+                # Target yang belum dikalibrasi: kumpulkan statistik dulu; repetisi contoh dihitung
+                # dengan threshold sementara (default terskala) setelah fase diam
+                if is_target and calibrator is not None and calibrator.calibrated(body.track_id) is None:
+                    thresholds = calibrator.update(body.track_id, frame.timestamp, positions, body_metrics)
+                    if thresholds is not None:
+                        counter.set_thresholds(body.track_id, thresholds)
+                    if calibrator.calibrated(body.track_id) is None:
+                        if calibrator.counting(body.track_id):
+                            counter.update(body.track_id, positions, True, body_metrics, frame.timestamp)
+                        labels.append(calibrator.status(body.track_id))
+                        continue
+                    log.info("Kalibrasi track %s selesai: %s", body.track_id, " ".join(
+                        f"{k}={v}" for k, v in calibrator.overrides[body.track_id].items()))
+
+                counter.update(body.track_id, positions, is_target, body_metrics, frame.timestamp)
+
+                # Tampilkan ringkasan hanya untuk target, atau "Other" untuk non-target
+                labels.append(counter.label(body.track_id, is_target))
+
+            except Exception as e:
+                log.warning("Error deteksi workout: %s", e)
+                labels.append("..." if is_target else "Other")
+
+        if self.esp32 is not None:
+            if selected_track_id is None:
+                self.esp32.publish(None)
             else:
-                gesture_label = "Other"
-
-        except Exception as e:
-            print(f"Error deteksi workout: {e}")
-            gesture_label = "Other" if (selected_body_index is None or body_index != selected_body_index) else "..."
-
-        # 7. VISUALISASI KERANGKA
-        joint_2d_positions = {}
-        head_2d_pos = None
-
-        for j in range(K4ABT_JOINT_COUNT):
-            joint = joints[j]
-            pos_3d = joint.position
-
-            # Konversi 3D ke 2D menggunakan helper function
-            pos_2d = convert_to_2d(calibration, pos_3d)
-            if pos_2d is not None:
-                x, y = pos_2d
-                if 0 <= x < w and 0 <= y < h:
-                    joint_2d_positions[j] = (x, y)
-
-                    if j == K4ABT_JOINT_HEAD:
-                        head_2d_pos = (x, y)
-
-                    color = (0, 255, 0) if (selected_body_index == body_index) else (80, 80, 80)
-                    cv2.circle(color_image, (x, y), 3, color, -1)
-
-            # 8. SIMPAN DATA CSV (satu baris per joint)
-            timestamp = time.time()
-            joint_name = K4ABT_JOINT_NAMES[j]
-            csv_writer.writerow([timestamp, body_index, joint_name, pos_3d.x, pos_3d.y, pos_3d.z])
-
-        # Gambar TULANG (bones)
-        bones = [
-            (K4ABT_JOINT_HEAD, K4ABT_JOINT_NECK),
-            (K4ABT_JOINT_NECK, K4ABT_JOINT_SPINE_CHEST),
-            (K4ABT_JOINT_SPINE_CHEST, K4ABT_JOINT_SPINE_NAVEL),
-            (K4ABT_JOINT_SPINE_NAVEL, K4ABT_JOINT_PELVIS),
-
-            (K4ABT_JOINT_SPINE_CHEST, K4ABT_JOINT_CLAVICLE_RIGHT),
-            (K4ABT_JOINT_CLAVICLE_RIGHT, K4ABT_JOINT_SHOULDER_RIGHT),
-            (K4ABT_JOINT_SHOULDER_RIGHT, K4ABT_JOINT_ELBOW_RIGHT),
-            (K4ABT_JOINT_ELBOW_RIGHT, K4ABT_JOINT_WRIST_RIGHT),
-
-            (K4ABT_JOINT_SPINE_CHEST, K4ABT_JOINT_CLAVICLE_LEFT),
-            (K4ABT_JOINT_CLAVICLE_LEFT, K4ABT_JOINT_SHOULDER_LEFT),
-            (K4ABT_JOINT_SHOULDER_LEFT, K4ABT_JOINT_ELBOW_LEFT),
-            (K4ABT_JOINT_ELBOW_LEFT, K4ABT_JOINT_WRIST_LEFT),
-
-            (K4ABT_JOINT_PELVIS, K4ABT_JOINT_HIP_RIGHT),
-            (K4ABT_JOINT_HIP_RIGHT, K4ABT_JOINT_KNEE_RIGHT),
-            (K4ABT_JOINT_KNEE_RIGHT, K4ABT_JOINT_ANKLE_RIGHT),
-
-            (K4ABT_JOINT_PELVIS, K4ABT_JOINT_HIP_LEFT),
-            (K4ABT_JOINT_HIP_LEFT, K4ABT_JOINT_KNEE_LEFT),
-            (K4ABT_JOINT_KNEE_LEFT, K4ABT_JOINT_ANKLE_LEFT),
+                self.esp32.publish(selected_track_id, *counter.progress(selected_track_id))
+
+        if not show:
+            return None
+        return FrameResult(frame, self.roi[:4], selected_body_index,
+                           labels, distance_texts(prox), joint_pixels, joint_valid)
+
+    def render(self, result):
+        """Stage render: gambar ROI, jarak, kerangka, label, dan HUD lalu tampilkan dan/atau rekam."""
+        # latensi ujung ke ujung: capture -> siap ditampilkan
+        self.metrics.observe("end_to_end", time.time() - result.frame.timestamp)
+        if self.show_hud:
+            now = time.monotonic()
+            if now - self.hud_updated >= HUD_REFRESH:
+                self.hud_text = hud_lines(self.metrics.snapshot())
+                self.hud_updated = now
+
+        # 8. TAMPILKAN HASIL
+        self.renderer.render(result, self.hud_text if self.show_hud else None)
+
+        # 'q' keluar, 'h' tampilkan / sembunyikan HUD
+        key = self.renderer.poll_key()
+        if key == ord('q'):
+            self.pipeline.stop()
+        elif key == ord('h'):
+            self.show_hud = not self.show_hud
+
+    def run(self, device, body_tracker):
+        """Loop utama (pipeline: capture -> tracker -> analitik -> render, tiap stage di thread sendiri)."""
+        source = KinectFrameSource(device, body_tracker)
+        stages = [
+            Stage("tracker", source.track, *TRACKER_QUEUE),
+            Stage("analytics", self.analyze, *ANALYTICS_QUEUE),
         ]
-
-        for joint1, joint2 in bones:
-            if joint1 in joint_2d_positions and joint2 in joint_2d_positions:
-                pos1 = joint_2d_positions[joint1]
-                pos2 = joint_2d_positions[joint2]
-                line_color = (255, 0, 0) if (selected_body_index == body_index) else (120, 120, 120)
-                cv2.line(color_image, pos1, pos2, line_color, 2)
-
-        # Tampilkan LABEL di atas kepala
-        if head_2d_pos:
-            text_x = max(5, head_2d_pos[0] - 80)
-            text_y = max(20, head_2d_pos[1] - 40)
-            (text_w, text_h), _ = cv2.getTextSize(gesture_label,
-                                                  cv2.FONT_HERSHEY_SIMPLEX,
-                                                  0.8, 2)
-            cv2.rectangle(color_image,
-                          (text_x-6, text_y-text_h-6),
-                          (text_x+text_w+6, text_y+6),
-                          (0, 0, 0), -1)
-            cv2.putText(color_image, gesture_label, (text_x, text_y),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-        else:
-            cv2.putText(color_image, gesture_label,
-                        (10, 30 + 20 * body_index),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-
-    # 9. TAMPILKAN HASIL
-    cv2.imshow("Azure Kinect Body Tracking", color_image)
-
-    # Keluar jika tombol 'q' ditekan
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
-
-print("Menutup sistem...")
-csv_file.close()
-device.stop_cameras()
-cv2.destroyAllWindows()
-if ser is not None:
-    ser.close()
-print("Selesai.")
+        if self.renderer is not None:
+            stages.append(Stage("render", self.render, *RENDER_QUEUE))
+        self.pipeline = Pipeline(stages, metrics=self.metrics)
+        try:
+            self.pipeline.run(source.captures(with_color=self.renderer is not None))
+        except KeyboardInterrupt:
+            self.pipeline.stop()
+
+    def close(self, record_path=None):
+        """Flush semua worker (log pose, ESP32, stasiun), tulis ringkasan sesi, dan cetak statistiknya."""
+        if self.pipeline is not None:
+            for name, st in self.pipeline.stats().items():
+                print(f"[{name}] diproses={st['written']} dibuang={st['dropped']} "
+                      f"latensi_avg={st['write_avg_ms']:.1f} ms latensi_maks={st['write_max_ms']:.1f} ms")
+        if self.renderer is not None:
+            self.renderer.close()
+            print(f"Frame dirender: {self.renderer.frames_rendered}"
+                  + (f", rekaman di {record_path}" if record_path else ""))
+        # flush sisa antrean lalu tutup file log dari thread worker
+        writer = self.pose_log_writer
+        if not writer.close(timeout=10):
+            print(f"[{writer.name}] Worker belum selesai setelah 10 detik")
+        st = writer.stats()
+        print(f"[{writer.name}] ditulis={st['written']} dibuang={st['dropped']} "
+              f"antrean_maks={st['max_depth']} tulis_maks={st['write_max_ms']:.1f} ms "
+              f"tunggu_submit_maks={st['submit_wait_max_ms']:.2f} ms")
+        # kirim state terakhir ke ESP32 lalu tutup port serial
+        if self.esp32 is not None:
+            if not self.esp32.close(timeout=5):
+                print("[esp32] Link belum selesai setelah 5 detik")
+            st = self.esp32.stats()
+            print(f"[esp32] update={st['published']} digabung={st['coalesced']} terkirim={st['sent']} "
+                  f"ack={st['acked']} retry={st['retries']} gagal={st['failed']} crc_salah={st['bad_crc']} "
+                  f"rtt_avg={st['rtt_avg_ms']:.1f} ms rtt_maks={st['rtt_max_ms']:.1f} ms")
+        summary_path = self.write_summary()
+        print(f"Ringkasan sesi ({len(self.session_summary.records)} rep) tersimpan di {summary_path}")
+        if self.station is not None:
+            # sesi panjang: agregat per bagian ada di file ringkasan, semua rep sudah terkirim satu per satu
+            self.station.session_end(self.session_summary if self.summary_part is None else None)
+            delivered = self.station.close(timeout=5)
+            st = self.station.stats()
+            print(f"[station {self.station_id}] event={st['queued']} terkirim={st['acked']} putus={st['disconnects']}"
+                  + ("" if delivered else f", {st['pending']} event menunggu di {self.station.spool_path}"))
+
+
+def rotation_options(rotate_mb=None, rotate_minutes=None, keep_logs=None):
+    """Argumen `RotatingPoseLogWriter` dari satuan CLI (MB, menit)."""
+    return {
+        "max_bytes": None if rotate_mb is None else int(rotate_mb * 1024 * 1024),
+        "max_seconds": None if rotate_minutes is None else 60.0 * rotate_minutes,
+        "max_files": keep_logs,
+    }
+
+
+def run_live(args):
+    logging.basicConfig(level=logging.DEBUG if args.debug else LOG_LEVEL,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    show_window = SHOW_WINDOW and not args.headless
+    headless = not show_window and args.record is None
+    pose_log_path = args.pose_log or (POSE_LOG_PATH if args.station is None
+                                      else POSE_LOG_PATH.replace(".poselog", f"_{args.station}.poselog"))
+    rotation = None
+    if args.long or args.rotate_mb is not None or args.rotate_minutes is not None:
+        if args.rotate_mb is None and args.rotate_minutes is None:
+            args.rotate_mb, args.rotate_minutes = LONG_ROTATE_MB, LONG_ROTATE_MINUTES
+        rotation = rotation_options(args.rotate_mb, args.rotate_minutes, args.keep_logs)
+
+    # 1. INISIALISASI: kamera + body tracker dan serial menyala di thread sendiri (keduanya lama),
+    # sementara thread utama menyiapkan log pose, counter, stasiun, dan renderer
+    bring_up = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bring-up")
+    kinect = bring_up.submit(start_kinect)
+    serial_port = bring_up.submit(open_serial, args.port) if args.port else None
+    bring_up.shutdown(wait=False)
+
+    # 2. PERSIAPAN LOG POSE (biner, lihat pose_log.py; konversi ke CSV: python pose_log.py to-csv)
+    print("Membuka file log pose untuk menyimpan data...")
+    try:
+        session = WorkoutSession(args.exercise, args.calibrate, pose_log_path, args.station, args.aggregator,
+                                 rotation=rotation, max_tracks=args.max_tracks)
+    except IOError as e:
+        print(f"Error membuka file log pose: {e}. Pastikan file tidak sedang dibuka program lain.")
+        session = None
+    make_renderer = None
+    if not headless:
+        # cv2 hanya dimuat jika ada yang digambar (di sini, paralel dengan bring-up perangkat)
+        from renderer import Renderer
+        make_renderer = functools.partial(Renderer, scale=args.render_scale, crop_to_roi=args.crop_roi,
+                                          max_fps=args.display_fps, record_path=args.record, show=show_window)
+
+    ser = serial_port.result() if serial_port is not None else None
+    try:
+        device, calibration, body_tracker = kinect.result()
+    except Exception as e:
+        print(f"Gagal menyalakan Kinect: {e}")
+        device = None
+    if session is None or device is None:
+        if device is not None:
+            device.stop_cameras()
+        if session is not None:
+            session.close()
+        if ser is not None:
+            ser.close()
+        return 1
+
+    # Proyeksi batch depth -> color: parameter kalibrasi dibaca sekali, semua joint diproyeksikan per frame
+    color = calibration._handle.color_camera_calibration
+    session.attach(Projector.from_calibration(calibration), (color.resolution_width, color.resolution_height),
+                   ser, make_renderer, functools.partial(sdk_3d_to_2d, calibration))
+    if rotation is not None:
+        # objek hasil start (library, model, tabel) tidak perlu dipindai GC lagi selama sesi panjang
+        gc.collect()
+        gc.freeze()
+    metrics_dumper = MetricsDumper(session.metrics, METRICS_PATH, METRICS_FORMAT, METRICS_INTERVAL)
+    if headless:
+        print("Mode headless: tanpa jendela dan rekaman. Tekan Ctrl+C untuk keluar.")
+    else:
+        print("🎥 Sistem siap. Tekan 'q' untuk keluar.")
+    # 3. LOOP UTAMA
+    session.run(device, body_tracker)
+
+    print("Menutup sistem...")
+    device.stop_cameras()
+    session.close(args.record)
+    metrics_dumper.close()  # dump terakhir setelah semua stage selesai
+    print(f"Metrik tersimpan di {METRICS_PATH}")
+    print("Selesai.")
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # alat tanpa kamera: modulnya saja yang di-import (tanpa pykinect/cv2/serial)
+    if argv and argv[0] in TOOLS:
+        return importlib.import_module(TOOLS[argv[0]]).main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Workout tracker Azure Kinect + ESP32 (mode live). "
+                    f"Alat tanpa kamera: {', '.join(TOOLS)} (python workout.py <alat> -h)")
+    parser.add_argument("--exercise", choices=EXERCISE_CHOICES, default="all")
+    parser.add_argument("--calibrate", action="store_true", help="kalibrasi threshold per orang")
+    parser.add_argument("--port", default=SERIAL_PORT,
+                        help=f"port serial ESP32 (default {SERIAL_PORT}); kosongkan (--port '') untuk tanpa ESP32")
+    parser.add_argument("--headless", action="store_true",
+                        help="tanpa jendela; tanpa --record juga tidak ada yang dirender (gambar warna tidak diambil)")
+    parser.add_argument("--record", default=RECORD_PATH, help="rekam output overlay ke file video")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE)
+    parser.add_argument("--crop-roi", action="store_true", default=CROP_TO_ROI, help="tampilkan hanya area ROI")
+    parser.add_argument("--display-fps", type=float, default=DISPLAY_FPS)
+    parser.add_argument("--station", default=STATION_ID, help="kirim event rep ke daemon agregasi sebagai stasiun ini")
+    parser.add_argument("--aggregator", default=AGGREGATOR_ADDRESS, help="alamat daemon agregasi")
+    parser.add_argument("--pose-log", default=None, help=f"file log pose (default {POSE_LOG_PATH})")
+    parser.add_argument("--debug", action="store_true", help="log metrik per body per frame")
+    parser.add_argument("--long", action="store_true",
+                        help=f"sesi panjang: rotasi log pose (default {LONG_ROTATE_MB:g} MB / "
+                             f"{LONG_ROTATE_MINUTES:g} menit) dan ringkasan per bagian")
+    parser.add_argument("--rotate-mb", type=float, default=None, help="rotasi log pose setiap N MB (mengaktifkan --long)")
+    parser.add_argument("--rotate-minutes", type=float, default=None,
+                        help="rotasi log pose setiap N menit (mengaktifkan --long)")
+    parser.add_argument("--keep-logs", type=int, default=LONG_KEEP_LOGS,
+                        help="simpan hanya N bagian log terbaru (default semua)")
+    parser.add_argument("--max-tracks", type=int, default=DEFAULT_MAX_TRACKS,
+                        help=f"batas orang yang dilacak sekaligus (default {DEFAULT_MAX_TRACKS})")
+    return run_live(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
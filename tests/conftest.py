@@ -0,0 +1,6 @@
+"""Modul program berupa skrip datar di Program/: tambahkan foldernya ke sys.path untuk pengujian."""
+import os
+import sys
+
+PROGRAM_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Program")
+sys.path.insert(0, PROGRAM_DIR)
@@ -0,0 +1,188 @@
+"""Daemon agregasi + `StationClient`: daemon mati/restart di tengah stream tanpa rep hilang atau ganda,
+gangguan database sementara dikirim ulang, event rusak dibuang."""
+import json
+import socket
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from aggregator import AggregatorServer, RepStore
+from rep_analytics import RepRecord
+from station_client import StationClient
+
+STATIONS = ("A", "B", "C")
+REPS_PER_STATION = 300
+
+
+def start_server(store, port=0):
+    server = AggregatorServer(store, ("127.0.0.1", port))
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.02}, daemon=True).start()
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.close()
+
+
+def record(track, number):
+    start = 1000.0 + number
+    return RepRecord(track, "knee", number, start, start + 0.8, 60.0, 90.0, 0.4, 0.4)
+
+
+def make_client(name, port, tmp_path):
+    return StationClient(name, ("127.0.0.1", port), str(tmp_path / f"station_{name}.spool"),
+                         batch_size=20, reconnect_interval=0.02)
+
+
+def stored_reps(db_path):
+    with sqlite3.connect(db_path) as db:
+        return db.execute("SELECT station, session, seq, number FROM reps ORDER BY station, seq").fetchall()
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "gym.db")
+
+
+def test_daemon_restart_mid_stream_loses_and_duplicates_nothing(db_path, tmp_path):
+    store = RepStore(db_path)
+    server = start_server(store)
+    port = server.server_address[1]
+    clients = {name: make_client(name, port, tmp_path) for name in STATIONS}
+
+    def stream(client):
+        client.session_start("knee")
+        for n in range(1, REPS_PER_STATION + 1):
+            client.rep(record(0, n))
+            time.sleep(0.003)
+
+    threads = [threading.Thread(target=stream, args=(client,)) for client in clients.values()]
+    for t in threads:
+        t.start()
+    wait_until(lambda: min(c.stats()["acked"] for c in clients.values()) >= 30)
+    stop_server(server)                  # daemon mati saat stasiun masih mengirim
+    assert max(c.stats()["queued"] for c in clients.values()) < REPS_PER_STATION
+    time.sleep(0.2)
+    server = start_server(RepStore(db_path), port)
+    for t in threads:
+        t.join()
+    for client in clients.values():
+        client.session_end()
+        assert client.close(timeout=10)
+    stop_server(server)
+
+    rows = stored_reps(db_path)
+    for name, client in clients.items():
+        numbers = [number for station, _, _, number in rows if station == name]
+        assert sorted(numbers) == list(range(1, REPS_PER_STATION + 1)), name
+        st = client.stats()
+        assert st["pending"] == 0 and st["rejected"] == 0 and st["errors"] == 0
+        assert st["disconnects"] >= 1
+        assert st["acked"] == REPS_PER_STATION + 2  # start + rep + end
+    assert len({(station, session, seq) for station, session, seq, _ in rows}) == len(rows)
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT COUNT(*) FROM sessions WHERE ended IS NOT NULL").fetchone()[0] == len(STATIONS)
+
+
+class FlakyStore(RepStore):
+    """RepStore yang gagal sementara (database terkunci) untuk `failures` transaksi pertama."""
+
+    def __init__(self, path, failures):
+        super().__init__(path)
+        self.failures = failures
+
+    def ingest(self, batches):
+        if self.failures > 0:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return super().ingest(batches)
+
+
+def test_transient_error_reply_keeps_batch_and_resends(db_path, tmp_path):
+    server = start_server(FlakyStore(db_path, failures=3))
+    client = make_client("A", server.server_address[1], tmp_path)
+    client.session_start("knee")
+    for n in range(1, 51):
+        client.rep(record(0, n))
+    wait_until(lambda: client.stats()["pending"] == 0)
+    assert client.close(timeout=5)
+    stop_server(server)
+
+    st = client.stats()
+    assert st["errors"] == 3
+    assert (st["acked"], st["rejected"], st["duplicates"]) == (51, 0, 0)
+    assert sorted(number for *_, number in stored_reps(db_path)) == list(range(1, 51))
+    with open(tmp_path / "station_A.spool") as f:
+        assert f.read() == ""  # spool baru dikosongkan setelah semua tersimpan
+
+
+def test_malformed_event_is_dropped_and_rest_of_batch_stored(db_path, tmp_path):
+    server = start_server(RepStore(db_path))
+    client = make_client("A", server.server_address[1], tmp_path)
+    client.rep(record(0, 1))
+    client.rep(RepRecord(0, None, 2, 1002.0, 1003.0, 60.0, 90.0, 0.5, 0.5))  # gerakan kosong: tidak bisa disimpan
+    client.rep(record(0, 3))
+    assert client.close(timeout=5)
+    stop_server(server)
+
+    st = client.stats()
+    assert (st["acked"], st["rejected"], st["pending"], st["errors"]) == (3, 1, 0, 0)
+    assert [number for *_, number in stored_reps(db_path)] == [1, 3]
+
+
+def test_malformed_request_is_rejected_without_retry(db_path):
+    server = start_server(RepStore(db_path))
+    try:
+        with socket.create_connection(server.server_address, timeout=5) as sock:
+            reader = sock.makefile("r", encoding="utf-8")
+            sock.sendall(b'{"station": "A", "events": 5}\n')
+            reply = json.loads(reader.readline())
+            sock.sendall(b'{"station": "A", "events": []}\n')
+            ok = json.loads(reader.readline())
+    finally:
+        stop_server(server)
+    assert reply["retry"] is False and "error" in reply
+    assert ok == {"ok": 0, "rejected": 0, "seq": None}
+
+
+def test_resent_end_event_counts_as_duplicate(db_path):
+    store = RepStore(db_path)
+    events = [{"session": "s1", "seq": 0, "type": "start", "at": 1000.0, "data": {"exercise": "knee"}},
+              {"session": "s1", "seq": 1, "type": "rep", "at": 1001.0,
+               "data": record(0, 1).to_row() + ["A/s1/0"]},
+              {"session": "s1", "seq": 2, "type": "end", "at": 1002.0, "data": {"tracks": None}}]
+    assert store.ingest([("A", events)]) == [(3, 0)]
+    assert store.ingest([("A", events)]) == [(0, 0)]       # batch dikirim ulang setelah ACK hilang
+    assert store.ingest([("A", events[2:])]) == [(0, 0)]
+    changed = dict(events[2], seq=3, at=1003.0)            # end baru dengan isi berbeda tetap disimpan
+    assert store.ingest([("A", [changed])]) == [(1, 0)]
+
+
+def test_spool_written_by_sender_thread_only(tmp_path):
+    # daemon tidak jalan: semua event tetap di spool, dan loop analitik (on_rep) tidak pernah menulis ke disk
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    client = make_client("A", port, tmp_path)
+    writers = set()
+    spool_write = client._spool.write
+    client._spool.write = lambda text: writers.add(threading.current_thread().name) or spool_write(text)
+    client.session_start("knee")
+    for n in range(1, 21):
+        client.rep(record(0, n))
+    client.session_end()
+    assert client.close(timeout=5) is False  # belum terkirim, tetapi thread sudah berhenti
+    assert client.stats()["pending"] == 22
+    assert writers == {"station-A"}
+    with open(tmp_path / "station_A.spool") as f:
+        assert [json.loads(line)["seq"] for line in f] == list(range(22))
@@ -0,0 +1,19 @@
+"""`BackgroundWriter`: kegagalan handler dihitung di errors, bukan written."""
+from background_writer import BackgroundWriter
+
+
+def test_failed_writes_counted_separately():
+    done = []
+
+    def handler(item):
+        if item % 3 == 0:
+            raise OSError("disk penuh")
+        done.append(item)
+
+    writer = BackgroundWriter("uji", handler, maxsize=16, overflow="block")
+    for i in range(10):
+        writer.submit(i)
+    assert writer.close(timeout=5)
+    st = writer.stats()
+    assert done == [1, 2, 4, 5, 7, 8]
+    assert (st["submitted"], st["written"], st["errors"], st["dropped"]) == (10, 6, 4, 0)
@@ -0,0 +1,64 @@
+"""`count_reps_batch` harus menghasilkan hitungan yang sama dengan `RepCounter` per frame."""
+import os
+
+import numpy as np
+import pytest
+
+from batch_counter import count_reps_batch, poses_from_frames, select_center_body_batch
+from conftest import PROGRAM_DIR
+from frame_source import CsvReplaySource
+from identity_tracker import IdentityTracker
+from replay import select_center_body
+from rep_counter import DEFAULT_REGISTRY, RepCounter
+from synthetic import SyntheticSkeletons
+
+RECORDING = os.path.join(PROGRAM_DIR, "data_gerakan.csv")
+
+
+def per_frame_counts(frames, center_only):
+    """Hitungan per track dengan `RepCounter` frame demi frame; return ({track: {gerakan: n}}, {track: body_index})."""
+    counter = RepCounter(verbose=False)
+    tracker = IdentityTracker()
+    body_of_track = {}
+    for frame in frames:
+        tracker.update(frame.timestamp, frame.bodies)
+        target = select_center_body(frame.bodies) if center_only else None
+        for body in frame.bodies:
+            body_of_track.setdefault(body.track_id, body.index)
+            is_target = not center_only or body.index == target
+            counter.update(body.track_id, body.positions, is_target, timestamp=frame.timestamp)
+    counts = {track: dict(zip(counter.compiled.names, counter.counts_array[counter.slots[track]].tolist()))
+              for track in counter.slots}
+    return counts, body_of_track
+
+
+def batch_counts(frames, center_only):
+    timestamps, poses = poses_from_frames(frames)
+    target_mask = None
+    if center_only:
+        target = select_center_body_batch(poses)
+        target_mask = target[:, None] == np.arange(poses.shape[1])[None, :]
+    result = count_reps_batch(poses, timestamps, target_mask=target_mask)
+    return {b: {ex: int(result.counts[ex][b]) for ex in DEFAULT_REGISTRY.names} for b in range(poses.shape[1])}
+
+
+def assert_same_counts(frames, center_only):
+    per_frame, body_of_track = per_frame_counts(frames, center_only)
+    batch = batch_counts(frames, center_only)
+    # indeks body stabil di rekaman ini, jadi satu track = satu body_index
+    assert len(set(body_of_track.values())) == len(body_of_track)
+    assert sum(sum(c.values()) for c in per_frame.values()) > 0
+    for track, counts in per_frame.items():
+        assert counts == batch[body_of_track[track]], f"track {track}"
+
+
+@pytest.mark.parametrize("center_only", [True, False])
+def test_recording_matches_per_frame(center_only):
+    frames = list(CsvReplaySource(RECORDING))
+    assert_same_counts(frames, center_only)
+
+
+@pytest.mark.parametrize("center_only", [True, False])
+def test_synthetic_multi_body_matches_per_frame(center_only):
+    frames = list(SyntheticSkeletons(num_bodies=4, num_frames=900, seed=3))
+    assert_same_counts(frames, center_only)
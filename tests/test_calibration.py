@@ -0,0 +1,80 @@
+"""Kalibrasi per orang: pemanasan sintetis (diam + contoh per gerakan) pada tubuh kecil/besar."""
+import numpy as np
+import pytest
+
+from calibration import NEUTRAL_SECONDS, SAMPLE_SECONDS, ThresholdCalibrator
+from exercise_registry import load_registry
+from frame_source import Frame, Skeleton
+from replay import run_replay
+from rep_counter import RepCounter
+from synthetic import SCRIPTED_EXERCISES, pose_at
+
+FPS = 15.0
+ORIGIN = np.array([0.0, -90.0, 2200.0])
+WORKOUT = {"knee": 4, "shoulder": 3, "sidebend": 5}  # siklus gerakan setelah pemanasan
+COUNTS_PER_CYCLE = {"knee": 1, "shoulder": 1, "sidebend": 2}  # side bend: kanan dan kiri masing-masing dihitung
+
+
+def movement(exercise, reps, seconds, scale, rng):
+    """Pose-pose `reps` repetisi `exercise` yang dibagi rata dalam `seconds` detik (reps=0: berdiri diam)."""
+    for n in range(int(round(seconds * FPS))):
+        progress = (n / FPS) * reps / seconds % 1.0 if reps else 0.0
+        yield pose_at(exercise, progress, scale=scale) + ORIGIN + rng.normal(0.0, 5.0, (1, 3))
+
+
+def session(scale, sample_order=SCRIPTED_EXERCISES, seed=0):
+    """Frame pemanasan lalu latihan; return (frames, hitungan sebenarnya per gerakan)."""
+    rng = np.random.default_rng(seed)
+    poses = list(movement("knee", 0, NEUTRAL_SECONDS + 0.5, scale, rng))
+    truth = dict.fromkeys(SCRIPTED_EXERCISES, 0)
+    for exercise in sample_order:
+        poses.extend(movement(exercise, 2, SAMPLE_SECONDS, scale, rng))
+        truth[exercise] += 2 * COUNTS_PER_CYCLE[exercise]
+    for exercise, reps in WORKOUT.items():
+        poses.extend(movement(exercise, reps, 2.0 * reps, scale, rng))
+        truth[exercise] += reps * COUNTS_PER_CYCLE[exercise]
+    confidence = np.full(len(poses[0]), 2, dtype=np.uint8)
+    frames = [Frame(n / FPS, [Skeleton(0, positions, body_id=1, confidence=confidence)])
+              for n, positions in enumerate(poses)]
+    return frames, truth
+
+
+def calibrated_counts(frames):
+    registry = load_registry()
+    counter = RepCounter("all", registry=registry, verbose=False)
+    calibrator = ThresholdCalibrator(registry, "all")
+    run_replay(frames, counter, calibrator=calibrator)
+    (track_id,) = calibrator.results
+    return counter.counts(track_id), calibrator.overrides[track_id]
+
+
+@pytest.mark.parametrize("scale", [0.8, 1.0, 1.2])
+def test_warm_up_counts_ground_truth(scale):
+    frames, truth = session(scale)
+    counts, overrides = calibrated_counts(frames)
+    assert counts == truth
+    # threshold benar-benar diturunkan dari contoh (bukan default), dan ikut ukuran tubuh
+    registry = load_registry()
+    assert overrides["knee_up"] != pytest.approx(registry.parameters()["knee_up"] * scale, abs=1.0)
+
+
+def test_thresholds_scale_with_body():
+    small = calibrated_counts(session(0.8)[0])[1]
+    large = calibrated_counts(session(1.2)[0])[1]
+    for name in ("knee_up", "knee_down", "sidebend_right"):
+        assert small[name] == pytest.approx(large[name] * 0.8 / 1.2, rel=0.15)
+
+
+@pytest.mark.parametrize("order, wrong", [
+    (("knee", "sidebend", "shoulder"), ("shoulder",)),  # side bend saat diminta shoulder, dan sebaliknya
+    (("sidebend", "knee", "shoulder"), ("knee",)),
+])
+def test_sample_of_wrong_exercise_falls_back_to_scaled_default(order, wrong):
+    frames, truth = session(1.2, sample_order=order)
+    counts, overrides = calibrated_counts(frames)
+    assert counts == truth
+    defaults = load_registry().parameters()
+    for exercise in wrong:
+        for name in ("up", "down", "deadzone"):
+            key = f"{exercise}_{name}"
+            assert overrides[key] == pytest.approx(defaults[key] * 1.2, abs=0.5 + 0.02 * abs(defaults[key]))
@@ -0,0 +1,76 @@
+"""Protokol serial ESP32: sinkron ulang decoder dan SerialLink <-> FakeEsp32 lewat loopback berderau."""
+import pytest
+
+from esp32_link import (ACK_NAMES_OK, MSG_ACK, MSG_NAMES, MSG_STATE, SYNC, FakeEsp32, FrameDecoder,
+                        decode_state, encode_frame, encode_names, encode_state, simulate)
+
+LABELS = ["Knee", "Sh", "Side"]
+MESSAGES = ["RED", "YELLOW", "GREEN"]
+
+
+def state_frame(seq, counts):
+    return encode_frame(MSG_STATE, seq, encode_state(1, counts, [c >= 7 for c in counts]))
+
+
+def corrupted_crc(frame):
+    frame = bytearray(frame)
+    frame[5] ^= 0x40  # byte payload; CRC tidak lagi cocok
+    return bytes(frame)
+
+
+@pytest.mark.parametrize("noise", [
+    b"boot\r\n" + bytes([SYNC]) + b"xy",                          # SYNC palsu di teks boot
+    bytes([SYNC, MSG_STATE, 0, 200]) + b"\0" * 8,                   # panjang > MAX_PAYLOAD
+    bytes([SYNC, MSG_STATE, 0, 40, 1, 2]),                          # panjang masuk akal, frame tidak pernah lengkap
+    corrupted_crc(state_frame(7, [1, 2, 3])),                       # CRC salah
+    state_frame(7, [1, 2, 3])[:-3],                                  # frame terpotong
+], ids=["bad-sync", "bad-length", "short-frame", "bad-crc", "truncated"])
+@pytest.mark.parametrize("chunk", [1, 3, 1000])
+def test_decoder_resyncs_on_next_frame(noise, chunk):
+    good = [state_frame(seq, [seq, 0, 5]) for seq in range(6)]
+    stream = good[0] + noise + b"".join(good[1:])
+    decoder = FrameDecoder()
+    frames = []
+    for i in range(0, len(stream), chunk):
+        frames += decoder.feed(stream[i:i + chunk])
+    # header palsu menahan decoder sampai byte cukup, tetapi frame asli di dalamnya tidak ikut hilang
+    assert [seq for _, seq, _ in frames] == list(range(6))
+    assert decode_state(frames[-1][2])[1] == [5, 0, 5]
+    if noise.startswith(b"boot"):
+        assert decoder.skipped > 0
+
+
+def test_decoder_counts_bad_crc():
+    decoder = FrameDecoder()
+    frames = decoder.feed(corrupted_crc(state_frame(0, [1])) + state_frame(1, [2]))
+    assert [seq for _, seq, _ in frames] == [1]
+    assert decoder.bad_crc >= 1
+
+
+def ack_status(reply):
+    ((msg_type, _, payload),) = FrameDecoder().feed(reply)
+    assert msg_type == MSG_ACK
+    return payload[0]
+
+
+def test_truncated_names_not_acknowledged():
+    device = FakeEsp32()
+    names = encode_names(LABELS, MESSAGES)
+    # payload terpotong tetapi frame-nya sendiri valid (CRC dihitung atas payload yang terpotong)
+    assert ack_status(device.feed(encode_frame(MSG_NAMES, 0, names[:-1]))) & ACK_NAMES_OK == 0
+    assert device.labels is None
+    assert ack_status(device.feed(state_frame(1, [1, 0, 0]))) & ACK_NAMES_OK == 0
+    assert ack_status(device.feed(encode_frame(MSG_NAMES, 2, names))) & ACK_NAMES_OK
+    assert device.labels == LABELS and device.messages == MESSAGES
+    # retry NAMES dengan seq sama: tetap di-ACK, tidak diterapkan ulang
+    assert ack_status(device.feed(encode_frame(MSG_NAMES, 2, names))) & ACK_NAMES_OK
+    assert device.duplicates == 1
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_link_over_lossy_loopback_with_reboot(seed):
+    stats, device, counts = simulate(seconds=1.5, loss=0.2, corrupt=0.1, reboot_at=0.7, seed=seed)
+    assert device.counts == counts
+    assert device.labels == LABELS
+    assert device.leds == {m for m, c in zip(MESSAGES, counts) if c >= 7}
+    assert stats["retries"] > 0 and stats["acked"] > 0
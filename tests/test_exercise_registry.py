@@ -0,0 +1,74 @@
+"""Whitelist ekspresi metrik exercises.json dan arah threshold hysteresis."""
+import numpy as np
+import pytest
+
+from exercise_registry import ExerciseDef, ExerciseRegistry, compile_metric
+from kinect_joints import K4ABT_JOINT_COUNT, K4ABT_JOINT_PELVIS
+from rep_counter import RepCounter
+
+
+@pytest.mark.parametrize("expression", [
+    "abs(pelvis.y - (left_knee.y + right_knee.y) / 2)",
+    "hypot(head.x - pelvis.x, head.z - pelvis.z)",
+    "min(left_wrist.y, right_wrist.y) - max(1, 2.5) ** 2",
+    "-spine_navel.z + sqrt(4)",
+])
+def test_allowed_expressions_compile(expression):
+    source = compile_metric(expression)
+    assert "p[..., " in source
+
+
+@pytest.mark.parametrize("expression", [
+    "pelvis.x.real",                 # rantai atribut
+    "pelvis.w",                      # sumbu tidak dikenal
+    "abs.__class__",                 # atribut pada fungsi
+    "pelvis.__class__",
+    "(pelvis.x).__class__.__mro__",
+    "__import__('os').system('true')",
+    "__builtins__",
+    "open('exercises.json')",        # fungsi di luar whitelist
+    "pelvis.x.conjugate()",
+    "abs(pelvis.x, key=1)",          # keyword argument
+    "abs(pelvis.x)(1)",
+    "pelvis[0]",                     # subscript
+    "p[..., 0, 0]",
+    "(lambda: 1)()",
+    "[pelvis.x]",
+    "pelvis.x if 1 else head.x",
+    "pelvis.x < head.x",
+    "'x' * 3",
+    "pelvis",                        # joint tanpa sumbu
+    "unknown_joint.x",
+    "pelvis.x +",                    # sintaks rusak
+])
+def test_rejected_expressions(expression):
+    with pytest.raises(ValueError):
+        compile_metric(expression)
+
+
+def test_rejected_expression_in_definition():
+    with pytest.raises(ValueError):
+        ExerciseDef("jahat", "__import__('os').getcwd()", "hysteresis", {"up": 1, "down": 2, "deadzone": 0})
+
+
+def pose(value):
+    positions = np.zeros((K4ABT_JOINT_COUNT, 3))
+    positions[K4ABT_JOINT_PELVIS, 1] = value
+    return positions
+
+
+def test_above_and_below_are_mirror_images():
+    below = ExerciseDef("below", "pelvis.y", "hysteresis", {"up": 80, "down": 130, "deadzone": 10},
+                        direction="below")
+    # metrik dibalik tanda + threshold dibalik tanda: harus bertransisi di frame yang sama persis
+    above = ExerciseDef("above", "-pelvis.y", "hysteresis", {"up": -80, "down": -130, "deadzone": 10},
+                        direction="above")
+    counter = RepCounter(registry=ExerciseRegistry([below, above], total_target_reps=1000), verbose=False)
+    values = [150, 100, 71, 69, 60, 100, 139, 141, 120, 65, 150, 72, 150, 50, 30, 200]
+    per_frame = []
+    for t, value in enumerate(values):
+        per_frame.append(counter.update(0, pose(value), True, timestamp=float(t)))
+        assert counter.states[counter.slots[0], 0] == counter.states[counter.slots[0], 1]
+    assert counter.counts(0) == {"below": 3, "above": 3}
+    assert [len(names) for names in per_frame] == [2 if n else 0 for n in
+                                                   [0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0]]
@@ -0,0 +1,99 @@
+"""`IdentityTracker.update`: track_id stabil saat urutan body berubah, TTL, dan batas `max_tracks`."""
+import numpy as np
+
+from frame_source import Skeleton
+from identity_tracker import IdentityTracker
+from kinect_joints import K4ABT_JOINT_COUNT
+
+TTL = 5.0
+
+
+def body(index, x, body_id=None, z=2000.0):
+    """Body dengan semua joint (termasuk kedua bahu) di titik (x, 0, z) mm."""
+    positions = np.zeros((K4ABT_JOINT_COUNT, 3))
+    positions[:] = (x, 0.0, z)
+    return Skeleton(index, positions, body_id=body_id)
+
+
+def track_ids(bodies):
+    return [b.track_id for b in bodies]
+
+
+def test_swapped_body_index_with_sdk_body_id():
+    tracker = IdentityTracker(ttl=TTL)
+    first = [body(0, -600, body_id=7), body(1, 600, body_id=9)]
+    assert tracker.update(0.0, first) == []
+    ids = {b.body_id: b.track_id for b in first}
+
+    # urutan body dibalik dan keduanya bertukar tempat jauh melewati max_distance: body id SDK yang menentukan
+    second = [body(0, -600, body_id=9), body(1, 600, body_id=7)]
+    assert tracker.update(0.1, second) == []
+    assert {b.body_id: b.track_id for b in second} == ids
+    assert len(tracker.tracks) == 2
+
+
+def test_swapped_body_index_without_body_id():
+    tracker = IdentityTracker(ttl=TTL)
+    first = [body(0, -600), body(1, 600), body(2, 0, z=3000)]
+    tracker.update(0.0, first)
+    by_x = {b.positions[0, 0]: b.track_id for b in first}
+    assert sorted(by_x.values()) == [0, 1, 2]
+
+    second = [body(0, 610), body(1, 10, z=3000), body(2, -590)]
+    assert tracker.update(0.1, second) == []
+    assert track_ids(second) == [by_x[600], by_x[0], by_x[-600]]
+
+
+def test_new_sdk_body_id_falls_back_to_distance():
+    tracker = IdentityTracker(ttl=TTL)
+    first = [body(0, -600, body_id=1), body(1, 600, body_id=2)]
+    tracker.update(0.0, first)
+    # SDK kehilangan lalu menemukan lagi orang kedua dengan id baru di posisi yang hampir sama
+    second = [body(0, 605, body_id=3), body(1, -600, body_id=1)]
+    tracker.update(0.1, second)
+    assert track_ids(second) == [first[1].track_id, first[0].track_id]
+    assert tracker.tracks[first[1].track_id].body_id == 3
+
+
+def test_short_drop_keeps_track_and_long_drop_expires_it():
+    tracker = IdentityTracker(ttl=TTL)
+    a, b = body(0, -600), body(1, 600)
+    tracker.update(0.0, [a, b])
+    track_a, track_b = a.track_id, b.track_id
+
+    # b hilang kurang dari ttl lalu kembali: track sama, tidak ada yang kedaluwarsa
+    for t in (1.0, 2.0, 3.0):
+        assert tracker.update(t, [body(0, -600)]) == []
+    back = [body(0, -600), body(1, 620)]
+    assert tracker.update(4.5, back) == []
+    assert track_ids(back) == [track_a, track_b]
+
+    # b hilang lebih dari ttl: kedaluwarsa tepat sekali, lalu kembali sebagai track baru
+    expired = []
+    for t in np.arange(5.0, 11.0, 0.5):
+        expired += tracker.update(float(t), [body(0, -600)])
+    assert expired == [track_b]
+    assert set(tracker.tracks) == {track_a}
+    again = [body(0, -600), body(1, 600)]
+    assert tracker.update(11.0, again) == []
+    assert again[0].track_id == track_a
+    assert again[1].track_id not in (track_a, track_b)
+
+
+def test_max_tracks_evicts_least_recently_seen():
+    tracker = IdentityTracker(ttl=TTL, max_tracks=3)
+    a, b = body(0, -2000), body(1, -1000)
+    tracker.update(0.0, [a, b])
+    c = body(1, 0)
+    tracker.update(1.0, [body(0, -2000), c])      # b tidak terlihat (masih dalam ttl)
+    d = body(2, 1000)
+    now = [body(0, -2000), body(1, 0), d]
+    expired = tracker.update(2.0, now)             # 4 track > max_tracks: b paling lama tidak terlihat
+    assert expired == [b.track_id]
+    assert set(tracker.tracks) == {a.track_id, c.track_id, d.track_id}
+    assert track_ids(now) == [a.track_id, c.track_id, d.track_id]
+
+    later = [body(0, 1000), body(1, -2000), body(2, 0)]
+    assert tracker.update(3.0, later) == []
+    assert track_ids(later) == [d.track_id, a.track_id, c.track_id]
+    assert len(set(track_ids(later) + [b.track_id])) == 4  # id lama tidak dipakai ulang
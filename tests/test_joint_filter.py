@@ -0,0 +1,61 @@
+"""`JointFilter`: meredam jitter di sekitar threshold tanpa menambah transisi pada rekaman."""
+import os
+
+import numpy as np
+import pytest
+
+from conftest import PROGRAM_DIR
+from frame_source import CsvReplaySource, Frame, Skeleton
+from joint_filter import MAX_DT, JointFilter
+from kinect_joints import K4ABT_JOINT_HEAD
+from replay import run_replay
+from rep_counter import RepCounter
+from synthetic import pose_at
+
+RECORDING = os.path.join(PROGRAM_DIR, "data_gerakan.csv")
+FPS = 30.0
+
+
+def counts(frames, joint_filter=None):
+    counter = RepCounter(verbose=False)
+    run_replay(frames, counter, joint_filter=joint_filter)
+    return counter.counts(0)  # satu orang: track 0
+
+
+def jitter_frames(offset, sigma, seed, seconds=20.0):
+    """Orang diam dengan sidebend (head.x - pelvis.x) = `offset` mm, di antara zona tengah (30) dan
+    threshold miring (70), plus noise gaussian `sigma` mm per koordinat pada 30 fps."""
+    rng = np.random.default_rng(seed)
+    pose = pose_at("sidebend", 0.0) + (0.0, 0.0, 2000.0)
+    pose[K4ABT_JOINT_HEAD, 0] += offset
+    return [Frame(n / FPS, [Skeleton(0, pose + rng.normal(0.0, sigma, pose.shape))])
+            for n in range(int(seconds * FPS))]
+
+
+def test_filter_adds_no_transitions_on_recording():
+    frames = list(CsvReplaySource(RECORDING))
+    raw = counts(frames)
+    filtered = counts(frames, JointFilter())
+    assert sum(raw.values()) > 0
+    for exercise, n in filtered.items():
+        assert n <= raw[exercise], exercise
+
+
+@pytest.mark.parametrize("offset,sigma,seed", [(50.0, 15.0, 0), (50.0, 20.0, 1), (40.0, 12.0, 2), (60.0, 15.0, 3)])
+def test_filter_suppresses_jitter_around_threshold(offset, sigma, seed):
+    frames = jitter_frames(offset, sigma, seed)
+    raw = counts(frames)["sidebend"]
+    filtered = counts(frames, JointFilter())["sidebend"]
+    assert raw >= 10
+    assert filtered * 4 <= raw
+
+
+def test_sparse_samples_restart_from_measurement():
+    joint_filter = JointFilter()
+    pose = pose_at("sidebend", 0.0)
+    joint_filter.apply(0, 0.0, pose)
+    moved = pose + 100.0
+    smoothed = joint_filter.apply(0, 1.0 / FPS, moved).copy()
+    assert (np.abs(smoothed - pose) < 100.0).all()
+    restarted = joint_filter.apply(0, 1.0 / FPS + MAX_DT * 1.5, pose)
+    np.testing.assert_array_equal(restarted, pose)
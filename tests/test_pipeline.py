@@ -0,0 +1,99 @@
+"""`Pipeline`: urutan frame, penghitung drop/out_of_order, dan penutupan lewat sentinel STOP."""
+import threading
+
+from identity_tracker import IdentityTracker
+from pipeline import Pipeline, Stage
+from synthetic import SyntheticSkeletons
+
+N_FRAMES = 200
+
+
+def frames(n=N_FRAMES):
+    return SyntheticSkeletons(num_bodies=3, num_frames=n, seed=1)
+
+
+def test_block_delivers_every_frame_in_order():
+    tracker = IdentityTracker()
+    collected = []
+
+    def track(frame):
+        tracker.update(frame.timestamp, frame.bodies)
+        return frame
+
+    pipeline = Pipeline([Stage("tracking", track, queue_size=1, overflow="block"),
+                         Stage("collect", collected.append, queue_size=1, overflow="block")])
+    pipeline.run(frames())
+    timestamps = [frame.timestamp for frame in collected]
+    assert pipeline.frames_in == N_FRAMES
+    assert len(collected) == N_FRAMES
+    assert timestamps == sorted(timestamps) and len(set(timestamps)) == N_FRAMES
+    assert [b.track_id for b in collected[-1].bodies] == [0, 1, 2]
+    for name, st in pipeline.stats().items():
+        assert (st["dropped"], st["out_of_order"], st["errors"], st["queue_depth"]) == (0, 0, 0, 0), name
+        assert st["written"] == N_FRAMES
+
+
+def test_drop_oldest_keeps_latest_frame_and_counts_drops():
+    started, release = threading.Event(), threading.Event()
+    seen = []
+
+    def slow(frame):
+        started.set()
+        release.wait(5)
+        seen.append(frame.timestamp)
+        return frame
+
+    def source():
+        for i, frame in enumerate(frames()):
+            yield frame
+            if i == 0:
+                assert started.wait(5)  # frame 0 sudah dipegang worker, sisanya menumpuk di antrean 1 slot
+        release.set()
+
+    collected = []
+    pipeline = Pipeline([Stage("slow", slow, queue_size=1, overflow="drop_oldest"),
+                         Stage("collect", collected.append, queue_size=1, overflow="block")])
+    all_timestamps = [frame.timestamp for frame in frames()]
+    pipeline.run(source())
+
+    assert seen == [all_timestamps[0], all_timestamps[-1]]
+    assert [frame.timestamp for frame in collected] == seen
+    st = pipeline.stats()
+    assert st["slow"]["submitted"] == N_FRAMES
+    assert st["slow"]["dropped"] == N_FRAMES - 2
+    assert st["slow"]["written"] == 2
+    assert st["collect"]["submitted"] == st["collect"]["written"] == 2
+    assert st["slow"]["out_of_order"] == st["collect"]["out_of_order"] == 0
+
+
+def test_out_of_order_items_are_discarded():
+    collected = []
+    pipeline = Pipeline([Stage("collect", collected.append, queue_size=8, overflow="block")])
+    head = pipeline._writers[0]
+    for seq in (0, 2, 1, 2, 5, 3, 6):
+        head.submit((seq, seq))
+    pipeline.close()
+    assert collected == [0, 2, 5, 6]
+    assert pipeline.stats()["collect"]["out_of_order"] == 3
+
+
+def test_stop_from_stage_shuts_down_cleanly():
+    collected = []
+    pipeline = None
+
+    def collect(frame):
+        collected.append(frame)
+        if len(collected) == 20:
+            pipeline.stop()  # seperti tombol 'q' di stage render
+
+    pipeline = Pipeline([Stage("tracking", lambda frame: frame, queue_size=1, overflow="block"),
+                         Stage("collect", collect, queue_size=1, overflow="block")])
+    pipeline.run(frames(100000))
+
+    assert pipeline.stopped
+    # frame yang sudah masuk sebelum stop tetap diproses sampai habis, lalu semua worker berhenti
+    assert 20 <= len(collected) == pipeline.frames_in < 100000
+    assert all(not writer._thread.is_alive() for writer in pipeline._writers)
+    assert all(st["queue_depth"] == 0 for st in pipeline.stats().values())
+    assert not pipeline._writers[0].submit((pipeline.frames_in, None))
+    assert pipeline.close(timeout=1) is None  # menutup ulang tidak macet
@@ -0,0 +1,152 @@
+"""Log pose biner: konversi CSV <-> log, record terpotong, header rusak, frame banyak body, dan rotasi."""
+import filecmp
+import os
+
+import numpy as np
+import pytest
+
+from conftest import PROGRAM_DIR
+from frame_source import Frame, Skeleton
+from kinect_joints import K4ABT_JOINT_COUNT
+from pose_log import (HEADER, MAGIC, RECORD_DTYPE, PoseLogReplaySource, PoseLogWriter, RotatingPoseLogWriter,
+                      csv_to_pose_log, open_pose_source, part_path, pose_log_to_csv, poses_from_log, read_pose_log)
+
+RECORDING = os.path.join(PROGRAM_DIR, "data_gerakan.csv")
+
+
+def multi_body_frames(n_frames=5):
+    rng = np.random.default_rng(0)
+    frames = []
+    for f in range(n_frames):
+        bodies = [Skeleton(i, rng.normal(0, 500, (K4ABT_JOINT_COUNT, 3)).astype(np.float32).astype(np.float64),
+                           body_id=10 + i if i != 1 else None,
+                           confidence=rng.integers(0, 4, K4ABT_JOINT_COUNT, dtype=np.uint8) if i != 2 else None)
+                  for i in range(f % 3 + 1)]
+        frames.append(Frame(100.0 + f / 30.0, bodies))
+    return frames
+
+
+def test_csv_log_round_trip_is_byte_identical(tmp_path):
+    log1, csv2, log2 = (str(tmp_path / name) for name in ("a.poselog", "b.csv", "c.poselog"))
+    n = csv_to_pose_log(RECORDING, log1)
+    assert pose_log_to_csv(log1, csv2) == n
+    assert csv_to_pose_log(csv2, log2) == n
+    assert filecmp.cmp(log1, log2, shallow=False)
+    assert isinstance(open_pose_source(log1), PoseLogReplaySource)
+    assert len(read_pose_log(log1)) == n  # satu orang per frame di rekaman ini
+
+
+def test_truncated_final_record_is_ignored(tmp_path):
+    path = str(tmp_path / "cut.poselog")
+    with PoseLogWriter(path) as writer:
+        for frame in multi_body_frames():
+            writer.write_frame(frame.timestamp, frame.bodies)
+    full = read_pose_log(path)
+    n = len(full)
+    del full
+    with open(path, "r+b") as f:
+        f.truncate(HEADER.size + (n - 1) * RECORD_DTYPE.itemsize + 100)
+    records = read_pose_log(path)
+    assert len(records) == n - 1
+    with open(path, "r+b") as f:
+        f.truncate(HEADER.size + 10)
+    assert len(read_pose_log(path)) == 0
+
+
+@pytest.mark.parametrize("header", [b"", b"KPOSE", HEADER.pack(b"NOTALOG!", 1, K4ABT_JOINT_COUNT),
+                                    HEADER.pack(MAGIC, 99, K4ABT_JOINT_COUNT), HEADER.pack(MAGIC, 1, 26)])
+def test_bad_header_raises(tmp_path, header):
+    path = str(tmp_path / "bad.poselog")
+    with open(path, "wb") as f:
+        f.write(header + bytes(RECORD_DTYPE.itemsize))
+    with pytest.raises(ValueError):
+        read_pose_log(path)
+
+
+def test_multi_body_frames_round_trip(tmp_path):
+    path = str(tmp_path / "multi.poselog")
+    frames = multi_body_frames()
+    with PoseLogWriter(path, chunk_records=4) as writer:  # chunk lebih kecil dari jumlah record
+        for frame in frames:
+            writer.write_frame(frame.timestamp, frame.bodies)
+    replayed = list(PoseLogReplaySource(path))
+    assert len(replayed) == len(frames)
+    for got, want in zip(replayed, frames):
+        assert got.timestamp == want.timestamp
+        assert [b.index for b in got.bodies] == [b.index for b in want.bodies]
+        for g, w in zip(got.bodies, want.bodies):
+            np.testing.assert_array_equal(g.positions, w.positions)
+            assert g.body_id == w.body_id
+            if w.confidence is None:
+                assert g.confidence is None
+            else:
+                np.testing.assert_array_equal(g.confidence, w.confidence)
+
+    timestamps, poses = poses_from_log(read_pose_log(path))
+    assert poses.shape == (len(frames), 3, K4ABT_JOINT_COUNT, 3)
+    np.testing.assert_array_equal(timestamps, [f.timestamp for f in frames])
+    assert np.isnan(poses[0, 1:]).all() and not np.isnan(poses[2]).any()
+    np.testing.assert_array_equal(poses[4, 1], frames[4].bodies[1].positions)
+
+
+def one_body(t):
+    return Frame(t, [Skeleton(0, np.full((K4ABT_JOINT_COUNT, 3), t))])
+
+
+def write_rotating(path, timestamps, **rotation):
+    rotated = []
+
+    def on_rotate(finished, part):
+        # bagian yang baru selesai masih ada dan utuh saat callback dipanggil
+        rotated.append((part, len(read_pose_log(finished))))
+
+    with RotatingPoseLogWriter(path, on_rotate=on_rotate, chunk_records=4, **rotation) as writer:
+        for t in timestamps:
+            frame = one_body(t)
+            writer.write_frame(frame.timestamp, frame.bodies)
+    return writer, rotated
+
+
+def stored_timestamps(writer):
+    return [[float(t) for t in read_pose_log(p)["timestamp"]] for p in writer.parts]
+
+
+def test_rotation_by_time(tmp_path):
+    writer, rotated = write_rotating(str(tmp_path / "a.poselog"), [0.0, 1.0, 4.9, 5.0, 7.0, 10.5], max_seconds=5.0)
+    assert stored_timestamps(writer) == [[0.0, 1.0, 4.9], [5.0, 7.0], [10.5]]
+    assert rotated == [(1, 3), (2, 2)]
+    assert writer.parts == [part_path(str(tmp_path / "a.poselog"), p) for p in (1, 2, 3)]
+    frames = [int(f) for p in writer.parts for f in read_pose_log(p)["frame"]]
+    assert frames == list(range(6))  # nomor frame berlanjut antar bagian
+
+
+def test_rotation_by_size_leaves_no_empty_trailing_part(tmp_path):
+    max_bytes = HEADER.size + 2 * RECORD_DTYPE.itemsize
+    writer, rotated = write_rotating(str(tmp_path / "a.poselog"), [0.0, 1.0, 2.0, 3.0], max_bytes=max_bytes)
+    # bagian penuh setelah frame ke-2 dan ke-4, tetapi bagian ketiga baru dibuka jika ada frame lagi
+    assert stored_timestamps(writer) == [[0.0, 1.0], [2.0, 3.0]]
+    assert rotated == [(1, 2)]
+    assert sorted(os.listdir(tmp_path)) == ["a.0001.poselog", "a.0002.poselog"]
+
+
+@pytest.mark.parametrize("max_files", [1, 2])
+def test_max_files_keeps_finished_part_until_next_rotation(tmp_path, max_files):
+    path = str(tmp_path / "a.poselog")
+    writer, rotated = write_rotating(path, [float(t) for t in range(10)], max_seconds=2.0, max_files=max_files)
+    assert rotated == [(part, 2) for part in range(1, 5)]  # on_rotate tidak pernah melihat file yang sudah dihapus
+    assert writer.parts == [part_path(path, p) for p in range(6 - max_files, 6)]
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in writer.parts)
+    assert stored_timestamps(writer)[-1] == [8.0, 9.0]
+
+
+def test_max_files_counts_only_finished_parts_while_writing(tmp_path):
+    path = str(tmp_path / "a.poselog")
+    writer = RotatingPoseLogWriter(path, max_seconds=1.0, max_files=1)
+    for t in (0.0, 1.0, 2.0):
+        frame = one_body(t)
+        writer.write_frame(frame.timestamp, frame.bodies)
+    # bagian 2 baru selesai (tetap ada) + bagian 3 yang sedang ditulis
+    assert writer.parts == [part_path(path, 2), part_path(path, 3)]
+    writer.close()
+    assert writer.parts == [part_path(path, 3)]
+    assert os.listdir(tmp_path) == ["a.0003.poselog"]
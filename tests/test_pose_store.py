@@ -0,0 +1,110 @@
+"""Store pose terindeks: pemangkasan chunk dan query joint / poses harus sama dengan scan penuh log."""
+import numpy as np
+import pytest
+
+from frame_source import Skeleton
+from kinect_joints import K4ABT_JOINT_COUNT
+from pose_log import PoseLogWriter, poses_from_log, read_pose_log
+from pose_store import PoseStore, joint_index, main
+
+FPS = 30.0
+N_FRAMES = 300
+CHUNK = 32
+
+
+def bodies_at(f, rng):
+    """Body 0 selalu ada, body 1 hanya frame 60..179, body 3 setiap frame ketiga (body 2 tidak pernah)."""
+    present = [0] + ([1] if 60 <= f < 180 else []) + ([3] if f % 3 == 0 else [])
+    return [Skeleton(b, rng.normal(0.0, 500.0, (K4ABT_JOINT_COUNT, 3)), body_id=10 + b) for b in present]
+
+
+@pytest.fixture(scope="module")
+def log_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("log") / "sesi.poselog")
+    rng = np.random.default_rng(0)
+    with PoseLogWriter(path) as writer:
+        for f in range(N_FRAMES):
+            writer.write_frame(100.0 + f / FPS, bodies_at(f, rng))
+    return path
+
+
+@pytest.fixture(scope="module")
+def session(log_path, tmp_path_factory):
+    store = PoseStore(str(tmp_path_factory.mktemp("store")))
+    return store.session(store.ingest(log_path, chunk_records=CHUNK))
+
+
+def expected(records, body, t0, t1):
+    keep = np.ones(len(records), dtype=bool)
+    if body is not None:
+        keep &= records["body_index"] == body
+    if t0 is not None:
+        keep &= records["timestamp"] >= t0
+    if t1 is not None:
+        keep &= records["timestamp"] <= t1
+    return records[keep]
+
+
+WINDOWS = [
+    (None, None),
+    (102.0, 104.5),            # melintasi beberapa chunk, batas di tengah chunk
+    (None, 101.0),
+    (108.0, None),
+    (103.0, 103.0 + 1 / FPS),  # dua frame
+    (105.01, 105.02),          # di antara dua frame: kosong
+    (200.0, 300.0),            # di luar rekaman: kosong
+]
+
+
+@pytest.mark.parametrize("body", [None, 0, 1, 3, 2, 70], ids=lambda b: f"body{b}")
+@pytest.mark.parametrize("t0, t1", WINDOWS)
+def test_joint_matches_filtered_log(log_path, session, body, t0, t1):
+    want = expected(read_pose_log(log_path), body, t0, t1)
+    times, positions = session.joint("left_knee", body, t0, t1)
+    np.testing.assert_array_equal(times, want["timestamp"])
+    np.testing.assert_array_equal(positions, want["positions"][:, joint_index("left_knee")])
+    assert positions.dtype == np.float32 and positions.shape == (len(want), 3)
+
+
+@pytest.mark.parametrize("body, t0, t1", [(1, None, None), (None, 102.0, 104.5), (1, 107.0, 108.0), (2, None, None)])
+def test_pruned_chunks_hold_no_matching_records(log_path, session, body, t0, t1):
+    records = read_pose_log(log_path)
+    kept = set(session.chunk_range(t0, t1, body).tolist())
+    for c, chunk in enumerate(session.chunks):
+        if c not in kept:
+            assert len(expected(records[chunk["start"]:chunk["stop"]], body, t0, t1)) == 0
+    if (body, t0, t1) != (None, None, None):
+        assert len(kept) < len(session.chunks)
+    # chunk yang seluruhnya cocok tidak perlu mask (kolom timestamp / body tidak dibaca)
+    for start, stop, mask in session._selections(t0, t1, body, None):
+        want = len(expected(records[start:stop], body, t0, t1))
+        assert (stop - start if mask is None else int(mask.sum())) == want > 0
+
+
+def test_body_id_filter(log_path, session):
+    times, _ = session.joint(0, body_id=13)
+    np.testing.assert_array_equal(times, expected(read_pose_log(log_path), 3, None, None)["timestamp"])
+
+
+@pytest.mark.parametrize("t0, t1", [(None, None), (102.0, 104.5), (200.0, 300.0)])
+def test_poses_match_poses_from_log(log_path, session, t0, t1):
+    records = read_pose_log(log_path)
+    keep = expected(records, None, t0, t1)
+    want_times, want_poses = poses_from_log(keep)
+    times, poses = session.poses(t0, t1)
+    assert poses.dtype == want_poses.dtype == np.float64
+    np.testing.assert_array_equal(times, want_times)
+    np.testing.assert_array_equal(poses, want_poses)
+
+
+def test_ingest_refuses_to_replace_existing_session(log_path, tmp_path, capsys):
+    store = PoseStore(str(tmp_path))
+    store.ingest(log_path, chunk_records=CHUNK)
+    with pytest.raises(ValueError, match="replace"):
+        store.ingest(log_path)
+    assert store.sessions()["sesi"]["chunks"] == -(-store.sessions()["sesi"]["records"] // CHUNK)
+
+    assert main(["ingest", str(tmp_path), log_path]) == 1
+    assert "sudah ada" in capsys.readouterr().out
+    assert main(["ingest", str(tmp_path), log_path, "--replace", "--chunk-records", "64"]) == 0
+    assert PoseStore(str(tmp_path)).sessions()["sesi"]["chunks"] == -(-len(read_pose_log(log_path)) // 64)
@@ -0,0 +1,106 @@
+"""`Projector` dibandingkan dengan rumus SDK per titik untuk kedua model distorsi."""
+import math
+
+import numpy as np
+import pytest
+
+from projection import (K4A_CALIBRATION_LENS_DISTORTION_MODEL_BROWN_CONRADY,
+                        K4A_CALIBRATION_LENS_DISTORTION_MODEL_RATIONAL_6KT, Projector, compare_with_sdk)
+
+# parameter kalibrasi depth -> color 720p yang disimpan dari satu unit Azure Kinect
+ROTATION = [0.99999, 0.00391, -0.00212,
+            -0.00374, 0.99494, 0.10039,
+            0.00250, -0.10038, 0.99494]
+TRANSLATION = [-32.1, -1.9, 3.8]
+PARAMS = {"cx": 639.62, "cy": 366.73, "fx": 606.41, "fy": 606.28,
+          "k1": 0.5263, "k2": -2.6815, "k3": 1.5872, "k4": 0.4071, "k5": -2.5113, "k6": 1.5167,
+          "codx": 0.0, "cody": 0.0, "p2": -0.00021, "p1": 0.00063}
+METRIC_RADIUS = 1.7
+
+POINTS = [(0.0, 0.0, 1500.0), (-420.0, -310.0, 2100.0), (380.0, 520.0, 1800.0),
+          (-900.0, 450.0, 2600.0), (150.0, -700.0, 3200.0), (60.0, 40.0, 800.0)]
+
+# piksel referensi per model, dihitung dengan `sdk_reference` (port skalar float32 SDK) lalu disimpan
+REFERENCE = {
+    K4A_CALIBRATION_LENS_DISTORTION_MODEL_RATIONAL_6KT:
+        [(625.301, 427.064), (508.171, 338.633), (762.120, 612.766),
+        (412.223, 539.340), (659.821, 296.352), (659.756, 456.869)],
+    K4A_CALIBRATION_LENS_DISTORTION_MODEL_BROWN_CONRADY:
+        [(625.300, 427.064), (508.174, 338.632), (762.150, 612.756),
+        (412.184, 539.353), (659.820, 296.353), (659.758, 456.869)],
+}
+
+
+def sdk_reference(point, model, params=PARAMS, metric_radius=METRIC_RADIUS):
+    """Port skalar `transformation_3d_to_2d` + `transformation_project_internal` (intrinsic_transformation.c),
+    dengan float32 seperti SDK. Return (x, y) atau None jika tidak valid."""
+    f = np.float32
+    p = {k: f(v) for k, v in params.items()}
+    r = np.asarray(ROTATION, dtype=f).reshape(3, 3)
+    x, y, z = r @ np.asarray(point, dtype=f) + np.asarray(TRANSLATION, dtype=f)
+    if not (math.isfinite(x) and math.isfinite(y) and math.isfinite(z)) or z <= 0:
+        return None
+    xp = x / z - p["codx"]
+    yp = y / z - p["cody"]
+    xp2, yp2, xyp = xp * xp, yp * yp, xp * yp
+    rs = xp2 + yp2
+    if rs > f(metric_radius) * f(metric_radius):
+        return None
+    rss, rsc = rs * rs, rs * rs * rs
+    a = f(1) + p["k1"] * rs + p["k2"] * rss + p["k3"] * rsc
+    b = f(1) + p["k4"] * rs + p["k5"] * rss + p["k6"] * rsc
+    d = a / b if b != 0 else a
+    xp_d = xp * d + (rs + f(2) * xp2) * p["p2"] + xyp * p["p1"]
+    yp_d = yp * d + (rs + f(2) * yp2) * p["p1"] + xyp * p["p2"]
+    if model == K4A_CALIBRATION_LENS_DISTORTION_MODEL_BROWN_CONRADY:
+        xp_d += xyp * p["p1"]
+        yp_d += xyp * p["p2"]
+    return float((xp_d + p["codx"]) * p["fx"] + p["cx"]), float((yp_d + p["cody"]) * p["fy"] + p["cy"])
+
+
+def make_projector(model):
+    return Projector(ROTATION, TRANSLATION, PARAMS, model, METRIC_RADIUS)
+
+
+MODELS = [K4A_CALIBRATION_LENS_DISTORTION_MODEL_RATIONAL_6KT, K4A_CALIBRATION_LENS_DISTORTION_MODEL_BROWN_CONRADY]
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_matches_reference_pixels(model):
+    points2d, valid = make_projector(model).project(POINTS)
+    assert valid.all()
+    np.testing.assert_allclose(points2d, REFERENCE[model], atol=2e-3)
+    for point, ref in zip(POINTS, REFERENCE[model]):
+        np.testing.assert_allclose(sdk_reference(point, model), ref, atol=2e-3)
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_matches_sdk_formula_on_point_cloud(model):
+    rng = np.random.default_rng(model)
+    points = np.column_stack([rng.uniform(-3000, 3000, 2000), rng.uniform(-2000, 2000, 2000),
+                              rng.uniform(-500, 5000, 2000)])
+    max_error, mismatched = compare_with_sdk(make_projector(model), points, lambda p: sdk_reference(p, model))
+    assert mismatched == 0
+    assert max_error < 5e-3  # SDK menghitung dalam float32
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")  # NaN/inf ikut dihitung sebelum disaring valid
+@pytest.mark.parametrize("model", MODELS)
+def test_invalid_points(model):
+    points = [(0.0, 0.0, -500.0),         # di belakang kamera
+              (300.0, 200.0, -4.0),      # z hasil transformasi <= 0
+              (2500.0, 0.0, 1000.0),     # di luar metric_radius
+              (0.0, -3000.0, 1200.0),    # di luar metric_radius
+              (float("nan"), 0.0, 1500.0),
+              (0.0, float("nan"), 1500.0),
+              (0.0, 0.0, float("nan")),
+              (0.0, 0.0, float("inf")),
+              (0.0, 0.0, 1500.0)]        # satu titik valid sebagai kontrol
+    projector = make_projector(model)
+    points2d, valid = projector.project(points)
+    assert valid.tolist() == [False] * 8 + [True]
+    assert [sdk_reference(p, model) is None for p in points] == [True] * 8 + [False]
+    pixels, pixel_valid = projector.project_pixels(points)
+    assert pixel_valid.tolist() == valid.tolist()
+    assert (pixels[:8] == 0).all()
+    assert pixels[8].tolist() == [int(points2d[8, 0]), int(points2d[8, 1])]
@@ -0,0 +1,40 @@
+"""`RepRecord` / `SessionSummary`: ROM yang tidak diketahui ditulis sebagai null, bukan NaN."""
+import json
+
+from rep_analytics import RepRecord, SessionSummary
+from rep_counter import RepCounter
+from synthetic import pose_at
+
+
+def test_rep_started_outside_rest_zone_has_unknown_rom():
+    records = []
+    counter = RepCounter("sidebend", verbose=False, on_rep=records.append)
+    # orang sudah miring ke kanan saat pertama terlihat, lalu kembali ke tengah, lalu satu rep penuh
+    for t, progress in enumerate([0.25, 0.25, 0.0, 0.0, 0.25, 0.0]):
+        counter.update(0, pose_at("sidebend", progress), True, timestamp=float(t))
+    assert [r.number for r in records] == [1, 2]
+    assert records[0].rom is None
+    assert records[1].rom > 0
+
+
+def test_summary_skips_unknown_rom_and_writes_strict_json(tmp_path):
+    summary = SessionSummary()
+    summary.add(RepRecord(0, "knee", 1, 0.0, 2.0, 60.0, None, 1.0, 1.0))
+    summary.add(RepRecord(0, "knee", 2, 2.0, 4.0, 60.0, 80.0, 1.0, 1.0))
+    summary.add(RepRecord(0, "knee", 3, 4.0, 6.0, 60.0, 100.0, 1.0, 1.0))
+    summary.add(RepRecord(1, "shoulder", 1, 0.0, 2.0, -40.0, None, 1.0, 1.0))
+    stats = summary.aggregates()
+    assert stats[0]["knee"]["reps"] == 3
+    assert (stats[0]["knee"]["rom_mean"], stats[0]["knee"]["rom_min"]) == (90.0, 80.0)
+    assert (stats[1]["shoulder"]["rom_mean"], stats[1]["shoulder"]["rom_min"]) == (None, None)
+
+    path = str(tmp_path / "session.json")
+    summary.write(path)
+    with open(path) as f:
+        text = f.read()
+
+    def reject(constant):
+        raise AssertionError(f"{constant} di JSON")
+    data = json.loads(text, parse_constant=reject)
+    rom = data["rep_fields"].index("rom")
+    assert [row[rom] for row in data["reps"]] == [None, 80.0, 100.0, None]
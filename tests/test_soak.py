@@ -0,0 +1,16 @@
+"""Soak singkat: sesi panjang sintetis dengan rotasi log tetap lulus semua batas `soak.check`."""
+import os
+
+from identity_tracker import DEFAULT_MAX_TRACKS
+from soak import check, run_soak
+from workout import rotation_options
+
+
+def test_short_soak_passes(tmp_path):
+    report = run_soak(hours=0.1, sample_minutes=1, rotation=rotation_options(None, 1, 2), workdir=str(tmp_path),
+                      progress=False)
+    assert check(report, max_rss_growth_mb=8.0, max_slowdown=1.5, max_tracks=DEFAULT_MAX_TRACKS, keep_logs=2) == []
+    # 6 menit, rotasi per menit, 2 bagian terbaru disimpan beserta ringkasannya (tanpa bagian kosong ke-7)
+    assert sorted(os.listdir(tmp_path)) == ["soak.0005.poselog", "soak.0006.poselog",
+                                            "soak_session.0005.json", "soak_session.0006.json"]
+    assert len(report["windows"]) == 6